@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+import bulk
+
+DEFAULT_PARALLELISM = 8
+
+
+class AssignmentIndex:
+    """Principal to principal role assignments, with the inverted role to principals index."""
+
+    def __init__(self):
+        self._roles = {}
+        self._holders = defaultdict(set)
+        # Roles known to exist, including those nobody holds
+        self._known_roles = set()
+
+    def __len__(self):
+        return len(self._roles)
+
+    # Record the complete set of roles assigned to a principal
+    def set_roles(self, principal, roles):
+        self.remove_principal(principal)
+        roles = set(roles)
+        self._roles[principal] = roles
+        for role in roles:
+            self._holders[role].add(principal)
+
+    def remove_principal(self, principal):
+        for role in self._roles.pop(principal, ()):
+            holders = self._holders[role]
+            holders.discard(principal)
+            if not holders:
+                del self._holders[role]
+
+    def add_known_roles(self, roles):
+        self._known_roles.update(roles)
+
+    def roles_of(self, principal):
+        return sorted(self._roles.get(principal, ()))
+
+    def holders(self, role):
+        return sorted(self._holders.get(role, ()))
+
+    def has_role(self, principal, role):
+        return role in self._roles.get(principal, ())
+
+    @property
+    def principals(self):
+        return sorted(self._roles)
+
+    @property
+    def roles(self):
+        return sorted(self._known_roles.union(self._holders))
+
+    # Yield (principal, role) pairs, sorted by principal
+    def pairs(self):
+        for principal in self.principals:
+            for role in self.roles_of(principal):
+                yield principal, role
+
+
+# Function to fetch the roles of every principal, at most `parallelism` principals at a time.
+# fetch_roles(principal_name) returns role records; yields (principal_name, role_names, error) as
+# each lookup finishes. Closing the generator early cancels the lookups that have not started.
+def iter_assignments(backend, fetch_roles=None, parallelism=DEFAULT_PARALLELISM):
+    fetch_roles = fetch_roles or backend.list_principal_roles
+    principal_names = [principal["name"] for principal in backend.list_principals()]
+    role_names = {}
+
+    def fetch_role_names(principal_name):
+        role_names[principal_name] = [role["name"] for role in fetch_roles(principal_name)]
+
+    outcomes = bulk.run_bulk(fetch_role_names, [(name,) for name in principal_names], parallelism,
+                             thread_name_prefix="polaris-assignments")
+    try:
+        for (principal_name,), error in outcomes:
+            yield principal_name, role_names.pop(principal_name, []), error
+    finally:
+        outcomes.close()
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+
+import requests
+
+OAUTH_TOKENS_PATH = "/api/catalog/v1/oauth/tokens"
+DEFAULT_SCOPE = "PRINCIPAL_ROLE:ALL"
+
+# Tokens are refreshed this many seconds before they expire
+REFRESH_MARGIN = 60
+# Lifetime assumed when the server does not send expires_in
+DEFAULT_EXPIRES_IN = 3600
+DEFAULT_TOKEN_TIMEOUT = 30
+# The background refresh runs after this fraction of the time until the foreground refresh would
+BACKGROUND_REFRESH_FRACTION = 0.8
+
+
+class TokenError(Exception):
+    """Raised when an access token cannot be obtained."""
+
+
+class TokenManager:
+    """Caches an OAuth bearer token and refreshes it before it expires.
+
+    A single manager is shared by every request for the same host, port and
+    client ID, so concurrent callers wait for one token exchange instead of
+    each starting their own.
+    """
+
+    def __init__(self, base_url, client_id, client_secret, scope=DEFAULT_SCOPE,
+                 refresh_margin=REFRESH_MARGIN, timeout=DEFAULT_TOKEN_TIMEOUT):
+        self.base_url = base_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0
+        self._refresh_timer = None
+        self._closed = False
+
+    # Return a valid access token, fetching a new one only when needed
+    def token(self):
+        with self._lock:
+            if self._token is None or time.monotonic() >= self._expires_at - self.refresh_margin:
+                # Concurrent callers wait for this one exchange
+                self._store(*self._fetch())
+            return self._token
+
+    # Drop the cached token (e.g. after a 401) unless it was already replaced
+    def invalidate(self, token=None):
+        with self._lock:
+            if token is None or token == self._token:
+                logging.info(f"Invalidating access token for client {self.client_id}")
+                self._token = None
+                self._expires_at = 0
+                self._cancel_refresh()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._cancel_refresh()
+            self._token = None
+        self.session.close()
+
+    # Exchange the client credentials for a token; returns (token, expires_in)
+    def _fetch(self):
+        logging.debug(f"Requesting access token from {self.base_url}")
+        try:
+            response = self.session.post(
+                self.base_url + OAUTH_TOKENS_PATH,
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "scope": self.scope,
+                },
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise TokenError(f"Failed to obtain access token: {e}") from e
+        if not response.ok:
+            raise TokenError(f"Failed to obtain access token: {response.status_code} {response.text}")
+        try:
+            body = response.json()
+            expires_in = int(body.get("expires_in") or DEFAULT_EXPIRES_IN)
+            token = body["access_token"]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise TokenError(f"Failed to obtain access token: unexpected response {response.text[:200]!r}") from e
+        logging.info(f"Obtained access token for client {self.client_id}, expires in {expires_in}s")
+        return token, expires_in
+
+    # Must be called with the lock held
+    def _store(self, token, expires_in):
+        self._token = token
+        self._expires_at = time.monotonic() + expires_in
+        self._schedule_refresh(expires_in)
+
+    def _schedule_refresh(self, expires_in):
+        self._cancel_refresh()
+        # Ahead of the foreground refresh, so callers normally never wait for an exchange
+        delay = (expires_in - self.refresh_margin) * BACKGROUND_REFRESH_FRACTION
+        if delay <= 0 or self._closed:
+            return
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _cancel_refresh(self):
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    # Fetch a new token without holding the lock, so callers keep using the current one meanwhile
+    def _background_refresh(self):
+        try:
+            token, expires_in = self._fetch()
+        except TokenError as e:
+            # The current token stays in use; token() refreshes in the foreground when it is about to expire
+            logging.warning(f"Background token refresh failed: {e}")
+            return
+        with self._lock:
+            if not self._closed:
+                self._store(token, expires_in)
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+# Function to get the shared token manager for a host, port and client ID
+def get_token_manager(host, port, client_id, client_secret, base_url=None):
+    key = (host, port, client_id)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is not None and manager.client_secret != client_secret:
+            manager.close()
+            manager = None
+        if manager is None:
+            manager = TokenManager(base_url or f"http://{host}:{port}", client_id, client_secret)
+            _managers[key] = manager
+        return manager
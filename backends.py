@@ -0,0 +1,829 @@
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import auth
+import resilience
+import tasks
+from metrics import registry as metrics
+
+# Names of the available backends, as shown in the GUI
+BACKEND_REST = "REST"
+BACKEND_CLI = "CLI"
+BACKEND_CLI_WORKER = "CLI Worker"
+BACKEND_NAMES = (BACKEND_REST, BACKEND_CLI, BACKEND_CLI_WORKER)
+
+# Size of the HTTP connection pool kept by the REST backend
+DEFAULT_POOL_SIZE = 10
+# Seconds to wait for a connection and for each read of a response
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("POLARIS_CONNECT_TIMEOUT", "5"))
+DEFAULT_HTTP_TIMEOUT = float(os.getenv("POLARIS_HTTP_TIMEOUT", "30"))
+# Seconds a CLI command may run, and a streamed CLI listing in total, before it is killed
+DEFAULT_CLI_TIMEOUT = float(os.getenv("POLARIS_CLI_TIMEOUT", "60"))
+DEFAULT_CLI_STREAM_TIMEOUT = float(os.getenv("POLARIS_CLI_STREAM_TIMEOUT", "300"))
+# Long-lived CLI worker processes kept by the CLI Worker backend, the interpreter running them, and the
+# module of the CLI when cli_path is a launcher script rather than the CLI's Python file
+DEFAULT_CLI_WORKERS = int(os.getenv("POLARIS_CLI_WORKERS", "2"))
+CLI_WORKER_PYTHON = os.getenv("POLARIS_CLI_PYTHON", sys.executable)
+CLI_WORKER_MODULE = os.getenv("POLARIS_CLI_MODULE")
+CLI_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli_worker.py")
+# HTTP statuses worth retrying and counted against the circuit breaker
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+# CLI errors that mean the server was unreachable or overloaded rather than that the request was wrong
+TRANSIENT_CLI_ERROR = re.compile(
+    r"connection (refused|reset|aborted)|timed? ?out|temporarily unavailable|max retries exceeded"
+    r"|name or service not known|\b(429|50[0234])\b",
+    re.IGNORECASE
+)
+# Number of GET responses kept with their ETag for conditional requests
+DEFAULT_ETAG_CACHE_SIZE = 64
+
+MANAGEMENT_API_PATH = "/api/management/v1"
+# Iceberg REST catalog API, used for namespaces and tables
+CATALOG_API_PATH = "/api/catalog/v1"
+# Separator between the parts of a multi-level namespace in Iceberg REST paths
+NAMESPACE_SEPARATOR = "\x1f"
+
+# Optional catalog settings, mapped to their CLI flag and storage config field
+CATALOG_OPTIONS = {
+    "role_arn": ("--role-arn", "roleArn"),
+    "external_id": ("--external-id", "externalId"),
+    "tenant_id": ("--tenant-id", "tenantId"),
+    "multi_tenant_app_name": ("--multi-tenant-app-name", "multiTenantAppName"),
+    "consent_url": ("--consent-url", "consentUrl"),
+    "service_account": ("--service-account", "gcsServiceAccount"),
+    "remote_url": ("--remote-url", None),
+    "allowed_location": ("--allowed-location", None),
+}
+
+
+class BackendError(Exception):
+    """Raised when a backend fails to execute an operation.
+
+    ``transient`` marks failures that may succeed when retried, such as
+    timeouts, connection errors and 5xx responses.
+    """
+
+    def __init__(self, message, transient=False):
+        super().__init__(message)
+        self.transient = transient
+
+
+class CircuitOpenError(BackendError):
+    """Raised without calling the server while its circuit breaker is open."""
+
+
+# Function to tell whether a failed call is worth retrying
+def is_transient(error):
+    return isinstance(error, BackendError) and error.transient and not isinstance(error, CircuitOpenError)
+
+
+# Function to raise CircuitOpenError if calls to the breaker's endpoint should fail fast
+def check_circuit(breaker):
+    if not breaker.allow():
+        raise CircuitOpenError(f"{breaker.name} is unavailable after repeated failures; "
+                               f"retrying in {breaker.retry_in:.0f}s.")
+
+
+# Function to count a call's outcome against its endpoint's breaker; errors that are not transient
+# (e.g. 404) mean the server answered and count as healthy, cancellations do not count at all
+def record_outcome(breaker, error=None):
+    if tasks.cancelled():
+        return
+    if error is None or (isinstance(error, BackendError) and not error.transient):
+        breaker.record_success()
+    elif is_transient(error):
+        breaker.record_failure()
+
+
+# Function to parse newline-delimited JSON one line at a time
+def iter_ndjson(lines, on_parse_error=None):
+    # Time spent parsing, recorded once the input is exhausted
+    parse_time = 0.0
+    records = 0
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():  # Skip empty lines
+            continue
+        start = time.perf_counter()
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            parse_time += time.perf_counter() - start
+            # Without a handler a malformed line aborts the listing, as before
+            if on_parse_error is None:
+                raise
+            logging.warning(f"Skipping malformed line {line_number}: {e}")
+            on_parse_error(line_number, line, e)
+            continue
+        parse_time += time.perf_counter() - start
+        records += 1
+        yield record
+    metrics.observe("json.parse", parse_time, rows=records)
+
+
+class PolarisBackend:
+    """Operations the GUI can run against a Polaris server."""
+
+    name = None
+
+    def list_catalogs(self):
+        raise NotImplementedError
+
+    # The iter_* methods yield records as they arrive; by default they wrap list_*
+    def iter_catalogs(self, on_parse_error=None):
+        yield from self.list_catalogs()
+
+    def iter_principals(self, on_parse_error=None):
+        yield from self.list_principals()
+
+    def iter_principal_roles(self, principal=None, on_parse_error=None):
+        yield from self.list_principal_roles(principal)
+
+    # The *_page methods return (records, next page token); the token is None on the last page.
+    # By default the whole listing is returned as a single page.
+    def list_catalogs_page(self, page_token=None, page_size=None):
+        return self.list_catalogs(), None
+
+    def list_principals_page(self, page_token=None, page_size=None):
+        return self.list_principals(), None
+
+    def create_catalog(self, name, catalog_type, storage_type, default_base_location, options=None):
+        raise NotImplementedError
+
+    # Set catalog properties (including default-base-location), keeping the others
+    def update_catalog(self, name, properties):
+        raise NotImplementedError
+
+    def delete_catalog(self, name):
+        raise NotImplementedError
+
+    def list_principals(self):
+        raise NotImplementedError
+
+    def create_principal(self, name):
+        raise NotImplementedError
+
+    def delete_principal(self, name):
+        raise NotImplementedError
+
+    def list_principal_roles(self, principal=None):
+        raise NotImplementedError
+
+    def create_principal_role(self, name, properties=None):
+        raise NotImplementedError
+
+    # Set principal role properties, keeping the others
+    def update_principal_role(self, name, properties):
+        raise NotImplementedError
+
+    def delete_principal_role(self, name):
+        raise NotImplementedError
+
+    def grant_principal_role(self, principal_role, principal):
+        raise NotImplementedError
+
+    def revoke_principal_role(self, principal_role, principal):
+        raise NotImplementedError
+
+    def list_catalog_roles(self, catalog):
+        raise NotImplementedError
+
+    # Return the grants (privileges) of a catalog role
+    def list_grants(self, catalog, catalog_role):
+        raise NotImplementedError
+
+    # Return the namespaces directly under parent (a list of name parts) as lists of name parts
+    def list_namespaces(self, catalog, parent=None):
+        raise NotImplementedError
+
+    # Return the names of the tables in a namespace
+    def list_tables(self, catalog, namespace):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CliBackend(PolarisBackend):
+    """Runs every operation through the ``polaris`` CLI executable."""
+
+    name = BACKEND_CLI
+
+    def __init__(self, cli_path, host, port, client_id, client_secret, timeout=DEFAULT_CLI_TIMEOUT,
+                 stream_timeout=DEFAULT_CLI_STREAM_TIMEOUT):
+        self.cli_path = cli_path
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.timeout = timeout
+        self.stream_timeout = stream_timeout
+        self.breaker = resilience.get_breaker(f"{host}:{port}")
+
+    # Connection flags that are not set (e.g. no POLARIS_CLIENT_ID) are left for the CLI to report
+    def base_args(self):
+        args = [self.cli_path]
+        for flag, value in (("--host", self.host), ("--port", self.port), ("--client-id", self.client_id),
+                            ("--client-secret", self.client_secret)):
+            if value is not None:
+                args.extend([flag, str(value)])
+        return args
+
+    # Run a CLI command and return its standard output. Reads (list, get) are retried on transient failures.
+    def run(self, *command):
+        if len(command) > 1 and command[1] in ("list", "get"):
+            return resilience.call_with_retry(lambda: self._run(*command), is_transient,
+                                              description=f"CLI {' '.join(command[:2])}")
+        return self._run(*command)
+
+    def _run(self, *command):
+        args = self.base_args() + list(command)
+        logging.debug(f"Running CLI command: {' '.join(args)}")
+        check_circuit(self.breaker)
+        error = None
+        try:
+            stdout = self._communicate(args)
+        except BackendError as e:
+            error = e
+            raise
+        finally:
+            record_outcome(self.breaker, error)
+        logging.info("CLI command executed successfully")
+        # Formatted lazily: listings are large and DEBUG is usually off
+        logging.debug("CLI output: %s", stdout)
+        return stdout
+
+    def _communicate(self, args):
+        try:
+            with metrics.span("cli.run"):
+                process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                # A superseded or cancelled task stops the CLI instead of waiting for it
+                remove_hook = tasks.on_cancel(process.kill)
+                try:
+                    stdout, stderr = process.communicate(timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.communicate()
+                    raise BackendError(f"CLI command timed out after {self.timeout:.0f}s", transient=True)
+                finally:
+                    remove_hook()
+        except OSError as e:
+            raise BackendError(f"Failed to execute CLI command: {e}") from e
+        return self._result(process.returncode, stdout, stderr)
+
+    # Return the output of a finished CLI command, or raise its error
+    def _result(self, returncode, stdout, stderr):
+        if tasks.cancelled():
+            raise BackendError("CLI command cancelled")
+        if returncode != 0:
+            logging.error(f"CLI Error: {stderr}")
+            raise BackendError(stderr, transient=bool(TRANSIENT_CLI_ERROR.search(stderr)))
+        return stdout
+
+    # Run a CLI command and yield the records it prints, parsing each line as it arrives. Listings that
+    # fail before their first record are retried.
+    def stream(self, *command, on_parse_error=None):
+        return resilience.iter_with_retry(lambda: self._stream(*command, on_parse_error=on_parse_error),
+                                          is_transient, description=f"CLI {' '.join(command[:2])}")
+
+    def _stream(self, *command, on_parse_error=None):
+        args = self.base_args() + list(command)
+        logging.debug(f"Streaming CLI command: {' '.join(args)}")
+        check_circuit(self.breaker)
+        # stderr goes to a file so a chatty CLI cannot block on a full pipe
+        with tempfile.TemporaryFile(mode="w+") as stderr:
+            try:
+                with metrics.span("cli.spawn"):
+                    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=stderr, text=True, bufsize=1)
+            except OSError as e:
+                raise BackendError(f"Failed to execute CLI command: {e}") from e
+            # Killing the CLI ends its output, which unblocks a consumer waiting for the next line
+            remove_hook = tasks.on_cancel(process.kill)
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                process.kill()
+
+            watchdog = threading.Timer(self.stream_timeout, kill_on_timeout)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                yield from iter_ndjson(process.stdout, on_parse_error)
+                returncode = process.wait()
+            finally:
+                watchdog.cancel()
+                remove_hook()
+                # Stops the CLI if the consumer gave up early
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+            if returncode != 0:
+                if tasks.cancelled():
+                    error = BackendError("CLI command cancelled")
+                elif timed_out.is_set():
+                    error = BackendError(f"CLI command timed out after {self.stream_timeout:.0f}s", transient=True)
+                else:
+                    stderr.seek(0)
+                    message = stderr.read()
+                    logging.error(f"CLI Error: {message}")
+                    error = BackendError(message, transient=bool(TRANSIENT_CLI_ERROR.search(message)))
+                record_outcome(self.breaker, error)
+                raise error
+        record_outcome(self.breaker)
+        logging.info("CLI command executed successfully")
+
+    def list_catalogs(self):
+        return list(self.iter_catalogs())
+
+    def iter_catalogs(self, on_parse_error=None):
+        return self.stream("catalogs", "list", on_parse_error=on_parse_error)
+
+    def create_catalog(self, name, catalog_type, storage_type, default_base_location, options=None):
+        command = [
+            "catalogs", "create",
+            "--type", catalog_type,
+            "--storage-type", storage_type,
+            "--default-base-location", default_base_location,
+            name,
+        ]
+        for option, value in (options or {}).items():
+            if value:
+                command.extend([CATALOG_OPTIONS[option][0], value])
+        return self.run(*command)
+
+    def update_catalog(self, name, properties):
+        command = ["catalogs", "update", name]
+        for key, value in properties.items():
+            if key == "default-base-location":
+                command.extend(["--default-base-location", value])
+            else:
+                command.extend(["--set-property", f"{key}={value}"])
+        return self.run(*command)
+
+    def delete_catalog(self, name):
+        return self.run("catalogs", "delete", name)
+
+    def list_principals(self):
+        return list(self.iter_principals())
+
+    def iter_principals(self, on_parse_error=None):
+        return self.stream("principals", "list", on_parse_error=on_parse_error)
+
+    def create_principal(self, name):
+        return self.run("principals", "create", name)
+
+    def delete_principal(self, name):
+        return self.run("principals", "delete", name)
+
+    def list_principal_roles(self, principal=None):
+        return list(self.iter_principal_roles(principal))
+
+    def iter_principal_roles(self, principal=None, on_parse_error=None):
+        command = ["principal-roles", "list"]
+        if principal:
+            command.extend(["--principal", principal])
+        return self.stream(*command, on_parse_error=on_parse_error)
+
+    def create_principal_role(self, name, properties=None):
+        command = ["principal-roles", "create", name]
+        for key, value in (properties or {}).items():
+            command.extend(["--property", f"{key}={value}"])
+        return self.run(*command)
+
+    def update_principal_role(self, name, properties):
+        command = ["principal-roles", "update", name]
+        for key, value in properties.items():
+            command.extend(["--set-property", f"{key}={value}"])
+        return self.run(*command)
+
+    def delete_principal_role(self, name):
+        return self.run("principal-roles", "delete", name)
+
+    def grant_principal_role(self, principal_role, principal):
+        return self.run("principal-roles", "grant", principal_role, "--principal", principal)
+
+    def revoke_principal_role(self, principal_role, principal):
+        return self.run("principal-roles", "revoke", principal_role, "--principal", principal)
+
+    def list_catalog_roles(self, catalog):
+        return list(self.stream("catalog-roles", "list", catalog))
+
+    def list_grants(self, catalog, catalog_role):
+        return list(self.stream("privileges", "list", "--catalog", catalog, "--catalog-role", catalog_role))
+
+    def list_namespaces(self, catalog, parent=None):
+        command = ["namespaces", "list", "--catalog", catalog]
+        if parent:
+            command.extend(["--parent", ".".join(parent)])
+        namespaces = (
+            namespace if isinstance(namespace, list) else namespace.get("namespace", [])
+            for namespace in self.stream(*command)
+        )
+        # Entries without a name (an empty list) are skipped
+        return [namespace for namespace in namespaces if namespace]
+
+    def list_tables(self, catalog, namespace):
+        raise BackendError("Listing tables requires the REST backend.")
+
+
+class CliWorker:
+    """A cli_worker.py process that keeps the CLI loaded and runs one command at a time."""
+
+    def __init__(self, command):
+        try:
+            with metrics.span("cli.spawn"):
+                self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+                                                bufsize=1)
+        except OSError as e:
+            raise BackendError(f"Failed to start CLI worker: {e}") from e
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    # Run the CLI with the given arguments and return (returncode, stdout, stderr). Returns None
+    # when the worker died (or was killed) before answering.
+    def execute(self, args):
+        try:
+            self.process.stdin.write(json.dumps(args) + "\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (OSError, ValueError):
+            return None
+        if not line:
+            return None
+        try:
+            reply = json.loads(line)
+            return reply["returncode"], reply["stdout"], reply["stderr"]
+        except (ValueError, KeyError, TypeError):
+            # Something wrote straight to the worker's stdout; the protocol cannot be trusted any more
+            self.process.kill()
+            raise BackendError(f"CLI worker sent a malformed reply: {line[:200]!r}")
+
+    def kill(self):
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class PersistentCliBackend(CliBackend):
+    """Runs CLI commands in long-lived worker processes instead of spawning the CLI for each one.
+
+    Each worker (see cli_worker.py) loads the CLI once and then runs
+    commands sent over a pipe, so a command no longer pays for interpreter
+    start-up and imports. Output and errors are handled exactly like
+    CliBackend's. A worker that times out or is cancelled is killed and
+    replaced on the next command.
+    """
+
+    name = BACKEND_CLI_WORKER
+
+    def __init__(self, cli_path, host, port, client_id, client_secret, workers=DEFAULT_CLI_WORKERS,
+                 module=CLI_WORKER_MODULE, python=CLI_WORKER_PYTHON, **kwargs):
+        super().__init__(cli_path, host, port, client_id, client_secret, **kwargs)
+        target = ["--module", module] if module else ["--script", cli_path]
+        self.worker_command = [python, CLI_WORKER_SCRIPT] + target
+        # Commands beyond the number of workers wait for one to become idle
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._idle = []
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self):
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                self._workers.discard(worker)
+        worker = CliWorker(self.worker_command)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _release(self, worker, healthy):
+        with self._lock:
+            if healthy and not self._closed and worker.alive:
+                self._idle.append(worker)
+                return
+            self._workers.discard(worker)
+        worker.kill()
+
+    def _communicate(self, args):
+        with self._slots:
+            worker = self._acquire()
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                worker.process.kill()
+
+            watchdog = threading.Timer(self.timeout, kill_on_timeout)
+            watchdog.daemon = True
+            remove_hook = tasks.on_cancel(worker.process.kill)
+            reply = None
+            try:
+                watchdog.start()
+                with metrics.span("cli.run"):
+                    # The arguments, client secret included, travel over the pipe rather than a command line
+                    reply = worker.execute(args[1:])
+            finally:
+                watchdog.cancel()
+                remove_hook()
+                self._release(worker, reply is not None)
+        if reply is None:
+            if tasks.cancelled():
+                raise BackendError("CLI command cancelled")
+            if timed_out.is_set():
+                raise BackendError(f"CLI command timed out after {self.timeout:.0f}s", transient=True)
+            raise BackendError("CLI worker exited unexpectedly", transient=True)
+        return self._result(*reply)
+
+    # A worker answers with the whole output at once, so records are parsed after the command finished
+    def _stream(self, *command, on_parse_error=None):
+        yield from iter_ndjson(self._run(*command).splitlines(), on_parse_error)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+        for worker in workers:
+            worker.kill()
+
+
+class RestBackend(PolarisBackend):
+    """Talks to the Polaris management API over a pooled keep-alive HTTP session."""
+
+    name = BACKEND_REST
+
+    def __init__(self, host, port, client_id, client_secret, pool_size=DEFAULT_POOL_SIZE,
+                 timeout=DEFAULT_HTTP_TIMEOUT, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        self.base_url = f"http://{host}:{port}"
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.timeout = (connect_timeout, timeout)
+        self.breaker = resilience.get_breaker(f"{host}:{port}")
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.token_manager = auth.get_token_manager(host, port, client_id, client_secret, self.base_url)
+        # (url, params) -> (ETag, body) of recent GET responses that carried an ETag
+        self._etags = OrderedDict()
+        self._etags_lock = threading.Lock()
+
+    # Send a request to the management API (or api_path) and return the decoded JSON body. GETs are
+    # retried with backoff on transient failures, and are conditional when the server sent an ETag
+    # before (a 304 reuses the stored body). A timeout keyword overrides the backend's timeouts.
+    def request(self, method, path, api_path=MANAGEMENT_API_PATH, **kwargs):
+        if method == "GET":
+            return resilience.call_with_retry(lambda: self._request(method, path, api_path, **kwargs), is_transient,
+                                              description=f"GET {path}")
+        return self._request(method, path, api_path, **kwargs)
+
+    def _request(self, method, path, api_path=MANAGEMENT_API_PATH, **kwargs):
+        url = self.base_url + api_path + path
+        logging.debug(f"REST request: {method} {url}")
+        etag_key = (url, tuple(sorted((kwargs.get("params") or {}).items()))) if method == "GET" else None
+        cached = self._cached_etag(etag_key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        # Checked once per request: a half-open circuit lets exactly one call through
+        check_circuit(self.breaker)
+        token = self._access_token()
+        response = self._send(method, url, token, headers, **kwargs)
+        if response.status_code == 401:
+            # The token may have been revoked or expired early; retry once with a fresh one
+            self.token_manager.invalidate(token)
+            response = self._send(method, url, self._access_token(), headers, **kwargs)
+        if response.status_code == 304 and cached:
+            logging.debug(f"REST request {method} {path} not modified")
+            content = cached[1]
+        elif not response.ok:
+            logging.error(f"REST Error: {response.status_code} {response.text}")
+            raise BackendError(_error_message(response), transient=response.status_code in TRANSIENT_STATUSES)
+        else:
+            logging.info(f"REST request {method} {path} executed successfully")
+            content = response.content
+            if etag_key and response.headers.get("ETag"):
+                self._store_etag(etag_key, response.headers["ETag"], content)
+        if not content:
+            return {}
+        with metrics.span("json.parse"):
+            return json.loads(content)
+
+    def _cached_etag(self, key):
+        if key is None:
+            return None
+        with self._etags_lock:
+            return self._etags.get(key)
+
+    def _store_etag(self, key, etag, content):
+        with self._etags_lock:
+            self._etags[key] = (etag, content)
+            self._etags.move_to_end(key)
+            while len(self._etags) > DEFAULT_ETAG_CACHE_SIZE:
+                self._etags.popitem(last=False)
+
+    def _access_token(self):
+        try:
+            with metrics.span("rest.auth"):
+                return self.token_manager.token()
+        except auth.TokenError as e:
+            # An unreachable token endpoint is as unhealthy as the rest of the server
+            error = BackendError(str(e), transient=isinstance(e.__cause__, requests.RequestException))
+            record_outcome(self.breaker, error)
+            raise error from e
+
+    # Send a request and read its body. The body is streamed so that cancelling the task waiting for
+    # it closes the connection instead of downloading the rest of a large listing.
+    def _send(self, method, url, token, headers=None, **kwargs):
+        headers = dict(headers or {}, Authorization=f"Bearer {token}")
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            with metrics.span(f"rest.{method}"):
+                response = self.session.request(method, url, headers=headers, stream=True, **kwargs)
+                remove_hook = tasks.on_cancel(response.close)
+                try:
+                    response.content
+                finally:
+                    remove_hook()
+        except Exception as e:
+            if tasks.cancelled():
+                raise BackendError(f"Request to {url} cancelled") from e
+            if isinstance(e, requests.RequestException):
+                error = BackendError(f"Request to {url} failed: {e}", transient=True)
+                record_outcome(self.breaker, error)
+                raise error from e
+            raise
+        record_outcome(self.breaker, BackendError(response.reason, transient=True)
+                       if response.status_code in TRANSIENT_STATUSES else None)
+        return response
+
+    # Fetch one page of a listing; an empty page token asks the server to start paging
+    def list_page(self, path, field, page_token=None, page_size=None, api_path=MANAGEMENT_API_PATH, params=None):
+        params = dict(params or {}, pageToken=page_token or "")
+        if page_size:
+            params["pageSize"] = page_size
+        body = self.request("GET", path, api_path=api_path, params=params)
+        # Servers that do not page ignore the parameters and return everything with no token
+        return body.get(field, []), body.get("nextPageToken") or body.get("next-page-token")
+
+    # Fetch every page of a listing
+    def list_all(self, path, field, api_path=MANAGEMENT_API_PATH, params=None):
+        records, page_token = self.list_page(path, field, api_path=api_path, params=params)
+        while page_token:
+            page, page_token = self.list_page(path, field, page_token, api_path=api_path, params=params)
+            records.extend(page)
+        return records
+
+    def list_catalogs(self):
+        return self.request("GET", "/catalogs").get("catalogs", [])
+
+    def list_catalogs_page(self, page_token=None, page_size=None):
+        return self.list_page("/catalogs", "catalogs", page_token, page_size)
+
+    def create_catalog(self, name, catalog_type, storage_type, default_base_location, options=None):
+        options = options or {}
+        storage_config = {"storageType": storage_type}
+        if options.get("allowed_location"):
+            storage_config["allowedLocations"] = [options["allowed_location"]]
+        for option, (_, field) in CATALOG_OPTIONS.items():
+            if field and options.get(option):
+                storage_config[field] = options[option]
+        catalog = {
+            "name": name,
+            "type": catalog_type,
+            "readOnly": False,
+            "properties": {"default-base-location": default_base_location},
+            "storageConfigInfo": storage_config,
+        }
+        if options.get("remote_url"):
+            catalog["remoteUrl"] = options["remote_url"]
+        return self.request("POST", "/catalogs", json={"catalog": catalog})
+
+    def update_catalog(self, name, properties):
+        catalog = self.request("GET", f"/catalogs/{_quote(name)}")
+        body = {
+            "currentEntityVersion": catalog.get("entityVersion"),
+            "properties": dict(catalog.get("properties", {}), **properties),
+        }
+        return self.request("PUT", f"/catalogs/{_quote(name)}", json=body)
+
+    def delete_catalog(self, name):
+        return self.request("DELETE", f"/catalogs/{_quote(name)}")
+
+    def list_principals(self):
+        return self.request("GET", "/principals").get("principals", [])
+
+    def list_principals_page(self, page_token=None, page_size=None):
+        return self.list_page("/principals", "principals", page_token, page_size)
+
+    def create_principal(self, name):
+        return self.request("POST", "/principals", json={"principal": {"name": name}})
+
+    def delete_principal(self, name):
+        return self.request("DELETE", f"/principals/{_quote(name)}")
+
+    def list_principal_roles(self, principal=None):
+        if principal:
+            return self.request("GET", f"/principals/{_quote(principal)}/principal-roles").get("roles", [])
+        return self.request("GET", "/principal-roles").get("roles", [])
+
+    def create_principal_role(self, name, properties=None):
+        principal_role = {"name": name, "properties": properties or {}}
+        return self.request("POST", "/principal-roles", json={"principalRole": principal_role})
+
+    def update_principal_role(self, name, properties):
+        principal_role = self.request("GET", f"/principal-roles/{_quote(name)}")
+        body = {
+            "currentEntityVersion": principal_role.get("entityVersion"),
+            "properties": dict(principal_role.get("properties", {}), **properties),
+        }
+        return self.request("PUT", f"/principal-roles/{_quote(name)}", json=body)
+
+    def delete_principal_role(self, name):
+        return self.request("DELETE", f"/principal-roles/{_quote(name)}")
+
+    def grant_principal_role(self, principal_role, principal):
+        return self.request("PUT", f"/principals/{_quote(principal)}/principal-roles",
+                            json={"principalRole": {"name": principal_role}})
+
+    def revoke_principal_role(self, principal_role, principal):
+        return self.request("DELETE", f"/principals/{_quote(principal)}/principal-roles/{_quote(principal_role)}")
+
+    def list_catalog_roles(self, catalog):
+        return self.request("GET", f"/catalogs/{_quote(catalog)}/catalog-roles").get("roles", [])
+
+    def list_grants(self, catalog, catalog_role):
+        path = f"/catalogs/{_quote(catalog)}/catalog-roles/{_quote(catalog_role)}/grants"
+        return self.request("GET", path).get("grants", [])
+
+    def list_namespaces(self, catalog, parent=None):
+        params = {"parent": NAMESPACE_SEPARATOR.join(parent)} if parent else None
+        return self.list_all(f"/{_quote(catalog)}/namespaces", "namespaces", CATALOG_API_PATH, params)
+
+    def list_tables(self, catalog, namespace):
+        path = f"/{_quote(catalog)}/namespaces/{_quote(NAMESPACE_SEPARATOR.join(namespace))}/tables"
+        return [identifier["name"] for identifier in self.list_all(path, "identifiers", CATALOG_API_PATH)]
+
+    def close(self):
+        self.session.close()
+
+
+def _quote(segment):
+    return quote(segment, safe="")
+
+
+# Extract a readable message from a Polaris error response
+def _error_message(response):
+    try:
+        error = response.json().get("error", {})
+        if error.get("message"):
+            return f"{response.status_code} {error.get('type', '')}: {error['message']}"
+    except ValueError:
+        pass
+    return f"{response.status_code} {response.reason}: {response.text}"
+
+
+# Backends are reused for identical connection settings so the REST session stays warm
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+# Function to get a (cached) backend for the given connection settings
+def get_backend(kind, cli_path, host, port, client_id, client_secret):
+    key = (kind, cli_path, host, port, client_id, client_secret)
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            if kind == BACKEND_CLI:
+                backend = CliBackend(cli_path, host, port, client_id, client_secret)
+            elif kind == BACKEND_CLI_WORKER:
+                backend = PersistentCliBackend(cli_path, host, port, client_id, client_secret)
+            elif kind == BACKEND_REST:
+                backend = RestBackend(host, port, client_id, client_secret)
+            else:
+                raise BackendError(f"Unknown backend: {kind}")
+            _backends[key] = backend
+        return backend
@@ -0,0 +1,220 @@
+"""Headless batch mode: run the GUI's operations from scripts and automation.
+
+    python main.py list principals --format csv
+    python main.py create-principal alice bob
+    python main.py grant data_engineer alice bob
+    python main.py apply manifest.yaml
+    python main.py compare principal-roles --profiles dev,staging,prod --side-by-side --check
+
+Connection settings default to the same POLARIS_* environment variables as
+the GUI, or come from a saved profile (--profile). Mutations over several names run concurrently, and the exit status
+is 1 when any of them failed.
+"""
+import argparse
+import logging
+import sys
+
+import assignments
+import bulk
+import core
+import logs
+import manifest
+import profiles
+from backends import CATALOG_OPTIONS, BackendError
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Manage Polaris without the GUI.")
+    parser.add_argument("--backend", default=core.DEFAULT_BACKEND, help="REST, CLI or \"CLI Worker\"")
+    parser.add_argument("--cli-path", default=core.DEFAULT_POLARIS_CLI_PATH)
+    parser.add_argument("--host", default=core.DEFAULT_HOST)
+    parser.add_argument("--port", default=core.DEFAULT_PORT)
+    parser.add_argument("--client-id", default=core.DEFAULT_CLIENT_ID)
+    parser.add_argument("--client-secret", default=core.DEFAULT_CLIENT_SECRET,
+                        help="Prefer POLARIS_CLIENT_SECRET; command lines are visible to other users")
+    parser.add_argument("--profile", help="Use a saved connection profile instead of the options above")
+    parser.add_argument("--profiles-file", default=profiles.DEFAULT_PROFILES_PATH)
+    parser.add_argument("--parallelism", type=int, default=bulk.DEFAULT_PARALLELISM,
+                        help="Operations sent to Polaris at the same time")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List catalogs, principals or principal roles")
+    list_parser.add_argument("entity", choices=sorted(core.LISTINGS))
+    list_parser.add_argument("--principal", help="List the principal roles assigned to this principal")
+    list_parser.add_argument("--format", choices=core.OUTPUT_FORMATS, default="table")
+
+    create_catalog = commands.add_parser("create-catalog", help="Create a catalog")
+    create_catalog.add_argument("name")
+    create_catalog.add_argument("--default-base-location", required=True)
+    create_catalog.add_argument("--type", default="INTERNAL", choices=("INTERNAL", "EXTERNAL"))
+    create_catalog.add_argument("--storage-type", default="FILE", choices=("S3", "GCS", "AZURE", "FILE"))
+    for option, (flag, _) in CATALOG_OPTIONS.items():
+        create_catalog.add_argument(flag, dest=option)
+
+    create_principal = commands.add_parser("create-principal", help="Create principals")
+    create_principal.add_argument("names", nargs="+")
+
+    create_role = commands.add_parser("create-principal-role", help="Create a principal role")
+    create_role.add_argument("name")
+    create_role.add_argument("--property", action="append", default=[], help="key=value, may be repeated")
+
+    delete = commands.add_parser("delete", help="Delete catalogs, principals or principal roles")
+    delete.add_argument("entity", choices=sorted(core.LISTINGS))
+    delete.add_argument("names", nargs="+")
+
+    for action in ("grant", "revoke"):
+        command = commands.add_parser(action, help=f"{action.capitalize()} a principal role for principals")
+        command.add_argument("principal_role")
+        command.add_argument("principals", nargs="+")
+
+    matrix = commands.add_parser("assignments", help="List the principal roles of every principal")
+    matrix.add_argument("--format", choices=("table", "csv", "json"), default="table")
+
+    for action in ("plan", "apply"):
+        command = commands.add_parser(action, help=f"{action.capitalize()} a manifest (YAML, JSON or CSV)")
+        command.add_argument("manifest")
+
+    compare = commands.add_parser("compare", help="List an entity in several environments at the same time")
+    compare.add_argument("entity", choices=sorted(core.LISTINGS))
+    compare.add_argument("--profiles", required=True, help="Comma-separated saved profiles")
+    compare.add_argument("--side-by-side", action="store_true", help="One row per name with a column per environment")
+    compare.add_argument("--check", action="store_true", help="Exit with status 1 when the environments differ")
+    compare.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    return parser
+
+
+def run_list(backend, args):
+    operation, columns, row = core.LISTINGS[args.entity]
+    if args.principal:
+        if args.entity != "principal-roles":
+            raise BackendError("--principal can only be used to list principal roles.")
+        records = backend.list_principal_roles(args.principal)
+    else:
+        records = getattr(backend, operation)()
+    print(core.format_records(records, columns, row, args.format))
+    return 0
+
+
+# Function to run fn for each item concurrently, printing one line per failure; returns the exit status
+def run_many(fn, items, parallelism, describe=lambda item: " ".join(item)):
+    succeeded, failed = bulk.summarize(list(bulk.run_bulk(fn, items, parallelism)))
+    for item, error in failed:
+        print(f"Failed: {describe(item)}: {error}", file=sys.stderr)
+    print(f"{len(succeeded)} of {len(items)} succeeded.")
+    return 1 if failed else 0
+
+
+def run_assignments(backend, args):
+    index = assignments.AssignmentIndex()
+    failures = 0
+    for principal_name, role_names, error in assignments.iter_assignments(backend, parallelism=args.parallelism):
+        if error is None:
+            index.set_roles(principal_name, role_names)
+        else:
+            failures += 1
+            print(f"Failed: {principal_name}: {error}", file=sys.stderr)
+    records = [{"principal": principal, "principal_role": role} for principal, role in index.pairs()]
+    print(core.format_records(records, ("principal", "principal_role"),
+                              lambda record: (record["principal"], record["principal_role"]), args.format))
+    return 1 if failures else 0
+
+
+def run_manifest(backend, args):
+    steps = manifest.plan_manifest(backend, args.manifest, args.parallelism)
+    for step in steps:
+        print(f"{step} {step.details}".rstrip())
+    if not steps:
+        print("No changes. Polaris already matches the manifest.")
+    if args.command == "plan" or not steps:
+        return 0
+    failures = 0
+    for step, error in manifest.execute_plan(backend, steps, args.parallelism):
+        if error is not None:
+            failures += 1
+            print(f"Failed: {step}: {error}", file=sys.stderr)
+    print(f"{len(steps) - failures} of {len(steps)} steps succeeded.")
+    return 1 if failures else 0
+
+
+def run_compare(args):
+    connections = profiles.select_profiles([name.strip() for name in args.profiles.split(",") if name.strip()],
+                                           args.profiles_file)
+    operation, columns, row = core.LISTINGS[args.entity]
+    results = {}
+    failures = 0
+    for name, records, error in profiles.fan_out(connections, operation):
+        if error is None:
+            results[name] = records
+        else:
+            failures += 1
+            print(f"Failed: {name}: {error}", file=sys.stderr)
+    # Environments in the order they were given, not the order they answered
+    results = {name: results[name] for name in connections if name in results}
+    if not args.side_by_side:
+        records = [dict(record, environment=name) for name, record in profiles.merge_results(results)]
+        print(core.format_records(records, ("Environment",) + columns,
+                                  lambda record: (record["environment"],) + tuple(row(record)), args.format))
+        return 1 if failures else 0
+    rows = profiles.side_by_side(results)
+    records = [{"name": name, "environments": {environment: record is not None for environment, record in by_environment.items()},
+                "drift": drifted} for name, by_environment, drifted in rows]
+    print(core.format_records(
+        records, ("Name",) + tuple(results) + ("Drift",),
+        lambda record: ((record["name"],) + tuple("present" if present else "missing" for present in record["environments"].values())
+                        + ("DRIFT" if record["drift"] else "",)),
+        args.format
+    ))
+    drifted = sum(1 for record in records if record["drift"])
+    print(f"{drifted} of {len(records)} {args.entity} differ between {', '.join(results)}.", file=sys.stderr)
+    return 1 if failures or (args.check and drifted) else 0
+
+
+def run(backend, args):
+    if args.command == "list":
+        return run_list(backend, args)
+    if args.command == "create-catalog":
+        options = {option: getattr(args, option) for option in CATALOG_OPTIONS if getattr(args, option)}
+        backend.create_catalog(args.name, args.type, args.storage_type, args.default_base_location, options)
+        print(f"Created catalog {args.name}.")
+        return 0
+    if args.command == "create-principal":
+        return run_many(backend.create_principal, [(name,) for name in args.names], args.parallelism)
+    if args.command == "create-principal-role":
+        properties = dict(pair.split("=", 1) for pair in args.property if "=" in pair)
+        backend.create_principal_role(args.name, properties)
+        print(f"Created principal role {args.name}.")
+        return 0
+    if args.command == "delete":
+        operation = {"catalogs": backend.delete_catalog, "principals": backend.delete_principal,
+                     "principal-roles": backend.delete_principal_role}[args.entity]
+        return run_many(operation, [(name,) for name in args.names], args.parallelism)
+    if args.command in ("grant", "revoke"):
+        operation = backend.grant_principal_role if args.command == "grant" else backend.revoke_principal_role
+        return run_many(operation, [(args.principal_role, principal) for principal in args.principals],
+                        args.parallelism, describe=lambda item: f"{item[0]} / {item[1]}")
+    if args.command == "assignments":
+        return run_assignments(backend, args)
+    return run_manifest(backend, args)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Failures are reported on stderr below; the log file still gets the details
+    logs.setup_logging_from_env(console_level="CRITICAL")
+    try:
+        if args.command == "compare":
+            return run_compare(args)
+        if args.profile:
+            connection = profiles.select_profiles([args.profile], args.profiles_file)[args.profile]
+        else:
+            connection = core.Connection(args.backend, args.cli_path, args.host, args.port, args.client_id,
+                                         args.client_secret)
+        return run(connection.get_backend(), args)
+    except (BackendError, manifest.ManifestError, profiles.ProfileError) as e:
+        logging.error(f"{args.command} failed: {e}")
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
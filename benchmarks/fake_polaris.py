@@ -0,0 +1,327 @@
+"""Local stand-in for a Polaris server, for benchmarks.
+
+Serves the parts of the management API, the Iceberg REST catalog API and
+the OAuth token endpoint that the GUI uses, backed by generated in-memory
+entities. Every request can be delayed to simulate a remote server.
+
+    python benchmarks/fake_polaris.py --principals 5000 --latency 0.02 --port 8181
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+MANAGEMENT_PREFIX = "/api/management/v1"
+CATALOG_PREFIX = "/api/catalog/v1"
+NAMESPACE_SEPARATOR = "\x1f"
+
+
+class FakePolarisState:
+    """Generated catalogs, principals, principal roles and their assignments."""
+
+    def __init__(self, catalogs=100, principals=1000, principal_roles=50, roles_per_principal=3,
+                 namespaces=10, tables=5):
+        self.lock = threading.Lock()
+        now = int(time.time() * 1000)
+        self.catalogs = {}
+        for i in range(catalogs):
+            name = f"catalog_{i:05d}"
+            self.catalogs[name] = {
+                "name": name,
+                "type": "INTERNAL",
+                "properties": {"default-base-location": f"file:///tmp/{name}"},
+                "storageConfigInfo": {"storageType": "FILE", "allowedLocations": [f"file:///tmp/{name}"]},
+                "createTimestamp": now,
+                "entityVersion": 1,
+            }
+        self.principals = {}
+        for i in range(principals):
+            self.add_principal(f"principal_{i:06d}", now)
+        self.principal_roles = {}
+        for i in range(principal_roles):
+            name = f"role_{i:04d}"
+            self.principal_roles[name] = {"name": name, "properties": {"team": f"team_{i % 10}"},
+                                          "createTimestamp": now, "entityVersion": 1}
+        role_names = sorted(self.principal_roles)
+        self.assignments = {
+            name: {role_names[(index + offset) % len(role_names)] for offset in range(roles_per_principal)}
+            if role_names else set()
+            for index, name in enumerate(sorted(self.principals))
+        }
+        self.namespaces = namespaces
+        self.tables = tables
+
+    def add_principal(self, name, now=None):
+        principal = {
+            "name": name,
+            "clientId": uuid.uuid4().hex[:16],
+            "properties": {},
+            "createTimestamp": now or int(time.time() * 1000),
+            "entityVersion": 1,
+        }
+        self.principals[name] = principal
+        return principal
+
+
+class FakePolarisHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs add ~40 ms per keep-alive request
+    disable_nagle_algorithm = True
+
+    # Set on the server: state, latency
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        if url.path == CATALOG_PREFIX + "/oauth/tokens":
+            return self._send(200, {"access_token": uuid.uuid4().hex, "token_type": "bearer", "expires_in": 3600})
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._error(401, "NotAuthorizedException", "Missing bearer token")
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            return self._error(400, "BadRequestException", "Malformed JSON body")
+        if url.path.startswith(MANAGEMENT_PREFIX + "/"):
+            parts = [unquote(part) for part in url.path[len(MANAGEMENT_PREFIX) + 1:].split("/")]
+            handler = self._management
+        elif url.path.startswith(CATALOG_PREFIX + "/"):
+            parts = [unquote(part) for part in url.path[len(CATALOG_PREFIX) + 1:].split("/")]
+            handler = self._iceberg
+        else:
+            return self._error(404, "NotFoundException", f"Unknown path {url.path}")
+        with self.state.lock:
+            status, payload = handler(method, parts, query, body)
+        if method == "GET" and status == 200:
+            # Listings carry an ETag so clients can poll with conditional requests
+            data = json.dumps(payload).encode()
+            etag = f'"{hashlib.sha1(data).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, None, {"ETag": etag})
+            return self._send(status, payload, {"ETag": etag})
+        self._send(status, payload)
+
+    def _management(self, method, parts, query, body):
+        state = self.state
+        if parts == ["catalogs"]:
+            if method == "GET":
+                return self._page(state.catalogs, "catalogs", query)
+            catalog = dict(body.get("catalog", {}), createTimestamp=int(time.time() * 1000), entityVersion=1)
+            return self._create(state.catalogs, catalog)
+        if parts == ["principals"]:
+            if method == "GET":
+                return self._page(state.principals, "principals", query)
+            name = body.get("principal", {}).get("name")
+            if name in state.principals:
+                return _conflict(name)
+            principal = state.add_principal(name)
+            state.assignments[name] = set()
+            return 201, {"principal": principal,
+                         "credentials": {"clientId": principal["clientId"], "clientSecret": uuid.uuid4().hex}}
+        if parts == ["principal-roles"]:
+            if method == "GET":
+                return self._page(state.principal_roles, "roles", query)
+            role = dict(body.get("principalRole", {}), createTimestamp=int(time.time() * 1000), entityVersion=1)
+            return self._create(state.principal_roles, role)
+        if len(parts) == 2 and parts[0] in ("catalogs", "principals", "principal-roles"):
+            collection = {"catalogs": state.catalogs, "principals": state.principals,
+                          "principal-roles": state.principal_roles}[parts[0]]
+            return self._entity(collection, parts[1], method, body)
+        if len(parts) >= 3 and parts[0] == "principals" and parts[2] == "principal-roles":
+            return self._assignments(method, parts[1], parts[3] if len(parts) > 3 else None, body)
+        if len(parts) >= 3 and parts[0] == "catalogs" and parts[2] == "catalog-roles":
+            if parts[1] not in state.catalogs:
+                return _not_found("catalog", parts[1])
+            if len(parts) == 3:
+                return 200, {"roles": [{"name": "catalog_admin", "entityVersion": 1},
+                                       {"name": "catalog_reader", "entityVersion": 1}]}
+            if len(parts) == 5 and parts[4] == "grants":
+                privileges = (["CATALOG_MANAGE_CONTENT"] if parts[3] == "catalog_admin"
+                              else ["TABLE_READ_DATA", "NAMESPACE_LIST"])
+                return 200, {"grants": [{"type": "catalog", "privilege": privilege} for privilege in privileges]}
+        return _not_found("path", "/".join(parts))
+
+    def _iceberg(self, method, parts, query, body):
+        state = self.state
+        if len(parts) < 2 or parts[0] not in state.catalogs:
+            return _not_found("catalog", parts[0] if parts else "")
+        if parts[1:] == ["namespaces"]:
+            parent = query.get("parent")
+            depth = len(parent.split(NAMESPACE_SEPARATOR)) if parent else 0
+            # Two levels of namespaces
+            if depth >= 2:
+                return 200, {"namespaces": []}
+            prefix = parent.split(NAMESPACE_SEPARATOR) if parent else []
+            namespaces = [prefix + [f"ns_{i:04d}"] for i in range(state.namespaces)]
+            return self._page_list(namespaces, "namespaces", query, token_field="next-page-token")
+        if len(parts) == 4 and parts[1] == "namespaces" and parts[3] == "tables":
+            namespace = parts[2].split(NAMESPACE_SEPARATOR)
+            identifiers = [{"namespace": namespace, "name": f"table_{i:04d}"} for i in range(state.tables)]
+            return self._page_list(identifiers, "identifiers", query, token_field="next-page-token")
+        return _not_found("path", "/".join(parts))
+
+    def _assignments(self, method, principal, role, body):
+        state = self.state
+        if principal not in state.principals:
+            return _not_found("principal", principal)
+        assigned = state.assignments.setdefault(principal, set())
+        if method == "GET":
+            return 200, {"roles": [state.principal_roles[name] for name in sorted(assigned)
+                                   if name in state.principal_roles]}
+        if method == "PUT":
+            role = body.get("principalRole", {}).get("name")
+            if role not in state.principal_roles:
+                return _not_found("principal role", role)
+            assigned.add(role)
+            return 201, {}
+        if method == "DELETE" and role:
+            assigned.discard(role)
+            return 204, None
+        return _not_found("path", principal)
+
+    def _entity(self, collection, name, method, body):
+        entity = collection.get(name)
+        if entity is None:
+            return _not_found("entity", name)
+        if method == "GET":
+            return 200, entity
+        if method == "DELETE":
+            del collection[name]
+            self.state.assignments.pop(name, None)
+            return 204, None
+        if method == "PUT":
+            if body.get("currentEntityVersion") != entity["entityVersion"]:
+                return 409, _error_body(409, "CommitFailedException", "Entity version mismatch")
+            entity["properties"] = body.get("properties", entity.get("properties", {}))
+            entity["entityVersion"] += 1
+            return 200, entity
+        return _not_found("method", method)
+
+    def _create(self, collection, entity):
+        name = entity.get("name")
+        if not name:
+            return 400, _error_body(400, "BadRequestException", "Missing name")
+        if name in collection:
+            return _conflict(name)
+        collection[name] = entity
+        return 201, entity
+
+    def _page(self, collection, field, query):
+        return self._page_list([collection[name] for name in sorted(collection)], field, query,
+                               token_field="nextPageToken")
+
+    # Page through records when the client sent pageToken; everything otherwise
+    def _page_list(self, records, field, query, token_field):
+        if "pageToken" not in query or not query.get("pageSize"):
+            return 200, {field: records}
+        start = int(query["pageToken"] or 0)
+        end = start + int(query["pageSize"])
+        return 200, {field: records[start:end], token_field: str(end) if end < len(records) else None}
+
+    def _error(self, status, error_type, message):
+        self._send(status, _error_body(status, error_type, message))
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _error_body(status, error_type, message):
+    return {"error": {"message": message, "type": error_type, "code": status}}
+
+
+def _not_found(kind, name):
+    return 404, _error_body(404, "NotFoundException", f"{kind} {name} not found")
+
+
+def _conflict(name):
+    return 409, _error_body(409, "AlreadyExistsException", f"{name} already exists")
+
+
+class FakePolarisServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, state, host="127.0.0.1", port=0, latency=0.0):
+        super().__init__((host, port), FakePolarisHandler)
+        self.state = state
+        self.latency = latency
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    # Serve requests on a background thread
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="fake-polaris", daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def add_arguments(parser):
+    parser.add_argument("--catalogs", type=int, default=100, help="Number of catalogs")
+    parser.add_argument("--principals", type=int, default=1000, help="Number of principals")
+    parser.add_argument("--roles", type=int, default=50, help="Number of principal roles")
+    parser.add_argument("--roles-per-principal", type=int, default=3, help="Roles assigned to each principal")
+    parser.add_argument("--namespaces", type=int, default=10, help="Namespaces per catalog and namespace level")
+    parser.add_argument("--tables", type=int, default=5, help="Tables per namespace")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+
+
+def state_from_arguments(args):
+    return FakePolarisState(args.catalogs, args.principals, args.roles, args.roles_per_principal,
+                            args.namespaces, args.tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8181)
+    args = parser.parse_args()
+    server = FakePolarisServer(state_from_arguments(args), args.host, args.port, args.latency)
+    print(f"Fake Polaris listening on http://{args.host}:{server.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Stand-in for the ``polaris`` CLI, for benchmarks.
+
+Accepts the commands the GUI runs and forwards them to the server over
+REST, printing one JSON record per line like the real CLI. Select it with
+POLARIS_CLI_PATH=benchmarks/fake_polaris_cli.py.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import BackendError, RestBackend  # noqa: E402
+
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog="polaris")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="8181")
+    parser.add_argument("--client-id", required=True)
+    parser.add_argument("--client-secret", required=True)
+    parser.add_argument("command", nargs="+")
+    # Options of the subcommands, accepted anywhere on the command line
+    for option in ("--principal", "--catalog", "--catalog-role", "--parent", "--type", "--storage-type",
+                   "--default-base-location"):
+        parser.add_argument(option)
+    for option in ("--property", "--set-property"):
+        parser.add_argument(option, action="append", default=[])
+    return parser.parse_known_intermixed_args(argv)[0]
+
+
+def run(backend, args):
+    group, action, *rest = args.command + [None]
+    name = rest[0] if rest else None
+    if group == "catalogs":
+        if action == "list":
+            return backend.list_catalogs()
+        if action == "create":
+            return [backend.create_catalog(name, args.type or "INTERNAL", args.storage_type or "FILE",
+                                           args.default_base_location)]
+        if action == "update":
+            properties = _properties(args.set_property)
+            if args.default_base_location:
+                properties["default-base-location"] = args.default_base_location
+            return [backend.update_catalog(name, properties)]
+        if action == "delete":
+            return [backend.delete_catalog(name)]
+    if group == "principals":
+        if action == "list":
+            return backend.list_principals()
+        if action == "create":
+            return [backend.create_principal(name)]
+        if action == "delete":
+            return [backend.delete_principal(name)]
+    if group == "principal-roles":
+        if action == "list":
+            return backend.list_principal_roles(args.principal)
+        if action == "create":
+            return [backend.create_principal_role(name, _properties(args.property))]
+        if action == "update":
+            return [backend.update_principal_role(name, _properties(args.set_property))]
+        if action == "delete":
+            return [backend.delete_principal_role(name)]
+        if action == "grant":
+            return [backend.grant_principal_role(name, args.principal)]
+        if action == "revoke":
+            return [backend.revoke_principal_role(name, args.principal)]
+    if group == "catalog-roles" and action == "list":
+        return backend.list_catalog_roles(name)
+    if group == "privileges" and action == "list":
+        return backend.list_grants(args.catalog, args.catalog_role)
+    if group == "namespaces" and action == "list":
+        return backend.list_namespaces(args.catalog, args.parent.split(".") if args.parent else None)
+    raise BackendError(f"Unsupported command: {' '.join(args.command)}")
+
+
+def _properties(pairs):
+    return dict(pair.split("=", 1) for pair in pairs if "=" in pair)
+
+
+def main(argv=None):
+    args = parse_arguments(sys.argv[1:] if argv is None else argv)
+    backend = RestBackend(args.host, args.port, args.client_id, args.client_secret)
+    try:
+        for record in run(backend, args):
+            if record:
+                print(json.dumps(record))
+    except BackendError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        backend.close()
+        backend.token_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
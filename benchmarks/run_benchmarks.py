@@ -0,0 +1,195 @@
+"""Benchmarks for listing, refreshing, selection, bulk actions and table rendering.
+
+Starts a fake Polaris server (see fake_polaris.py) with generated entities
+and times the GUI's backend operations against it over REST and through
+the fake CLI. Treeview rendering is timed when a display is available;
+run under a virtual display in CI:
+
+    xvfb-run python benchmarks/run_benchmarks.py --principals 5000 --output results.json
+
+Pass --baseline with an earlier --output file to fail when a benchmark
+got slower than the tolerance allows.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import backends  # noqa: E402
+import bulk  # noqa: E402
+from fake_polaris import FakePolarisServer, add_arguments, state_from_arguments  # noqa: E402
+from metrics import registry as metrics  # noqa: E402
+
+FAKE_CLI_PATH = os.path.join(BENCHMARK_DIR, "fake_polaris_cli.py")
+CLIENT_ID = "benchmark"
+CLIENT_SECRET = "benchmark-secret"
+
+
+class Results:
+    """Timings per benchmark, in seconds."""
+
+    def __init__(self):
+        self.timings = {}
+
+    # Call fn `repeat` times and record each duration under name
+    def measure(self, name, fn, repeat=1):
+        timings = self.timings.setdefault(name, [])
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<45} median {statistics.median(timings) * 1000:10.1f} ms  (n={len(timings)})", flush=True)
+
+    def summary(self):
+        return {
+            name: {"median": statistics.median(timings), "min": min(timings), "max": max(timings), "n": len(timings)}
+            for name, timings in self.timings.items()
+        }
+
+
+def bench_backend(results, backend, args, repeat, selections, bulk_size):
+    prefix = backend.name
+    results.measure(f"{prefix} list catalogs", backend.list_catalogs)
+    results.measure(f"{prefix} list principals", backend.list_principals)
+    results.measure(f"{prefix} list principal roles", backend.list_principal_roles)
+    # Later runs reuse warm connections and tokens, like a refresh in the GUI
+    results.measure(f"{prefix} refresh principals", backend.list_principals, repeat)
+    if backend.name == backends.BACKEND_REST and args.page_size:
+        results.measure(f"{prefix} first page of principals",
+                        lambda: backend.list_principals_page(None, args.page_size), repeat)
+
+    # Selecting a principal loads its assigned roles (load_assigned_roles)
+    principal_names = iter([f"principal_{i:06d}" for i in range(min(selections, args.principals))])
+    results.measure(f"{prefix} select principal", lambda: backend.list_principal_roles(next(principal_names)),
+                    min(selections, args.principals))
+
+    names = [(f"bench_{prefix.lower()}_{i:05d}",) for i in range(bulk_size)]
+    results.measure(f"{prefix} bulk create {bulk_size} principals",
+                    lambda: _run_bulk(backend.create_principal, names, args.parallelism))
+    results.measure(f"{prefix} bulk delete {bulk_size} principals",
+                    lambda: _run_bulk(backend.delete_principal, names, args.parallelism))
+
+
+def _run_bulk(fn, items, parallelism):
+    succeeded, failed = bulk.summarize(bulk.run_bulk(fn, items, parallelism))
+    if failed:
+        raise RuntimeError(f"{len(failed)} bulk operations failed, e.g. {failed[0][1]}")
+
+
+def bench_render(results, backend, repeat):
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+    except ImportError as e:
+        print(f"Skipping render benchmarks: {e}")
+        return
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Skipping render benchmarks (no display? try xvfb-run): {e}")
+        return
+    from core import principal_row
+    from tables import TableRenderer
+
+    principals = backend.list_principals()
+    root.geometry("1000x600")
+    table = ttk.Treeview(root, columns=("Name", "Client ID", "Type", "Created Timestamp"), show="headings",
+                         selectmode="extended")
+    table.pack(fill="both", expand=True)
+
+    renderer = TableRenderer(table, principal_row, search_text=lambda principal: "\n".join(map(str, principal_row(principal))),
+                             name="benchmark")
+
+    def render(records):
+        renderer.render(records)
+        while renderer.busy:
+            root.update()
+        root.update()
+
+    def render_fresh():
+        renderer.clear()
+        root.update()
+        render(principals)
+
+    def type_filter():
+        for length in range(1, len("principal_0001") + 1):
+            renderer.set_filter("principal_0001"[:length])
+            root.update()
+        renderer.set_filter("")
+        root.update()
+
+    changed = [dict(principal, entityVersion=2) if i % 10 == 0 else principal for i, principal in enumerate(principals)]
+    results.measure(f"render {len(principals)} principals", render_fresh, repeat)
+    results.measure(f"render unchanged {len(principals)} principals", lambda: render(principals), repeat)
+    results.measure("render with 10% changed", lambda: (render(changed), render(principals)), repeat)
+    results.measure("filter per keystroke (14 keystrokes)", type_filter, repeat)
+    root.destroy()
+
+
+# Compare with a baseline summary; returns the benchmarks that got slower than tolerance allows
+def regressions(summary, baseline, tolerance):
+    slower = []
+    for name, result in summary.items():
+        previous = baseline.get(name)
+        if previous and result["median"] > previous["median"] * tolerance:
+            slower.append((name, previous["median"], result["median"]))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--backends", default="REST,CLI,CLI Worker",
+                        help="Comma-separated backends to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each repeated benchmark")
+    parser.add_argument("--selections", type=int, default=20, help="Principals selected (REST)")
+    parser.add_argument("--bulk", type=int, default=100, help="Principals created and deleted in bulk (REST)")
+    parser.add_argument("--cli-scale", type=float, default=0.1,
+                        help="Fraction of selections and bulk items used for the CLI, which spawns a process each")
+    parser.add_argument("--parallelism", type=int, default=bulk.DEFAULT_PARALLELISM)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--no-render", action="store_true", help="Skip the Treeview benchmarks")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed slowdown relative to the baseline")
+    args = parser.parse_args()
+
+    server = FakePolarisServer(state_from_arguments(args), latency=args.latency).start()
+    print(f"Fake Polaris on port {server.port}: {args.catalogs} catalogs, {args.principals} principals, "
+          f"{args.roles} principal roles, {args.latency * 1000:.0f} ms latency")
+    results = Results()
+    try:
+        for kind in filter(None, args.backends.split(",")):
+            cli_path = os.getenv("POLARIS_CLI_PATH", FAKE_CLI_PATH)
+            backend = backends.get_backend(kind, cli_path, "127.0.0.1", str(server.port), CLIENT_ID, CLIENT_SECRET)
+            scale = args.cli_scale if kind == backends.BACKEND_CLI else 1
+            bench_backend(results, backend, args, args.repeat, max(1, int(args.selections * scale)),
+                          max(1, int(args.bulk * scale)))
+        if not args.no_render:
+            rest = backends.get_backend(backends.BACKEND_REST, None, "127.0.0.1", str(server.port), CLIENT_ID,
+                                        CLIENT_SECRET)
+            bench_render(results, rest, args.repeat)
+    finally:
+        server.stop()
+
+    summary = results.summary()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"arguments": vars(args), "results": summary, "metrics": metrics.snapshot()}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(summary, json.load(f)["results"], args.tolerance)
+        for name, before, after in slower:
+            print(f"REGRESSION {name}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import tasks
+
+DEFAULT_PARALLELISM = 4
+
+
+# Function to run fn(*args) for every tuple in items, at most `parallelism` at a time.
+# Yields (args, error) as each call finishes; error is None when the call succeeded.
+# Closing the generator early cancels the calls that have not started yet. Run from a task, the
+# calls share its cancellation, so cancelling the task also aborts the calls in progress.
+def run_bulk(fn, items, parallelism=DEFAULT_PARALLELISM, thread_name_prefix="polaris-bulk"):
+    items = list(items)
+    logging.info(f"Running {getattr(fn, '__name__', 'operation')} for {len(items)} items, {parallelism} at a time")
+    fn = tasks.inherit_task(fn)
+    executor = ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix=thread_name_prefix)
+    try:
+        futures = {executor.submit(fn, *args): args for args in items}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    logging.error(f"{futures[future]} failed: {error}")
+                yield futures[future], error
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Function to split bulk outcomes into succeeded items and (item, error) failures
+def summarize(outcomes):
+    succeeded = [args for args, error in outcomes if error is None]
+    failed = [(args, error) for args, error in outcomes if error is not None]
+    return succeeded, failed
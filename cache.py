@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Entity kinds, used as the first element of cache keys
+CATALOGS = "catalogs"
+PRINCIPALS = "principals"
+PRINCIPAL_ROLES = "principal_roles"
+ASSIGNED_ROLES = "assigned_roles"
+
+# Seconds a cached listing is considered fresh, per entity kind
+DEFAULT_TTLS = {
+    CATALOGS: 300,
+    PRINCIPALS: 120,
+    PRINCIPAL_ROLES: 300,
+    ASSIGNED_ROLES: 60,
+}
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 512
+
+
+class EntityCache:
+    """In-memory LRU cache of entity listings with a TTL per entity kind.
+
+    Keys are tuples starting with the entity kind, e.g. ``(PRINCIPALS,)`` or
+    ``(ASSIGNED_ROLES, principal_name)``. Expired entries are still returned
+    (flagged as stale) so views can show them while they revalidate.
+    """
+
+    def __init__(self, ttls=None, default_ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, clock=time.monotonic,
+                 on_put=None):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        # Called with (key, value) after a value is stored, e.g. to persist it
+        self.on_put = on_put
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        # Bumped on invalidation so fetches started before a mutation are not cached
+        self._generations = {}
+        self._kind_generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def ttl(self, key):
+        return self.ttls.get(key[0], self.default_ttl)
+
+    # Return (value, is_fresh) for a key, or None if it is not cached
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            value, stored_at = entry
+            return value, self.clock() - stored_at < self.ttl(key)
+
+    def generation(self, key):
+        with self._lock:
+            return self._generation(key)
+
+    def _generation(self, key):
+        return self._epoch, self._kind_generations.get(key[0], 0), self._generations.get(key, 0)
+
+    # Store a value; if generation is given and the key was invalidated since, the value is dropped
+    def put(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation(key):
+                return False
+            self._store(key, value, self.clock())
+        if self.on_put:
+            self.on_put(key, value)
+        return True
+
+    # Mark a cached value as fresh again without storing (or persisting) it, e.g. after a refetch
+    # found it unchanged; ignored if the key was invalidated since generation
+    def touch(self, key, generation=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (generation is not None and generation != self._generation(key)):
+                return False
+            self._store(key, entry[0], self.clock())
+        return True
+
+    # Store a value that is already stale (e.g. restored from disk) so it is shown but revalidated
+    def seed(self, key, value):
+        with self._lock:
+            if key not in self._entries:
+                self._store(key, value, float("-inf"))
+
+    def _store(self, key, value, stored_at):
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    # Invalidate every key of an entity kind, e.g. all per-principal role assignments
+    def invalidate_kind(self, kind):
+        with self._lock:
+            self._kind_generations[kind] = self._kind_generations.get(kind, 0) + 1
+            for key in [key for key in self._entries if key[0] == kind]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
@@ -0,0 +1,84 @@
+"""Long-lived helper running Polaris CLI commands in-process.
+
+Started once by the "CLI Worker" backend instead of spawning the CLI for
+every command. Each line on stdin is a JSON array of CLI arguments; the
+CLI runs with those arguments in this process, with its imports (and any
+connections it keeps at module level) still warm from earlier commands,
+and one JSON object with its returncode, stdout and stderr is written back
+per line.
+
+    python cli_worker.py --script ./client/python/cli/polaris_cli.py
+    python cli_worker.py --module cli.polaris_cli
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import runpy
+import sys
+import traceback
+
+
+# Function to run the CLI once with the given arguments, returning (returncode, stdout, stderr)
+def run_command(run_cli, program, args):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    sys.argv = [program] + list(args)
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            run_cli()
+            returncode = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                returncode = e.code or 0
+            else:
+                # sys.exit("message") prints the message and exits with status 1
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+    return returncode, stdout.getvalue(), stderr.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--script", help="Python file of the CLI, run as __main__")
+    target.add_argument("--module", help="Module of the CLI, run like python -m")
+    options = parser.parse_args()
+
+    if options.module:
+        # Imported once up front so the first command does not pay for it
+        importlib.import_module(options.module)
+        program = options.module
+
+        def run_cli():
+            runpy.run_module(options.module, run_name="__main__", alter_sys=True)
+    else:
+        program = options.script
+        # As "python script.py" does, so the CLI can import the modules next to it
+        sys.path[0] = os.path.dirname(os.path.abspath(options.script))
+
+        def run_cli():
+            runpy.run_path(options.script, run_name="__main__")
+
+    # The protocol owns the real stdout; the CLI's output is captured per command
+    protocol = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            args = json.loads(line)
+        except ValueError as e:
+            returncode, stdout, stderr = 2, "", f"Malformed worker request: {e}"
+        else:
+            returncode, stdout, stderr = run_command(run_cli, program, args)
+        protocol.write(json.dumps({"returncode": returncode, "stdout": stdout, "stderr": stderr}) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""GUI-free building blocks shared by the Tk GUI and the batch CLI.
+
+Nothing here imports tkinter, so scripts can use it to run the same
+operations as the GUI:
+
+    import core
+    backend = core.Connection.from_env().get_backend()
+    for catalog in backend.list_catalogs():
+        print(core.catalog_row(catalog))
+"""
+import csv
+import io
+import json
+import os
+
+import backends
+
+# Default connection settings, overridable through the environment
+DEFAULT_POLARIS_CLI_PATH = os.getenv("POLARIS_CLI_PATH", "./polaris")
+DEFAULT_HOST = os.getenv("POLARIS_HOST", "localhost")
+DEFAULT_PORT = os.getenv("POLARIS_PORT", "8181")
+DEFAULT_CLIENT_ID = os.getenv("POLARIS_CLIENT_ID", None)
+DEFAULT_CLIENT_SECRET = os.getenv("POLARIS_CLIENT_SECRET", None)
+DEFAULT_BACKEND = os.getenv("POLARIS_BACKEND", backends.BACKEND_REST)
+
+# Output formats of format_records
+OUTPUT_FORMATS = ("table", "csv", "json", "ndjson")
+
+
+class Connection:
+    """Settings for connecting to a Polaris server."""
+
+    def __init__(self, backend=DEFAULT_BACKEND, cli_path=DEFAULT_POLARIS_CLI_PATH, host=DEFAULT_HOST,
+                 port=DEFAULT_PORT, client_id=DEFAULT_CLIENT_ID, client_secret=DEFAULT_CLIENT_SECRET):
+        self.backend = backend
+        self.cli_path = cli_path
+        self.host = host
+        self.port = str(port)
+        self.client_id = client_id
+        self.client_secret = client_secret
+
+    @classmethod
+    def from_env(cls):
+        return cls()
+
+    # Return the (shared) backend for these settings
+    def get_backend(self):
+        return backends.get_backend(self.backend, self.cli_path, self.host, self.port, self.client_id,
+                                    self.client_secret)
+
+    def __repr__(self):
+        return f"<Connection {self.backend} {self.host}:{self.port} client {self.client_id}>"
+
+
+# Function to convert a catalog JSON object to a catalog table row
+def catalog_row(catalog):
+    return (
+        catalog.get("name", ""),
+        catalog.get("type", ""),
+        catalog.get("storageConfigInfo", {}).get("storageType", ""),
+        catalog.get("properties", {}).get("default-base-location", "")
+    )
+
+
+# Function to convert a principal JSON object to a principal table row
+def principal_row(principal_data):
+    return (
+        principal_data.get("name", ""),
+        principal_data.get("clientId", ""),
+        principal_data.get("type", "N/A"),
+        principal_data.get("createTimestamp", "")
+    )
+
+
+# Function to convert a principal role JSON object to a role table row
+def principal_role_row(role_data):
+    return (
+        role_data.get("name", ""),  # Principal role name
+        role_data.get("properties", {})  # Properties
+    )
+
+
+# Listable entities: backend operation, column names and row function
+LISTINGS = {
+    "catalogs": ("list_catalogs", ("Name", "Type", "Storage Type", "Base Location"), catalog_row),
+    "principals": ("list_principals", ("Name", "Client ID", "Type", "Created Timestamp"), principal_row),
+    "principal-roles": ("list_principal_roles", ("Principal Role", "Properties"), principal_role_row),
+}
+
+
+# Function to render records as text: an aligned table or CSV of their rows, or the raw records
+# as a JSON array or newline-delimited JSON
+def format_records(records, columns, row, output_format="table"):
+    if output_format == "json":
+        return json.dumps(records, indent=2)
+    if output_format == "ndjson":
+        return "\n".join(json.dumps(record) for record in records)
+    rows = [[_cell(value) for value in row(record)] for record in records]
+    if output_format == "csv":
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(rows)
+        return output.getvalue().rstrip("\n")
+    if output_format == "table":
+        widths = [max([len(column)] + [len(cells[i]) for cells in rows]) for i, column in enumerate(columns)]
+        lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+        lines.extend("  ".join(cell.ljust(width) for cell, width in zip(cells, widths)) for cells in rows)
+        return "\n".join(line.rstrip() for line in lines)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
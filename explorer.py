@@ -0,0 +1,193 @@
+import json
+import logging
+
+from backends import BackendError
+
+# Node kinds; a node's item ID is the JSON list [kind, catalog, ...]
+CATALOG = "catalog"
+ROLES = "roles"
+ROLE = "role"
+GRANT = "grant"
+NAMESPACES = "namespaces"
+NAMESPACE = "namespace"
+TABLE = "table"
+
+# Text of the placeholder child that makes an unloaded node expandable
+LOADING = "Loading..."
+
+
+def node_id(kind, catalog, *path):
+    return json.dumps([kind, catalog, *path])
+
+
+def parse_node_id(iid):
+    kind, catalog, *path = json.loads(iid)
+    return kind, catalog, path
+
+
+# Function to describe a catalog role grant in one line
+def describe_grant(grant):
+    target = grant.get("tableName") or grant.get("viewName") or ".".join(grant.get("namespace") or [])
+    privilege = grant.get("privilege", "")
+    return f"{privilege} on {grant.get('type', '')} {target}".strip()
+
+
+class CatalogExplorer:
+    """Tree of catalogs whose children are fetched when a node is first expanded.
+
+    Catalogs expand into their catalog roles (with grants) and namespaces
+    (with nested namespaces and tables). Fetched children stay in the tree,
+    so collapsing and expanding again costs nothing; ``reload`` refetches a
+    node. Fetches run on the TaskRunner, so nodes expanded together load
+    concurrently.
+    """
+
+    def __init__(self, tree, runner, get_backend, on_error=None):
+        self.tree = tree
+        self.runner = runner
+        self.get_backend = get_backend
+        self.on_error = on_error
+        # Item ID -> Task of nodes whose children are being fetched
+        self._loading = {}
+        # Item IDs of nodes whose children have been fetched
+        self._loaded = set()
+        tree.bind("<<TreeviewOpen>>", lambda event: self.expand(tree.focus()))
+
+    # Replace the catalogs shown, keeping the loaded children of catalogs that remain
+    def set_catalogs(self, names):
+        wanted = {node_id(CATALOG, name): name for name in names}
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted]
+        for iid in stale:
+            self._forget(iid)
+        if stale:
+            self.tree.delete(*stale)
+        for position, (iid, name) in enumerate(sorted(wanted.items(), key=lambda item: item[1])):
+            if self.tree.exists(iid):
+                self.tree.move(iid, '', position)
+                continue
+            self.tree.insert('', position, iid=iid, text=name, values=("catalog",))
+            # Roles and namespaces are fixed groups; only their contents are fetched
+            self._add_expandable(iid, node_id(ROLES, name), "Catalog Roles", "")
+            self._add_expandable(iid, node_id(NAMESPACES, name), "Namespaces", "")
+            self._loaded.add(iid)
+
+    # Fetch the children of a node unless they are loaded or being loaded
+    def expand(self, iid):
+        if not iid or iid in self._loaded or iid in self._loading:
+            return
+        kind, catalog, path = parse_node_id(iid)
+        fetch = self._fetcher(kind)
+        if fetch is None:
+            return
+        backend = self.get_backend()
+        self._loading[iid] = self.runner.submit(
+            fetch, backend, catalog, path,
+            on_success=lambda children: self._on_loaded(iid, children),
+            on_error=lambda error: self._on_failed(iid, error),
+            description=f"expand {self.tree.item(iid, 'text')}"
+        )
+
+    # Refetch the children of a node
+    def reload(self, iid):
+        if self._fetcher(parse_node_id(iid)[0]) is None:
+            # Catalogs reload their groups; grants and tables have nothing to reload
+            for child in self.tree.get_children(iid):
+                self.reload(child)
+            return
+        task = self._loading.pop(iid, None)
+        if task is not None:
+            task.cancel()
+        for child in self.tree.get_children(iid):
+            self._forget(child)
+        self._loaded.discard(iid)
+        self._set_placeholder(iid, LOADING)
+        if self.tree.item(iid, "open"):
+            self.expand(iid)
+
+    # Forget all nodes and stop pending fetches
+    def clear(self):
+        for task in self._loading.values():
+            task.cancel()
+        self._loading = {}
+        self._loaded = set()
+        self.tree.delete(*self.tree.get_children())
+
+    def _fetcher(self, kind):
+        return {
+            ROLES: _fetch_roles,
+            ROLE: _fetch_grants,
+            NAMESPACES: _fetch_namespaces,
+            NAMESPACE: _fetch_namespaces,
+        }.get(kind)
+
+    def _on_loaded(self, iid, children):
+        self._loading.pop(iid, None)
+        if not self.tree.exists(iid):
+            return
+        self.tree.delete(*self.tree.get_children(iid))
+        for child_id, text, details, expandable in children:
+            if expandable:
+                self._add_expandable(iid, child_id, text, details)
+            else:
+                self.tree.insert(iid, 'end', iid=child_id, text=text, values=(details,))
+        if not children:
+            self.tree.insert(iid, 'end', text="(empty)")
+        self._loaded.add(iid)
+        logging.debug(f"Loaded {len(children)} children of {iid}")
+
+    def _on_failed(self, iid, error):
+        self._loading.pop(iid, None)
+        if not self.tree.exists(iid):
+            return
+        # Left unloaded so expanding the node again retries
+        self._set_placeholder(iid, f"Failed to load: {error}")
+        self.tree.item(iid, open=False)
+        if self.on_error:
+            self.on_error(error)
+
+    def _add_expandable(self, parent, iid, text, details):
+        self.tree.insert(parent, 'end', iid=iid, text=text, values=(details,))
+        self.tree.insert(iid, 'end', text=LOADING)
+
+    def _set_placeholder(self, iid, text):
+        self.tree.delete(*self.tree.get_children(iid))
+        self.tree.insert(iid, 'end', text=text)
+
+    def _forget(self, iid):
+        for child in self.tree.get_children(iid):
+            self._forget(child)
+        task = self._loading.pop(iid, None)
+        if task is not None:
+            task.cancel()
+        self._loaded.discard(iid)
+
+
+# Fetch functions run on a worker thread and return (item ID, text, details, expandable) tuples
+
+def _fetch_roles(backend, catalog, path):
+    roles = sorted(backend.list_catalog_roles(catalog), key=lambda role: role.get("name", ""))
+    return [(node_id(ROLE, catalog, role["name"]), role["name"], "catalog role", True) for role in roles]
+
+
+def _fetch_grants(backend, catalog, path):
+    role_name = path[0]
+    descriptions = sorted({describe_grant(grant) for grant in backend.list_grants(catalog, role_name)})
+    return [(node_id(GRANT, catalog, role_name, description), description, "grant", False)
+            for description in descriptions]
+
+
+def _fetch_namespaces(backend, catalog, path):
+    parent = path[0] if path else None
+    # An empty name cannot be shown or expanded
+    namespaces = sorted(namespace for namespace in backend.list_namespaces(catalog, parent) if namespace)
+    children = [(node_id(NAMESPACE, catalog, namespace), namespace[-1], "namespace", True)
+                for namespace in namespaces]
+    if parent:
+        try:
+            tables = sorted(backend.list_tables(catalog, parent))
+        except BackendError as e:
+            # Nested namespaces stay browsable when tables cannot be listed (e.g. with the CLI backend)
+            children.append((node_id(TABLE, catalog, parent, ""), f"Tables unavailable: {e}", "", False))
+            return children
+        children.extend((node_id(TABLE, catalog, parent, table), table, "table", False) for table in tables)
+    return children
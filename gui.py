@@ -0,0 +1,1556 @@
+import tkinter as tk
+from tkinter import ttk
+from tkinter import messagebox
+from tkinter import filedialog
+from tkinter import simpledialog
+import csv
+import json
+import os
+import logging
+import time
+
+import assignments
+import backends
+import bulk
+import cache
+import logs
+import manifest
+import profiles
+import resilience
+import snapshots
+import watch
+from metrics import registry as metrics
+from backends import BackendError
+from core import (DEFAULT_BACKEND, DEFAULT_CLIENT_ID, DEFAULT_CLIENT_SECRET, DEFAULT_HOST, DEFAULT_POLARIS_CLI_PATH,
+                  DEFAULT_PORT, LISTINGS, Connection, catalog_row, principal_row, principal_role_row)
+from cache import EntityCache
+from explorer import CatalogExplorer
+from paging import PagedLoader
+from tables import TableRenderer
+from tasks import PRIORITY_BACKGROUND, Prefetcher, TaskRunner
+
+# Seconds cached listings stay fresh; unset keeps the per-entity defaults
+CACHE_TTL = os.getenv("POLARIS_CACHE_TTL")
+# Delay (in milliseconds) before a principal selection loads its roles, so arrowing through the list stays cheap
+SELECTION_DEBOUNCE_MS = 150
+# Principals above and below the selection whose roles are prefetched
+PREFETCH_NEIGHBOURS = 5
+# SQLite file holding the last-known listings per host and port; set to an empty string to disable
+SNAPSHOT_PATH = os.getenv("POLARIS_SNAPSHOT_DB", snapshots.DEFAULT_SNAPSHOT_PATH)
+# Number of principals whose roles are fetched at the same time when building the assignment matrix
+MATRIX_PARALLELISM = int(os.getenv("POLARIS_MATRIX_PARALLELISM", assignments.DEFAULT_PARALLELISM))
+# File the operation metrics are exported to periodically (.prom for a Prometheus textfile, JSON otherwise)
+METRICS_FILE = os.getenv("POLARIS_METRICS_FILE")
+METRICS_EXPORT_INTERVAL_MS = 15000
+# How often (in milliseconds) the degraded-server indicator is updated
+HEALTH_CHECK_INTERVAL_MS = 1000
+# Number of bulk actions (delete, grant, revoke) sent to Polaris at the same time
+BULK_PARALLELISM = int(os.getenv("POLARIS_BULK_PARALLELISM", bulk.DEFAULT_PARALLELISM))
+# Catalogs and principals are fetched in pages of this size as the table is scrolled; 0 loads everything at once
+PAGE_SIZE = int(os.getenv("POLARIS_PAGE_SIZE", "0"))
+# Listings loaded at startup: "all" loads the visible tab first and the other tabs concurrently,
+# "visible" loads the other tabs when they are first shown, "none" waits for the List buttons
+STARTUP_LOAD = os.getenv("POLARIS_STARTUP_LOAD", "all").lower()
+# Seconds between auto-refreshes of a watched table, and the tables watched from the start
+# (comma-separated: catalogs, principals, principal_roles)
+WATCH_INTERVAL = int(os.getenv("POLARIS_WATCH_INTERVAL", watch.DEFAULT_INTERVAL))
+WATCH_TABLES = {name.strip() for name in os.getenv("POLARIS_WATCH", "").split(",") if name.strip()}
+# JSON file with the saved connection profiles
+PROFILES_PATH = os.getenv("POLARIS_PROFILES_FILE", profiles.DEFAULT_PROFILES_PATH)
+
+
+# Function to get the connection settings entered in the GUI
+def current_connection():
+    return Connection(
+        backend_var.get(),
+        polaris_cli_path_entry.get(),
+        host_entry.get(),
+        port_entry.get(),
+        client_id_entry.get(),
+        client_secret_entry.get()
+    )
+
+
+# Function to get the backend for the connection settings entered in the GUI
+def get_backend():
+    return current_connection().get_backend()
+
+
+# Function to get the entity cache for the connection settings entered in the GUI
+def get_entity_cache():
+    host, port, client_id = key = (host_entry.get(), port_entry.get(), client_id_entry.get())
+    if key not in entity_caches:
+        ttls = dict.fromkeys(cache.DEFAULT_TTLS, float(CACHE_TTL)) if CACHE_TTL else None
+        on_put = None
+        if snapshot_store is not None:
+            # Every fresh listing is persisted so the next start can show it immediately
+            on_put = lambda cache_key, records: snapshot_store.save_async(host, port, cache_key, records)
+        entity_caches[key] = EntityCache(ttls, on_put=on_put)
+    return entity_caches[key]
+
+
+# Function to drop cached listings affected by a mutation
+def invalidate_cache(*keys, kinds=()):
+    entity_cache = get_entity_cache()
+    entity_cache.invalidate(*keys)
+    for kind in kinds:
+        entity_cache.invalidate_kind(kind)
+
+
+# Function to show an error raised by a backend operation
+def show_backend_error(error, parse_error_message="Failed to parse response."):
+    if isinstance(error, json.JSONDecodeError):
+        logging.error(f"{parse_error_message} Output is not valid JSON.")
+        messagebox.showerror("Error", parse_error_message)
+    elif isinstance(error, BackendError):
+        messagebox.showerror("Error", str(error))
+    else:
+        messagebox.showerror("Error", f"An error occurred: {error}")
+
+
+# Function to run a backend operation off the UI thread; on_success receives its result
+def run_backend_operation(operation, *args, on_success=None, on_error=show_backend_error, description=None,
+                          **kwargs):
+    backend = get_backend()
+    logging.debug(f"Running {backend.name} operation: {operation}")
+    return task_runner.submit(
+        metrics.timed(f"{backend.name}.{operation}", getattr(backend, operation)), *args,
+        on_success=on_success,
+        on_error=on_error,
+        description=description or operation,
+        **kwargs
+    )
+
+
+# Function to return the key identifying a listing streamed into a table: the same operation and
+# arguments on the same backend into the same table
+def listing_key(renderer, operation, args, kwargs):
+    return renderer.name, get_backend(), operation, args, tuple(sorted(kwargs.items()))
+
+
+# Function to stream a list operation into a table as its records arrive. An identical listing
+# already streaming into the table is shared; a different one for the table is cancelled.
+def stream_backend_operation(operation, renderer, entity, *args, cache_key=None, on_done=None, on_error=None,
+                             **kwargs):
+    key = listing_key(renderer, operation, args, kwargs)
+    shared = task_runner.find(key)
+    if shared is not None:
+        return shared
+    backend = get_backend()
+    logging.debug(f"Streaming {backend.name} operation: {operation}")
+    entity_cache = get_entity_cache()
+    generation = entity_cache.generation(cache_key) if cache_key else None
+    records = []
+    parse_errors = []
+    renderer.begin()
+
+    def on_batch(batch):
+        records.extend(batch)
+        renderer.append(batch)
+
+    def on_success(count):
+        renderer.finish()
+        if cache_key:
+            entity_cache.put(cache_key, records, generation)
+        if parse_errors:
+            report_parse_errors(entity, parse_errors)
+        if on_done:
+            on_done(count)
+
+    return task_runner.stream(
+        metrics.timed_iter(f"{backend.name}.{operation}", getattr(backend, operation)), *args,
+        on_parse_error=lambda line_number, line, error: parse_errors.append((line_number, error)),
+        on_batch=on_batch,
+        on_success=on_success,
+        on_error=on_error or (lambda e: show_backend_error(e, f"Failed to parse {entity} response.")),
+        description=operation,
+        key=key,
+        view=renderer.name,
+        **kwargs
+    )
+
+
+# Function to show a cached listing right away and revalidate it in the background
+# when it is stale, missing or refresh is requested
+def load_table(cache_key, operation, renderer, entity, *args, refresh=False, on_done=None, on_error=None,
+               **kwargs):
+    # Repeated clicks while the same listing is still streaming in share it
+    shared = task_runner.find(listing_key(renderer, operation, args, kwargs))
+    if shared is not None:
+        return shared
+    cached = get_entity_cache().get(cache_key)
+    if cached is not None:
+        records, fresh = cached
+        renderer.render(records)
+        if fresh and not refresh:
+            return None
+    return stream_backend_operation(operation, renderer, entity, *args, cache_key=cache_key, on_done=on_done,
+                                    on_error=on_error, **kwargs)
+
+
+# Function to load a listing page by page as its table is scrolled; a cached copy is shown first
+# and, when fresh, replaces the fetch unless refresh is requested
+def load_pages(pages, cache_key, operation, entity, refresh=False, on_page=None, on_error=None):
+    entity_cache = get_entity_cache()
+    cached = entity_cache.get(cache_key)
+    if cached is not None:
+        records, fresh = cached
+        pages.cancel()
+        pages.renderer.render(records)
+        if fresh and not refresh:
+            return
+    backend = get_backend()
+    generation = entity_cache.generation(cache_key)
+    fetch_page = metrics.timed(f"{backend.name}.{operation}", getattr(backend, operation))
+    pages.load(
+        lambda page_token: fetch_page(page_token, PAGE_SIZE),
+        on_page=on_page,
+        # Only a complete listing is cached
+        on_done=lambda records: entity_cache.put(cache_key, records, generation),
+        on_error=on_error or (lambda e: show_backend_error(e, f"Failed to parse {entity} response.")),
+        description=operation,
+        # A cached listing is already shown in full; scrolling through it must not hold back its revalidation
+        eager=cached is not None
+    )
+
+
+# Function to run a backend operation for many items concurrently, with progress in the status bar
+# and a single summary at the end; each item is a tuple of operation arguments
+def run_bulk_operation(operation, items, title, on_done=None):
+    backend = get_backend()
+    return stream_with_progress(title, len(items), bulk.run_bulk,
+                                metrics.timed(f"{backend.name}.{operation}", getattr(backend, operation)), items,
+                                BULK_PARALLELISM, on_done=on_done)
+
+
+# Function to stream (item, error) outcomes from fn into the progress bar and summarize them at the end
+def stream_with_progress(title, total, fn, *args, describe=None, on_done=None):
+    outcomes = []
+    progress_bar.config(maximum=max(total, 1), value=0)
+
+    def on_batch(batch):
+        outcomes.extend(batch)
+        progress_bar.config(value=len(outcomes))
+
+    def on_success(count):
+        progress_bar.config(value=0)
+        show_bulk_summary(title, outcomes, describe)
+        if on_done:
+            on_done(outcomes)
+
+    def on_error(error):
+        progress_bar.config(value=0)
+        show_backend_error(error)
+
+    return task_runner.stream(
+        fn, *args,
+        on_batch=on_batch,
+        on_success=on_success,
+        on_error=on_error,
+        description=title
+    )
+
+
+# Function to show how many items of a bulk operation succeeded, and why the others failed
+def show_bulk_summary(title, outcomes, describe=None):
+    describe = describe or (lambda args: " / ".join(args))
+    succeeded, failed = bulk.summarize(outcomes)
+    message = f"{len(succeeded)} of {len(outcomes)} succeeded."
+    if not failed:
+        messagebox.showinfo(title, message)
+        return
+    details = "\n".join(f"{describe(item)}: {error}" for item, error in failed[:20])
+    if len(failed) > 20:
+        details += f"\n... and {len(failed) - 20} more"
+    messagebox.showwarning(title, f"{message}\n\nFailed:\n{details}")
+
+
+# Function to get the names (first column) of the selected rows of a table
+def selected_names(table):
+    return [table.item(item, 'values')[0] for item in table.selection()]
+
+
+# Function to report records that could not be parsed, one line each
+def report_parse_errors(entity, parse_errors):
+    details = "\n".join(f"Line {line_number}: {error}" for line_number, error in parse_errors[:10])
+    if len(parse_errors) > 10:
+        details += f"\n... and {len(parse_errors) - 10} more"
+    messagebox.showwarning("Warning", f"Skipped {len(parse_errors)} malformed {entity} record(s):\n{details}")
+
+
+# Function to show the background work in the status bar
+def update_status(tasks):
+    if tasks:
+        status_label.config(text="Running: " + ", ".join(task.description for task in tasks))
+        cancel_button.config(state=tk.NORMAL)
+    else:
+        status_label.config(text="Ready")
+        cancel_button.config(state=tk.DISABLED)
+
+# Function to list catalogs
+def list_catalogs(refresh=False, on_error=None):
+    if PAGE_SIZE:
+        load_pages(catalog_pages, (cache.CATALOGS,), "list_catalogs_page", "catalogs", refresh=refresh,
+                   on_error=on_error)
+        return
+    load_table((cache.CATALOGS,), "iter_catalogs", catalog_renderer, "catalogs", refresh=refresh, on_error=on_error)
+
+
+# Function to list principals
+def list_principals(refresh=False, on_error=None):
+    if PAGE_SIZE:
+        load_pages(principal_pages, (cache.PRINCIPALS,), "list_principals_page", "principals", refresh=refresh,
+                   on_page=lambda records: prefetch_assigned_roles(), on_error=on_error)
+        return
+    load_table((cache.PRINCIPALS,), "iter_principals", principal_renderer, "principals", refresh=refresh,
+               on_done=lambda count: prefetch_assigned_roles(), on_error=on_error)
+
+
+# Function to refresh catalogs after a catalog was created or deleted
+def on_catalogs_changed():
+    invalidate_cache((cache.CATALOGS,))
+    list_catalogs(refresh=True)
+
+
+# Function to refresh principals after principals were created or deleted
+def on_principals_changed(*principal_names):
+    invalidate_cache((cache.PRINCIPALS,), *[(cache.ASSIGNED_ROLES, principal_name) for principal_name in principal_names])
+    list_principals(refresh=True)
+
+
+# Function to create a catalog
+def create_catalog_dialog():
+    # Create a new dialog window
+    dialog = tk.Toplevel(root)
+    dialog.title("Create Catalog")
+
+    # Catalog Name
+    tk.Label(dialog, text="Catalog Name:").grid(row=0, column=0)
+    catalog_name_entry = tk.Entry(dialog, width=30)
+    catalog_name_entry.grid(row=0, column=1)
+
+    # Catalog Type
+    tk.Label(dialog, text="Catalog Type (INTERNAL/EXTERNAL):").grid(row=1, column=0)
+    catalog_type_entry = tk.Entry(dialog, width=30)
+    catalog_type_entry.grid(row=1, column=1)
+
+    # Storage Type
+    tk.Label(dialog, text="Storage Type (e.g., FILE):").grid(row=2, column=0)
+    catalog_storage_type_entry = tk.Entry(dialog, width=30)
+    catalog_storage_type_entry.grid(row=2, column=1)
+
+    # Base Location
+    tk.Label(dialog, text="Default Base Location:").grid(row=3, column=0)
+    catalog_base_location_entry = tk.Entry(dialog, width=30)
+    catalog_base_location_entry.grid(row=3, column=1)
+
+    # Optional fields
+    tk.Label(dialog, text="Role ARN (S3):").grid(row=4, column=0)
+    role_arn_entry = tk.Entry(dialog, width=30)
+    role_arn_entry.grid(row=4, column=1)
+
+    tk.Label(dialog, text="External ID (S3):").grid(row=5, column=0)
+    external_id_entry = tk.Entry(dialog, width=30)
+    external_id_entry.grid(row=5, column=1)
+
+    tk.Label(dialog, text="Tenant ID (Azure):").grid(row=6, column=0)
+    tenant_id_entry = tk.Entry(dialog, width=30)
+    tenant_id_entry.grid(row=6, column=1)
+
+    tk.Label(dialog, text="App Name (Azure):").grid(row=7, column=0)
+    app_name_entry = tk.Entry(dialog, width=30)
+    app_name_entry.grid(row=7, column=1)
+
+    tk.Label(dialog, text="Consent URL (Azure):").grid(row=8, column=0)
+    consent_url_entry = tk.Entry(dialog, width=30)
+    consent_url_entry.grid(row=8, column=1)
+
+    tk.Label(dialog, text="Service Account (GCS):").grid(row=9, column=0)
+    service_account_entry = tk.Entry(dialog, width=30)
+    service_account_entry.grid(row=9, column=1)
+
+    tk.Label(dialog, text="Remote URL (External):").grid(row=10, column=0)
+    remote_url_entry = tk.Entry(dialog, width=30)
+    remote_url_entry.grid(row=10, column=1)
+
+    tk.Label(dialog, text="Allowed Location:").grid(row=11, column=0)
+    allowed_location_entry = tk.Entry(dialog, width=30)
+    allowed_location_entry.grid(row=11, column=1)
+
+    # Function to run when "Create" button is clicked
+    def create_catalog():
+        catalog_name = catalog_name_entry.get().strip()
+        if not catalog_name:
+            messagebox.showerror("Error", "Catalog name is required!")
+            return
+        # Optional fields for S3, Azure, GCS, etc.
+        options = {
+            "role_arn": role_arn_entry.get(),
+            "external_id": external_id_entry.get(),
+            "tenant_id": tenant_id_entry.get(),
+            "multi_tenant_app_name": app_name_entry.get(),
+            "consent_url": consent_url_entry.get(),
+            "service_account": service_account_entry.get(),
+            "remote_url": remote_url_entry.get(),
+            "allowed_location": allowed_location_entry.get(),
+        }
+
+        run_backend_operation(
+            "create_catalog",
+            catalog_name,
+            catalog_type_entry.get(),
+            catalog_storage_type_entry.get(),
+            catalog_base_location_entry.get(),
+            options,
+            on_success=lambda output: on_catalogs_changed()
+        )
+        messagebox.showinfo("Sent", "Catalog creation command sent.")
+        dialog.destroy()  # Close the dialog after successful creation
+    list_catalogs()
+    # Create button in dialog
+    tk.Button(dialog, text="Create", command=create_catalog).grid(row=12, columnspan=2, pady=10)
+
+# Function to delete the selected catalogs
+def delete_catalog():
+    # Get the catalog names from the selected rows (the name is in the first column)
+    catalog_names = selected_names(catalog_table)
+
+    if not catalog_names:
+        messagebox.showerror("Error", "Please select a catalog to delete.")
+        return
+
+    # Ask for confirmation before deleting
+    if len(catalog_names) == 1:
+        question = f"Are you sure you want to delete the catalog '{catalog_names[0]}'?"
+    else:
+        question = f"Are you sure you want to delete {len(catalog_names)} catalogs?"
+    if not messagebox.askyesno("Confirm Delete", question):
+        return
+
+    # Run the backend operation to delete the catalogs, then refresh the list
+    run_bulk_operation(
+        "delete_catalog",
+        [(catalog_name,) for catalog_name in catalog_names],
+        "Delete Catalogs",
+        on_done=lambda outcomes: on_catalogs_changed()
+    )
+
+
+# Function to create a principal using a dialog
+def create_principal_dialog():
+    # Create a new dialog window
+    dialog = tk.Toplevel(root)
+    dialog.title("Create Principal")
+
+    # Principal Name
+    tk.Label(dialog, text="Principal Name:").grid(row=0, column=0)
+    principal_name_entry = tk.Entry(dialog, width=30)
+    principal_name_entry.grid(row=0, column=1)
+
+    # Function to run when the "Create" button is clicked
+    def create_principal():
+        principal_name = principal_name_entry.get()
+        run_backend_operation("create_principal", principal_name, on_success=lambda output: on_principals_changed(principal_name))
+        messagebox.showinfo("Sent", "Principal creation command sent.")
+        dialog.destroy()  # Close the dialog after successful creation
+
+    # Create button in dialog
+    tk.Button(dialog, text="Create", command=create_principal).grid(row=4, columnspan=2, pady=10)
+    list_principals()
+
+# Function to delete the selected principals
+def delete_principal():
+    # Get the principal names from the selected rows (the name is in the first column)
+    principal_names = selected_names(principal_table)
+
+    if not principal_names:
+        messagebox.showerror("Error", "Please select a principal to delete.")
+        return
+
+    # Ask for confirmation before deleting
+    if len(principal_names) == 1:
+        question = f"Are you sure you want to delete the principal '{principal_names[0]}'?"
+    else:
+        question = f"Are you sure you want to delete {len(principal_names)} principals?"
+    if not messagebox.askyesno("Confirm Delete", question):
+        return
+
+    # Run the backend operation to delete the principals, then refresh the principal list
+    run_bulk_operation(
+        "delete_principal",
+        [(principal_name,) for principal_name in principal_names],
+        "Delete Principals",
+        on_done=lambda outcomes: on_principals_changed(*principal_names)
+    )
+
+
+# Function to list principal roles
+def list_principal_roles(refresh=False, on_error=None):
+    load_table((cache.PRINCIPAL_ROLES,), "iter_principal_roles", principal_role_renderer, "principal roles",
+               refresh=refresh, on_error=on_error)
+
+
+# Function to build the text a table filter matches against: the row values plus entity properties
+def row_search_text(row_values):
+    def search_text(record):
+        values = [str(value) for value in row_values(record)]
+        values.extend(f"{key}={value}" for key, value in record.get("properties", {}).items())
+        # Newlines keep a query from matching across two fields
+        return "\n".join(values)
+    return search_text
+
+# Function to add a filter box that narrows a table as the user types, and the table's
+# auto-refresh toggle and interval when it has a watcher
+def add_filter_entry(parent, renderer, row, watcher=None):
+    filter_frame = ttk.Frame(parent)
+    filter_frame.grid(row=row, column=0, columnspan=3, sticky="ew", padx=5, pady=(5, 0))
+    tk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+    filter_var = tk.StringVar()
+    filter_var.trace_add("write", lambda *args: renderer.set_filter(filter_var.get()))
+    tk.Entry(filter_frame, textvariable=filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+    if watcher is not None:
+        watch_var = tk.BooleanVar(value=watcher.name in WATCH_TABLES)
+        interval_var = tk.IntVar(value=watcher.interval)
+
+        def on_toggle():
+            if watch_var.get():
+                watcher.start()
+            else:
+                watcher.stop()
+
+        def on_interval(*args):
+            try:
+                watcher.set_interval(interval_var.get())
+            except tk.TclError:
+                pass  # Not a number (yet) while typing
+
+        interval_var.trace_add("write", on_interval)
+        tk.Label(filter_frame, text="s").pack(side=tk.RIGHT)
+        tk.Spinbox(filter_frame, from_=5, to=3600, increment=5, width=5, textvariable=interval_var).pack(side=tk.RIGHT)
+        tk.Checkbutton(filter_frame, text="Auto-refresh every", variable=watch_var, command=on_toggle).pack(side=tk.RIGHT, padx=(10, 0))
+        on_toggle()
+    return filter_var
+
+
+# Function to create the (stopped) auto-refresh watcher of a table; it slows down while the window
+# is minimized or the table's tab is not shown
+def create_watcher(name, cache_key, operation, renderer, frame, on_changed=None):
+    return watch.Watcher(
+        root.after, root.after_cancel, watch_refresh(cache_key, operation, renderer, on_changed), WATCH_INTERVAL,
+        is_idle=lambda: root.state() == "iconic" or notebook.select() != str(frame),
+        name=name
+    )
+
+
+# Function to build the refresh of a watched table: the listing is refetched (conditionally, where the
+# server sends ETags) and the table and cache are only updated when the records' content hash changed
+def watch_refresh(cache_key, operation, renderer, on_changed=None):
+    shown = {"records": None, "digest": None}
+
+    def refresh(on_done, on_error):
+        # The user is already reloading this table
+        if task_runner.find_view(renderer.name) is not None:
+            return None
+        entity_cache = get_entity_cache()
+        generation = entity_cache.generation(cache_key)
+        cached = entity_cache.get(cache_key)
+        previous = cached[0] if cached is not None else None
+        previous_digest = shown["digest"] if previous is not None and previous is shown["records"] else None
+        backend = get_backend()
+        fetch = metrics.timed(f"{backend.name}.{operation}", getattr(backend, operation))
+
+        # Runs on the worker: hashing a large listing on the Tk thread would freeze the window
+        def fetch_and_digest():
+            records = fetch()
+            digest = watch.listing_digest(records)
+            # The table was reloaded since the last refresh; hash what it shows now
+            if previous is not None and previous_digest is None:
+                return records, digest, watch.listing_digest(previous)
+            return records, digest, previous_digest
+
+        def on_success(result):
+            records, digest, shown_digest = result
+            if previous is not None:
+                shown.update(records=previous, digest=shown_digest)
+            cached = entity_cache.get(cache_key)
+            if cached is not None and cached[0] is shown["records"] and shown["digest"] == digest:
+                entity_cache.touch(cache_key, generation)
+                on_done(False)
+                return
+            entity_cache.put(cache_key, records, generation)
+            shown.update(records=records, digest=digest)
+            for pages in (catalog_pages, principal_pages):
+                if pages.renderer is renderer:
+                    pages.cancel()
+            renderer.render(records)
+            if on_changed:
+                on_changed()
+            on_done(True)
+
+        # Background work: queued behind user actions, and cancelled when the user reloads the table
+        return task_runner.submit(fetch_and_digest, on_success=on_success, on_error=on_error,
+                                  description=f"auto-refresh {renderer.name.replace('_', ' ')}",
+                                  view=renderer.name, priority=PRIORITY_BACKGROUND)
+    return refresh
+
+# Function to open a dialog for creating a principal role
+def create_principal_role_dialog():
+    dialog = tk.Toplevel(root)
+    dialog.title("Create Principal Role")
+
+    # Principal Role Name
+    tk.Label(dialog, text="Principal Role Name:").grid(row=0, column=0)
+    principal_role_entry = tk.Entry(dialog, width=30)
+    principal_role_entry.grid(row=0, column=1)
+
+    # Optional Property (Key-Value)
+    tk.Label(dialog, text="Property Key:").grid(row=1, column=0)
+    property_key_entry = tk.Entry(dialog, width=30)
+    property_key_entry.grid(row=1, column=1)
+
+    tk.Label(dialog, text="Property Value:").grid(row=2, column=0)
+    property_value_entry = tk.Entry(dialog, width=30)
+    property_value_entry.grid(row=2, column=1)
+
+    def create_principal_role():
+        principal_role = principal_role_entry.get().strip()
+        if not principal_role:
+            messagebox.showerror("Error", "Principal role name is required.")
+            return
+
+        # Add property if provided
+        properties = {}
+        if property_key_entry.get() and property_value_entry.get():
+            properties[property_key_entry.get()] = property_value_entry.get()
+
+        def on_created(output):
+            messagebox.showinfo("Success", f"Principal role '{principal_role}' created successfully.")
+            dialog.destroy()
+            invalidate_cache((cache.PRINCIPAL_ROLES,))
+            list_principal_roles(refresh=True)
+
+        run_backend_operation("create_principal_role", principal_role, properties, on_success=on_created)
+
+    # Add button to submit the dialog form
+    tk.Button(dialog, text="Create", command=create_principal_role).grid(row=3, columnspan=2, pady=10)
+# Function to delete the selected principal roles
+def delete_principal_role():
+    principal_roles = selected_names(principal_role_table)
+    if not principal_roles:
+        messagebox.showerror("Error", "Please select a principal role to delete.")
+        return
+
+    if len(principal_roles) == 1:
+        question = f"Are you sure you want to delete the principal role '{principal_roles[0]}'?"
+    else:
+        question = f"Are you sure you want to delete {len(principal_roles)} principal roles?"
+    if not messagebox.askyesno("Confirm Delete", question):
+        return
+
+    def on_deleted(outcomes):
+        # Any principal may have held the roles
+        invalidate_cache((cache.PRINCIPAL_ROLES,), kinds=(cache.ASSIGNED_ROLES,))
+        list_principal_roles(refresh=True)
+        load_assigned_roles()
+
+    run_bulk_operation(
+        "delete_principal_role",
+        [(principal_role,) for principal_role in principal_roles],
+        "Delete Principal Roles",
+        on_done=on_deleted
+    )
+
+
+# Function to get every (selected principal role, selected principal) pair, or None after reporting
+# a missing selection
+def selected_role_assignments(action):
+    principal_names = selected_names(principal_table)
+    if not principal_names:
+        messagebox.showerror("Error", f"Please select a principal to {action}.")
+        return None
+
+    principal_role_names = selected_names(principal_role_table)
+    if not principal_role_names:
+        messagebox.showerror("Error", f"Please select a principal role to {action}.")
+        return None
+
+    return [(principal_role_name, principal_name)
+            for principal_name in principal_names
+            for principal_role_name in principal_role_names]
+
+
+# Function to refresh role assignments after roles were granted to or revoked from principals
+def on_assignments_changed(outcomes):
+    invalidate_cache(*{(cache.ASSIGNED_ROLES, principal_name) for (principal_role_name, principal_name), error in outcomes})
+    load_assigned_roles()
+
+
+# Function to grant the selected principal roles to the selected principals
+def grant_principal_role():
+    assignments = selected_role_assignments("assign a role to")
+    if assignments:
+        run_bulk_operation("grant_principal_role", assignments, "Grant Principal Roles", on_done=on_assignments_changed)
+
+
+# Function to revoke the selected principal roles from the selected principals
+def revoke_selected_principal_roles():
+    assignments = selected_role_assignments("revoke a role from")
+    if not assignments:
+        return
+    if not messagebox.askyesno("Confirm Revoke", f"Are you sure you want to revoke {len(assignments)} role assignment(s)?"):
+        return
+    run_bulk_operation("revoke_principal_role", assignments, "Revoke Principal Roles", on_done=on_assignments_changed)
+
+# Function to open a dialog for revoking a principal role from a principal
+def revoke_principal_role_dialog():
+    dialog = tk.Toplevel(root)
+    dialog.title("Revoke Principal Role")
+
+    # Principal Role
+    tk.Label(dialog, text="Principal Role Name:").grid(row=0, column=0)
+    principal_role_entry = tk.Entry(dialog, width=30)
+    principal_role_entry.grid(row=0, column=1)
+
+    # Principal
+    tk.Label(dialog, text="Principal Name:").grid(row=1, column=0)
+    principal_entry = tk.Entry(dialog, width=30)
+    principal_entry.grid(row=1, column=1)
+
+    def revoke_principal_role():
+        principal_role = principal_role_entry.get().strip()
+        principal = principal_entry.get().strip()
+        if not principal_role or not principal:
+            messagebox.showerror("Error", "Both Principal Role and Principal are required.")
+            return
+
+        def on_revoked(output):
+            messagebox.showinfo("Success", f"Principal role '{principal_role}' revoked from '{principal}'.")
+            dialog.destroy()
+            invalidate_cache((cache.ASSIGNED_ROLES, principal))
+            load_assigned_roles()
+
+        run_backend_operation("revoke_principal_role", principal_role, principal, on_success=on_revoked)
+
+    # Add button to submit the form
+    tk.Button(dialog, text="Revoke", command=revoke_principal_role).grid(row=2, columnspan=2, pady=10)
+
+# Function to show the last-known state of the server right away and reconcile it in the background,
+# then load the listings the snapshot did not cover
+def restore_snapshot():
+    if snapshot_store is None:
+        start_initial_load()
+        return
+
+    def on_loaded(snapshot):
+        show_snapshot(snapshot)
+        start_initial_load()
+
+    def on_error(error):
+        logging.error(f"Failed to load snapshot: {error}")
+        start_initial_load()
+
+    task_runner.submit(
+        snapshot_store.load, host_entry.get(), port_entry.get(),
+        on_success=on_loaded,
+        on_error=on_error,
+        description="load snapshot"
+    )
+
+
+# Function to seed the cache from a snapshot and revalidate the restored listings
+def show_snapshot(snapshot):
+    if not snapshot:
+        return
+    entity_cache = get_entity_cache()
+    for cache_key, (records, saved_at) in snapshot.items():
+        entity_cache.seed(cache_key, records)
+    saved_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(max(saved for records, saved in snapshot.values())))
+
+    # While the server is unreachable the snapshot stays on screen for offline browsing
+    def on_error(error):
+        logging.warning(f"Failed to revalidate snapshot: {error}")
+        snapshot_label.config(text=f"Server unreachable, showing snapshot from {saved_at}")
+
+    for cache_key, list_function in ((cache.CATALOGS, list_catalogs),
+                                     (cache.PRINCIPALS, list_principals),
+                                     (cache.PRINCIPAL_ROLES, list_principal_roles)):
+        if (cache_key,) in snapshot:
+            loaded_listings.add(list_function)
+            list_function(on_error=on_error)
+
+
+# Function to show per-operation latency, error and row counts, refreshed while the window is open
+def diagnostics_dialog():
+    dialog = tk.Toplevel(root)
+    dialog.title("Diagnostics")
+    columns = ("Operation", "Count", "Errors", "Rows", "Mean (ms)", "p50 (ms)", "p95 (ms)", "Max (ms)")
+    metrics_table = ttk.Treeview(dialog, columns=columns, show="headings")
+    for column in columns:
+        metrics_table.heading(column, text=column)
+        metrics_table.column(column, width=90 if column != "Operation" else 220, anchor="w" if column == "Operation" else "e")
+    metrics_table.grid(row=0, column=0, columnspan=3, sticky="nsew")
+    renderer = TableRenderer(metrics_table, lambda record: (
+        record["name"], record["count"], record["errors"], record["rows"],
+        *(f"{record[field] * 1000:.1f}" for field in ("mean", "p50", "p95", "max"))
+    ), name="diagnostics")
+
+    def refresh():
+        if not dialog.winfo_exists():
+            return
+        renderer.render([dict(histogram, name=operation) for operation, histogram in metrics.snapshot().items()])
+        dialog.after(1000, refresh)
+
+    def export(extension, file_type):
+        path = filedialog.asksaveasfilename(parent=dialog, defaultextension=extension,
+                                            filetypes=[(file_type, f"*{extension}"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            metrics.export(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export metrics: {e}", parent=dialog)
+
+    tk.Button(dialog, text="Export JSON...", command=lambda: export(".json", "JSON")).grid(row=1, column=0, sticky="ew", padx=5, pady=5)
+    tk.Button(dialog, text="Export Prometheus...", command=lambda: export(".prom", "Prometheus textfile")).grid(row=1, column=1, sticky="ew", padx=5, pady=5)
+    tk.Button(dialog, text="Reset", command=metrics.reset).grid(row=1, column=2, sticky="ew", padx=5, pady=5)
+    dialog.rowconfigure(0, weight=1)
+    dialog.columnconfigure((0, 1, 2), weight=1)
+    refresh()
+
+
+# Function to write the metrics to METRICS_FILE in the background every METRICS_EXPORT_INTERVAL_MS
+def export_metrics_periodically():
+    task_runner.submit(
+        metrics.export, METRICS_FILE,
+        on_error=lambda e: logging.error(f"Failed to export metrics to {METRICS_FILE}: {e}"),
+        description="export metrics"
+    )
+    root.after(METRICS_EXPORT_INTERVAL_MS, export_metrics_periodically)
+
+
+# Function to show the servers whose circuit breaker is failing calls fast, kept up to date while the window is open
+def update_health_indicator():
+    breakers = resilience.unhealthy_breakers()
+    if breakers:
+        health_label.config(
+            text="Degraded: " + ", ".join(
+                f"{breaker.name} unavailable, retrying in {breaker.retry_in:.0f}s" if breaker.state == resilience.OPEN
+                else f"{breaker.name} recovering" for breaker in breakers
+            ),
+            bg="#c0392b", fg="white"
+        )
+    else:
+        health_label.config(text="", bg=root.cget("bg"))
+    root.after(HEALTH_CHECK_INTERVAL_MS, update_health_indicator)
+
+
+# Function to flush snapshots and stop background work before closing the window
+def on_close():
+    task_runner.shutdown()
+    if METRICS_FILE:
+        try:
+            metrics.export(METRICS_FILE)
+        except OSError as e:
+            logging.error(f"Failed to export metrics to {METRICS_FILE}: {e}")
+    if snapshot_store is not None:
+        snapshot_store.close()
+    root.destroy()
+
+
+# Function to plan a manifest file against live state and show the plan before applying it
+def apply_manifest_dialog():
+    path = filedialog.askopenfilename(
+        title="Open Manifest",
+        filetypes=[("Manifests", "*.yaml *.yml *.json *.csv"), ("All files", "*.*")]
+    )
+    if not path:
+        return
+    backend = get_backend()
+    task_runner.submit(
+        manifest.plan_manifest, backend, path, BULK_PARALLELISM,
+        on_success=lambda steps: show_plan(path, backend, steps),
+        on_error=lambda e: messagebox.showerror("Error", str(e)),
+        description="plan manifest"
+    )
+
+
+# Function to show the planned changes (a dry run) with a button to apply them
+def show_plan(path, backend, steps):
+    dialog = tk.Toplevel(root)
+    dialog.title(f"Plan: {os.path.basename(path)}")
+
+    summary = ", ".join(f"{sum(step.action == action for step in steps)} to {action}"
+                        for action in ("create", "update", "grant", "revoke", "delete")
+                        if any(step.action == action for step in steps))
+    tk.Label(dialog, text=summary or "No changes. Polaris already matches the manifest.").grid(row=0, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+
+    plan_table = ttk.Treeview(dialog, columns=("Action", "Kind", "Name", "Details"), show="headings")
+    for column in ("Action", "Kind", "Name", "Details"):
+        plan_table.heading(column, text=column)
+    for step in steps:
+        plan_table.insert('', 'end', values=(step.action, step.kind, step.name, step.details))
+    plan_table.grid(row=1, column=0, columnspan=2, sticky="nsew")
+
+    def apply_plan():
+        dialog.destroy()
+        stream_with_progress(
+            "Apply Manifest", len(steps),
+            manifest.execute_plan, backend, steps, BULK_PARALLELISM,
+            describe=str,
+            on_done=lambda outcomes: on_manifest_applied()
+        )
+
+    apply_button = tk.Button(dialog, text="Apply", command=apply_plan, state=tk.NORMAL if steps else tk.DISABLED)
+    apply_button.grid(row=2, column=0, sticky="ew", padx=5, pady=5)
+    tk.Button(dialog, text="Close", command=dialog.destroy).grid(row=2, column=1, sticky="ew", padx=5, pady=5)
+
+
+# Function to refresh every listing after a manifest was applied
+def on_manifest_applied():
+    get_entity_cache().clear()
+    list_catalogs(refresh=True)
+    list_principals(refresh=True)
+    list_principal_roles(refresh=True)
+    load_assigned_roles()
+
+
+# Function to load assigned roles for the selected principal
+def load_assigned_roles():
+    # Get the selected principal
+    selected_item = principal_table.selection()
+
+    if not selected_item:
+        return  # No principal selected, do nothing
+
+    # Get the principal name from the first selected row
+    principal_name = principal_table.item(selected_item[0], 'values')[0]
+
+    if not principal_name:
+        return  # Unable to retrieve the principal name, do nothing
+
+    # A newer selection supersedes the previous lookup
+    global assigned_roles_task
+    if assigned_roles_task is not None:
+        assigned_roles_task.cancel()
+
+    # Clear the table unless the roles are cached, so another principal's roles are not shown
+    cache_key = (cache.ASSIGNED_ROLES, principal_name)
+    if get_entity_cache().get(cache_key) is None:
+        assigned_roles_renderer.clear()
+
+    # Run the backend operation to list roles assigned to the principal
+    assigned_roles_task = load_table(
+        cache_key,
+        "iter_principal_roles",
+        assigned_roles_renderer,
+        "assigned roles",
+        principal=principal_name
+    )
+    prefetch_assigned_roles()
+
+
+# Function to load the assigned roles once the principal selection settles
+def schedule_load_assigned_roles():
+    global assigned_roles_job
+    if assigned_roles_job is not None:
+        root.after_cancel(assigned_roles_job)
+    assigned_roles_job = root.after(SELECTION_DEBOUNCE_MS, run_scheduled_load_assigned_roles)
+
+
+def run_scheduled_load_assigned_roles():
+    global assigned_roles_job
+    assigned_roles_job = None
+    load_assigned_roles()
+
+
+# Function to warm the cache with the roles of visible principals and the selection's neighbours
+def prefetch_assigned_roles():
+    children = principal_table.get_children()
+    if not children:
+        return
+    first, last = principal_table.yview()
+    start = int(first * len(children))
+    end = min(len(children), int(last * len(children)) + 1)
+    candidates = list(children[start:end])
+    for item in principal_table.selection()[:1]:
+        index = principal_table.index(item)
+        candidates.extend(children[max(0, index - PREFETCH_NEIGHBOURS):index + PREFETCH_NEIGHBOURS + 1])
+
+    # Item IDs are principal names; the selection itself is loaded by load_assigned_roles
+    entity_cache = get_entity_cache()
+    selected = set(principal_table.selection())
+    principal_names = []
+    for principal_name in candidates:
+        if principal_name in selected or principal_name in principal_names:
+            continue
+        if entity_cache.get((cache.ASSIGNED_ROLES, principal_name)) is None:
+            principal_names.append(principal_name)
+    if principal_names:
+        backend = get_backend()
+        assigned_roles_prefetcher.request(
+            principal_names,
+            lambda principal_name: fetch_assigned_roles(backend, entity_cache, principal_name),
+            description="prefetch roles of"
+        )
+
+
+# Function to fetch a principal's roles into the cache; runs on a worker thread
+def fetch_assigned_roles(backend, entity_cache, principal_name):
+    cache_key = (cache.ASSIGNED_ROLES, principal_name)
+    generation = entity_cache.generation(cache_key)
+    if entity_cache.get(cache_key) is None:
+        entity_cache.put(cache_key, backend.list_principal_roles(principal_name), generation)
+
+
+# Function to get a principal's roles, from the cache when fresh; runs on a worker thread
+def cached_assigned_roles(backend, entity_cache, principal_name):
+    cache_key = (cache.ASSIGNED_ROLES, principal_name)
+    cached = entity_cache.get(cache_key)
+    if cached is not None and cached[1]:
+        return cached[0]
+    generation = entity_cache.generation(cache_key)
+    roles = backend.list_principal_roles(principal_name)
+    entity_cache.put(cache_key, roles, generation)
+    return roles
+
+
+# Function to show which principals hold which principal roles, built by querying principals concurrently
+def assignment_matrix_dialog():
+    dialog = tk.Toplevel(root)
+    dialog.title("Role Assignments")
+    index = assignments.AssignmentIndex()
+    failures = []
+
+    progress_label = tk.Label(dialog, text="Loading principals...", anchor="w")
+    progress_label.grid(row=0, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
+
+    # Roles with their holder count; selecting one lists its holders from the inverted index
+    role_table = ttk.Treeview(dialog, columns=("Principal Role", "Holders"), show="headings", selectmode="browse")
+    role_table.heading("Principal Role", text="Principal Role")
+    role_table.heading("Holders", text="Holders")
+    role_table.grid(row=1, column=0, sticky="nsew")
+    holder_table = ttk.Treeview(dialog, columns=("Principal",), show="headings")
+    holder_table.heading("Principal", text="Principal")
+    holder_table.grid(row=1, column=1, columnspan=2, sticky="nsew")
+
+    # One row per principal, one column per role
+    matrix_table = ttk.Treeview(dialog, columns=("Principal",), show="headings")
+    matrix_table.heading("Principal", text="Principal")
+    matrix_table.grid(row=2, column=0, columnspan=3, sticky="nsew")
+
+    role_renderer = TableRenderer(role_table, lambda role: (role["name"], len(index.holders(role["name"]))))
+    holder_renderer = TableRenderer(holder_table, lambda principal: (principal["name"],))
+
+    def show_roles():
+        role_renderer.render([{"name": role} for role in index.roles])
+
+    def show_holders():
+        selection = role_table.selection()
+        holders = index.holders(selection[0]) if selection else []
+        holder_renderer.render([{"name": principal} for principal in holders])
+
+    def show_matrix():
+        roles = index.roles
+        matrix_table.configure(columns=("Principal", *roles))
+        for column in ("Principal", *roles):
+            matrix_table.heading(column, text=column)
+            matrix_table.column(column, width=120, stretch=False)
+        matrix_renderer = TableRenderer(
+            matrix_table,
+            lambda principal: (principal["name"], *("x" if index.has_role(principal["name"], role) else "" for role in roles))
+        )
+        matrix_renderer.render([{"name": principal} for principal in index.principals])
+
+    def on_batch(batch):
+        for principal_name, role_names, error in batch:
+            if error is None:
+                index.set_roles(principal_name, role_names)
+            else:
+                failures.append((principal_name, error))
+        progress_label.config(text=f"Loaded roles of {len(index)} principals...")
+        show_roles()
+        show_holders()
+
+    def on_success(count):
+        text = f"{len(index)} principals, {len(index.roles)} principal roles."
+        if failures:
+            text += f" Failed to load {len(failures)} principals: " + ", ".join(name for name, error in failures[:5])
+        progress_label.config(text=text)
+        show_roles()
+        show_matrix()
+
+    def on_error(error):
+        progress_label.config(text="Failed to load role assignments.")
+        show_backend_error(error)
+
+    def on_roles_listed(roles):
+        index.add_known_roles(role["name"] for role in roles)
+        show_roles()
+
+    def export_csv():
+        path = filedialog.asksaveasfilename(parent=dialog, defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["principal", "principal_role"])
+                writer.writerows(index.pairs())
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export role assignments: {e}", parent=dialog)
+
+    backend = get_backend()
+    entity_cache = get_entity_cache()
+    task = task_runner.stream(
+        assignments.iter_assignments, backend,
+        lambda principal_name: cached_assigned_roles(backend, entity_cache, principal_name),
+        MATRIX_PARALLELISM,
+        on_batch=on_batch,
+        on_success=on_success,
+        on_error=on_error,
+        description="load role assignments"
+    )
+    # Roles nobody holds still get a (empty) column
+    roles_task = run_backend_operation("list_principal_roles", on_success=on_roles_listed)
+
+    def close():
+        task.cancel()
+        roles_task.cancel()
+        dialog.destroy()
+
+    role_table.bind("<<TreeviewSelect>>", lambda event: show_holders())
+    tk.Button(dialog, text="Export CSV...", command=export_csv).grid(row=3, column=0, sticky="ew", padx=5, pady=5)
+    tk.Button(dialog, text="Close", command=close).grid(row=3, column=2, sticky="ew", padx=5, pady=5)
+    dialog.protocol("WM_DELETE_WINDOW", close)
+    dialog.rowconfigure(2, weight=1)
+    dialog.columnconfigure(1, weight=1)
+
+
+# Function to read the saved connection profiles; a broken profiles file is reported and ignored
+def read_profiles():
+    try:
+        return profiles.load_profiles(PROFILES_PATH)
+    except profiles.ProfileError as e:
+        logging.error(str(e))
+        messagebox.showerror("Error", str(e))
+        return {}
+
+
+# Function to fill the connection fields from the selected profile and reload the tables for it
+def apply_profile():
+    connection = read_profiles().get(profile_var.get())
+    if connection is None:
+        return
+    for entry, value in ((polaris_cli_path_entry, connection.cli_path), (host_entry, connection.host),
+                         (port_entry, connection.port), (client_id_entry, connection.client_id),
+                         (client_secret_entry, connection.client_secret)):
+        entry.delete(0, tk.END)
+        entry.insert(0, value or "")
+    backend_var.set(connection.backend)
+    logging.info(f"Switched to profile {profile_var.get()}: {connection}")
+    catalog_explorer.clear()
+    loaded_listings.clear()
+    start_initial_load()
+
+
+# Function to save the connection fields as a named profile (without the client secret)
+def save_profile_dialog():
+    name = simpledialog.askstring("Save Profile", "Profile name:", initialvalue=profile_var.get(), parent=root)
+    if not name:
+        return
+    try:
+        profiles.save_profile(name, current_connection(), PROFILES_PATH)
+    except (OSError, profiles.ProfileError) as e:
+        messagebox.showerror("Error", f"Failed to save profile: {e}")
+        return
+    profile_var.set(name)
+    profile_combobox.configure(values=list(read_profiles()))
+    if client_secret_entry.get():
+        messagebox.showinfo("Save Profile", f"Profile '{name}' saved. The client secret is not stored; set "
+                                            f"{profiles.secret_variable(name)} to supply it.")
+
+
+# Function to list an entity in several saved environments at the same time, merged with an
+# Environment column or side by side with one column per environment and drifted rows marked
+def compare_environments_dialog():
+    saved = read_profiles()
+    if not saved:
+        messagebox.showinfo("Compare Environments", "Save a connection profile per environment first.")
+        return
+    dialog = tk.Toplevel(root)
+    dialog.title("Compare Environments")
+
+    tk.Label(dialog, text="Environments:").grid(row=0, column=0, sticky="nw", padx=5, pady=5)
+    profile_list = tk.Listbox(dialog, selectmode=tk.MULTIPLE, height=min(len(saved), 8), exportselection=False)
+    for name in saved:
+        profile_list.insert(tk.END, name)
+    profile_list.selection_set(0, tk.END)
+    profile_list.grid(row=0, column=1, sticky="ew", padx=5, pady=5)
+
+    entity_var = tk.StringVar(value="principal-roles")
+    ttk.Combobox(dialog, textvariable=entity_var, values=sorted(LISTINGS), state="readonly").grid(row=1, column=0, padx=5)
+    side_by_side_var = tk.BooleanVar(value=True)
+    tk.Checkbutton(dialog, text="Side by side", variable=side_by_side_var).grid(row=1, column=1, sticky="w")
+
+    result_table = ttk.Treeview(dialog, show="headings")
+    result_table.grid(row=3, column=0, columnspan=3, sticky="nsew")
+    progress_label = tk.Label(dialog, text="", anchor="w")
+    progress_label.grid(row=4, column=0, columnspan=3, sticky="ew", padx=5)
+    state = {"task": None}
+
+    def show(columns, rows):
+        result_table.delete(*result_table.get_children())
+        result_table.configure(columns=columns)
+        for column in columns:
+            result_table.heading(column, text=column)
+            result_table.column(column, width=120)
+        for values, tags in rows:
+            result_table.insert("", tk.END, values=values, tags=tags)
+        result_table.tag_configure("drift", background="#fde2e2")
+
+    def compare():
+        if state["task"] is not None:
+            state["task"].cancel()
+        names = [profile_list.get(index) for index in profile_list.curselection()]
+        if not names:
+            return
+        connections = {name: saved[name] for name in names}
+        entity = entity_var.get()
+        operation, columns, row = LISTINGS[entity]
+        side_by_side = side_by_side_var.get()
+        results = {}
+        failures = []
+
+        def on_batch(batch):
+            for name, records, error in batch:
+                if error is None:
+                    results[name] = records
+                else:
+                    failures.append((name, error))
+            progress_label.config(text=f"{len(results) + len(failures)} of {len(names)} environments answered...")
+
+        def on_success(count):
+            ordered = {name: results[name] for name in names if name in results}
+            if side_by_side:
+                rows = profiles.side_by_side(ordered)
+                show(("Name", *ordered, "Drift"), [
+                    ((name, *("present" if record is not None else "missing" for record in by_environment.values()),
+                      "DRIFT" if drifted else ""), ("drift",) if drifted else ())
+                    for name, by_environment, drifted in rows
+                ])
+                text = f"{sum(1 for row in rows if row[2])} of {len(rows)} {entity} differ."
+            else:
+                show(("Environment", *columns),
+                     [((name, *row(record)), ()) for name, record in profiles.merge_results(ordered)])
+                text = f"{sum(len(records) for records in ordered.values())} {entity} in {len(ordered)} environments."
+            if failures:
+                text += " Failed: " + "; ".join(f"{name}: {error}" for name, error in failures)
+            progress_label.config(text=text)
+
+        progress_label.config(text=f"Querying {len(names)} environments...")
+        state["task"] = task_runner.stream(
+            profiles.fan_out, connections, operation,
+            on_batch=on_batch,
+            on_success=on_success,
+            on_error=show_backend_error,
+            description=f"compare {entity}"
+        )
+
+    def close():
+        if state["task"] is not None:
+            state["task"].cancel()
+        dialog.destroy()
+
+    tk.Button(dialog, text="Compare", command=compare).grid(row=1, column=2, sticky="ew", padx=5, pady=5)
+    tk.Button(dialog, text="Close", command=close).grid(row=5, column=2, sticky="ew", padx=5, pady=5)
+    dialog.protocol("WM_DELETE_WINDOW", close)
+    dialog.rowconfigure(3, weight=1)
+    dialog.columnconfigure(1, weight=1)
+
+
+# Function to reload the catalogs shown in the explorer; when the explorer is first shown, a fresh
+# catalog listing loaded for the Catalogs tab is reused
+def refresh_explorer(use_cache=False):
+    catalog_explorer.clear()
+    cached = get_entity_cache().get((cache.CATALOGS,)) if use_cache else None
+    if cached is not None and cached[1]:
+        catalog_explorer.set_catalogs(catalog["name"] for catalog in cached[0])
+        return
+    run_backend_operation(
+        "list_catalogs",
+        on_success=lambda catalogs: catalog_explorer.set_catalogs(catalog["name"] for catalog in catalogs)
+    )
+
+
+# Function to refetch the children of the selected explorer nodes
+def reload_explorer_selection():
+    for item in explorer_tree.selection():
+        catalog_explorer.reload(item)
+
+
+# Function to fill a tab the first time it is shown
+def on_tab_changed():
+    tab = notebook.select()
+    if tab == str(explorer_frame) and not explorer_tree.get_children():
+        refresh_explorer(use_cache=True)
+    elif STARTUP_LOAD != "none":
+        populate_tab(tab)
+
+
+# Function to return the list functions filling the tables of a notebook tab
+def tab_listings(tab):
+    if tab == str(catalog_frame):
+        return (list_catalogs,)
+    if tab == str(principal_frame):
+        return (list_principals, list_principal_roles)
+    return ()
+
+
+# Function to run the list functions of a tab that have not run yet. Failures are shown in the
+# status bar rather than one dialog per table, since nobody asked for these listings yet.
+def populate_tab(tab):
+    # Without credentials every call would fail; the tab is filled once they are entered and it is shown again
+    if backend_var.get() == backends.BACKEND_REST and not (client_id_entry.get() and client_secret_entry.get()):
+        return
+    for list_function in tab_listings(tab):
+        if list_function in loaded_listings:
+            continue
+        loaded_listings.add(list_function)
+        entity = list_function.__name__.replace("list_", "").replace("_", " ")
+
+        def on_error(error, entity=entity):
+            logging.warning(f"Failed to load {entity} at startup: {error}")
+            snapshot_label.config(text=f"Failed to load {entity}: {error}")
+
+        list_function(on_error=on_error)
+
+
+# Function to load the visible tab right away. Its listings and, with STARTUP_LOAD "all", those of
+# the other tabs are submitted together and run concurrently on the task runner, so the window is
+# usable after the slowest single listing rather than the sum of all of them.
+def start_initial_load():
+    if STARTUP_LOAD == "none":
+        return
+    visible = notebook.select()
+    populate_tab(visible)
+    if STARTUP_LOAD == "all":
+        for tab in notebook.tabs():
+            if tab != visible:
+                populate_tab(tab)
+
+
+# List functions that already ran, so startup and tab activation do not fetch a listing twice
+loaded_listings = set()
+# Background task loading the assigned roles of the selected principal
+assigned_roles_task = None
+# Pending debounced load of the assigned roles
+assigned_roles_job = None
+
+# Function to build the main window and run the Tk event loop
+def main():
+    global root, polaris_cli_path_entry, host_entry, port_entry, client_id_entry, client_secret_entry, backend_var, \
+        profile_var, profile_combobox, notebook, catalog_frame, catalog_table, principal_frame, principal_table, principal_role_table, \
+        assigned_roles_table, catalog_renderer, principal_renderer, principal_role_renderer, assigned_roles_renderer, \
+        explorer_frame, explorer_tree, status_label, snapshot_label, health_label, progress_bar, cancel_button, entity_caches, \
+        snapshot_store, task_runner, assigned_roles_prefetcher, catalog_explorer, catalog_pages, principal_pages
+
+    # Set up logging: records are written to a rotating log file and the console by a background thread,
+    # with long messages truncated and secrets redacted
+    logs.setup_logging_from_env()
+
+    # Main Application window
+    root = tk.Tk()
+    root.title("Polaris Management GUI")
+
+    # Set up frames for Polaris CLI path, Host, Port, Client ID, and Secret input
+    auth_frame = ttk.Frame(root)
+    auth_frame.pack(pady=10)
+
+    tk.Label(auth_frame, text="Polaris CLI Path:").grid(row=0, column=0)
+    polaris_cli_path_entry = tk.Entry(auth_frame, width=30)
+    polaris_cli_path_entry.insert(0, DEFAULT_POLARIS_CLI_PATH)
+    polaris_cli_path_entry.grid(row=0, column=1)
+
+    tk.Label(auth_frame, text="Host:").grid(row=1, column=0)
+    host_entry = tk.Entry(auth_frame, width=30)
+    host_entry.insert(0, DEFAULT_HOST)
+    host_entry.grid(row=1, column=1)
+
+    tk.Label(auth_frame, text="Port:").grid(row=2, column=0)
+    port_entry = tk.Entry(auth_frame, width=30)
+    port_entry.insert(0, DEFAULT_PORT)
+    port_entry.grid(row=2, column=1)
+
+    tk.Label(auth_frame, text="Client ID:").grid(row=3, column=0)
+    client_id_entry = tk.Entry(auth_frame, width=30)
+    client_id_entry.insert(0, DEFAULT_CLIENT_ID)
+    client_id_entry.grid(row=3, column=1)
+
+    tk.Label(auth_frame, text="Client Secret:").grid(row=4, column=0)
+    client_secret_entry = tk.Entry(auth_frame, width=30, show="*")
+    client_secret_entry.insert(0, DEFAULT_CLIENT_SECRET)
+    client_secret_entry.grid(row=4, column=1)
+
+    tk.Label(auth_frame, text="Backend:").grid(row=5, column=0)
+    backend_var = tk.StringVar(value=DEFAULT_BACKEND)
+    backend_combobox = ttk.Combobox(auth_frame, textvariable=backend_var, values=backends.BACKEND_NAMES, state="readonly", width=27)
+    backend_combobox.grid(row=5, column=1)
+
+    tk.Label(auth_frame, text="Profile:").grid(row=6, column=0)
+    profile_var = tk.StringVar()
+    profile_combobox = ttk.Combobox(auth_frame, textvariable=profile_var, values=list(read_profiles()), state="readonly", width=27)
+    profile_combobox.grid(row=6, column=1)
+    profile_combobox.bind("<<ComboboxSelected>>", lambda event: apply_profile())
+    tk.Button(auth_frame, text="Save As...", command=save_profile_dialog).grid(row=6, column=2, padx=5)
+
+    # Toolbar for actions spanning all entities
+    toolbar_frame = ttk.Frame(root)
+    toolbar_frame.pack(fill=tk.X, padx=5)
+    tk.Button(toolbar_frame, text="Apply Manifest...", command=apply_manifest_dialog).pack(side=tk.LEFT)
+    tk.Button(toolbar_frame, text="Role Assignments...", command=assignment_matrix_dialog).pack(side=tk.LEFT, padx=5)
+    tk.Button(toolbar_frame, text="Diagnostics...", command=diagnostics_dialog).pack(side=tk.LEFT)
+    tk.Button(toolbar_frame, text="Compare Environments...", command=compare_environments_dialog).pack(side=tk.LEFT, padx=5)
+
+    # Tabbed interface for Catalog and Principal management
+    notebook = ttk.Notebook(root)
+    # Catalogs Tab
+    catalog_frame = ttk.Frame(notebook)
+    notebook.add(catalog_frame, text="Catalogs")
+
+    # Catalog Table
+    catalog_table = ttk.Treeview(catalog_frame, columns=("Name", "Type", "Storage Type", "Base Location"), show="headings", selectmode="extended")
+    catalog_table.heading("Name", text="Name")
+    catalog_table.heading("Type", text="Type")
+    catalog_table.heading("Storage Type", text="Storage Type")
+    catalog_table.heading("Base Location", text="Base Location")
+    catalog_table.grid(row=1, column=0, columnspan=3, sticky="nsew")
+
+    tk.Button(catalog_frame, text="List Catalogs", command=lambda: list_catalogs(refresh=True)).grid(row=2, column=0, sticky="ew", padx=5, pady=5)
+    tk.Button(catalog_frame, text="Create Catalog", command=create_catalog_dialog).grid(row=2, column=1, sticky="ew", padx=5, pady=5)
+    tk.Button(catalog_frame, text="Delete Catalog", command=delete_catalog).grid(row=2, column=2, sticky="ew", padx=5, pady=5)
+
+    # Principals Tab
+    principal_frame = ttk.Frame(notebook)
+    notebook.add(principal_frame, text="Principals")
+
+    # Principal Table
+    principal_table = ttk.Treeview(principal_frame, columns=("Name", "Client ID", "Type", "Created Timestamp"), show="headings", selectmode="extended")
+    principal_table.heading("Name", text="Name")
+    principal_table.heading("Client ID", text="Client ID")
+    principal_table.heading("Type", text="Type")
+    principal_table.heading("Created Timestamp", text="Created Timestamp")
+    principal_table.grid(row=1, column=0, columnspan=3, sticky="nsew")
+
+    # Principal Roles Table
+    principal_role_table = ttk.Treeview(principal_frame, columns=("Principal Role", "Properties"), show="headings", selectmode="extended")
+    principal_role_table.heading("Principal Role", text="Principal Role")
+    principal_role_table.heading("Properties", text="Properties")
+    principal_role_table.grid(row=3, column=0, columnspan=3, sticky="nsew")
+
+    # Assigned Roles Table (for roles assigned to selected principal)
+    assigned_roles_table = ttk.Treeview(principal_frame, columns=("Role Name", "Properties"), show="headings", selectmode="extended")
+    assigned_roles_table.heading("Role Name", text="Role Name")
+    assigned_roles_table.heading("Properties", text="Properties")
+    assigned_roles_table.grid(row=5, column=0, columnspan=3, sticky="nsew")
+
+    # Rows are inserted in time-sliced batches so large listings do not freeze the window
+    catalog_renderer = TableRenderer(catalog_table, catalog_row, search_text=row_search_text(catalog_row), name="catalogs")
+    principal_renderer = TableRenderer(principal_table, principal_row, search_text=row_search_text(principal_row), name="principals")
+    principal_role_renderer = TableRenderer(principal_role_table, principal_role_row, search_text=row_search_text(principal_role_row), name="principal_roles")
+    assigned_roles_renderer = TableRenderer(assigned_roles_table, principal_role_row, search_text=row_search_text(principal_role_row), name="assigned_roles")
+
+    # Filter boxes above each table
+    # Opt-in auto-refresh of the listings, toggled next to their filter boxes
+    catalog_watcher = create_watcher("catalogs", (cache.CATALOGS,), "list_catalogs", catalog_renderer, catalog_frame)
+    principal_watcher = create_watcher("principals", (cache.PRINCIPALS,), "list_principals", principal_renderer, principal_frame,
+                                       on_changed=prefetch_assigned_roles)
+    principal_role_watcher = create_watcher("principal_roles", (cache.PRINCIPAL_ROLES,), "list_principal_roles",
+                                            principal_role_renderer, principal_frame)
+
+    add_filter_entry(catalog_frame, catalog_renderer, row=0, watcher=catalog_watcher)
+    add_filter_entry(principal_frame, principal_renderer, row=0, watcher=principal_watcher)
+    add_filter_entry(principal_frame, principal_role_renderer, row=2, watcher=principal_role_watcher)
+    add_filter_entry(principal_frame, assigned_roles_renderer, row=4)
+
+    # Bind the selection event for the Principals Table
+    principal_table.bind("<<TreeviewSelect>>", lambda event: schedule_load_assigned_roles())
+
+    # Buttons for managing principals
+    tk.Button(principal_frame, text="List Principals", command=lambda: list_principals(refresh=True)).grid(row=6, column=0, sticky="ew", padx=5, pady=5)
+    tk.Button(principal_frame, text="Create Principal", command=create_principal_dialog).grid(row=6, column=1, sticky="ew", padx=5, pady=5)
+    tk.Button(principal_frame, text="Delete Principal", command=delete_principal).grid(row=6, column=2, sticky="ew", padx=5, pady=5)
+
+    # Buttons for managing principal roles
+    tk.Button(principal_frame, text="List Principal Roles", command=lambda: list_principal_roles(refresh=True)).grid(row=7, column=0, sticky="ew", padx=5, pady=5)
+    tk.Button(principal_frame, text="Create Principal Role", command=create_principal_role_dialog).grid(row=7, column=1, sticky="ew", padx=5, pady=5)
+    tk.Button(principal_frame, text="Delete Principal Role", command=delete_principal_role).grid(row=7, column=2, sticky="ew", padx=5, pady=5)
+    tk.Button(principal_frame, text="Grant Principal Role", command=grant_principal_role).grid(row=8, column=0, sticky="ew", padx=5, pady=5)
+    tk.Button(principal_frame, text="Revoke Principal Role", command=revoke_principal_role_dialog).grid(row=8, column=1, sticky="ew", padx=5, pady=5)
+    tk.Button(principal_frame, text="Revoke Selected Roles", command=revoke_selected_principal_roles).grid(row=8, column=2, sticky="ew", padx=5, pady=5)
+
+    # Explorer Tab
+    explorer_frame = ttk.Frame(notebook)
+    notebook.add(explorer_frame, text="Explorer")
+
+    # Catalogs expand into catalog roles (with grants) and namespaces (with tables), loaded on first expand
+    explorer_tree = ttk.Treeview(explorer_frame, columns=("Details",), show="tree headings")
+    explorer_tree.heading("#0", text="Name")
+    explorer_tree.heading("Details", text="Details")
+    explorer_tree.grid(row=0, column=0, columnspan=2, sticky="nsew")
+    explorer_frame.rowconfigure(0, weight=1)
+    explorer_frame.columnconfigure((0, 1), weight=1)
+
+    tk.Button(explorer_frame, text="Refresh Catalogs", command=refresh_explorer).grid(row=1, column=0, sticky="ew", padx=5, pady=5)
+    tk.Button(explorer_frame, text="Reload Selected", command=reload_explorer_selection).grid(row=1, column=1, sticky="ew", padx=5, pady=5)
+    notebook.bind("<<NotebookTabChanged>>", lambda event: on_tab_changed())
+
+    # Add the notebook (tab interface) to the window
+    notebook.pack(fill=tk.BOTH, expand=True)
+
+    # Status bar showing background work
+    status_frame = ttk.Frame(root)
+    status_frame.pack(fill=tk.X, side=tk.BOTTOM)
+    status_label = tk.Label(status_frame, text="Ready", anchor="w")
+    status_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+    snapshot_label = tk.Label(status_frame, text="", anchor="e")
+    snapshot_label.pack(side=tk.LEFT, padx=5)
+    health_label = tk.Label(status_frame, text="", anchor="e")
+    health_label.pack(side=tk.LEFT, padx=5)
+    progress_bar = ttk.Progressbar(status_frame, length=150, mode="determinate")
+    progress_bar.pack(side=tk.RIGHT, padx=5)
+    cancel_button = tk.Button(status_frame, text="Cancel", state=tk.DISABLED, command=lambda: task_runner.cancel_all())
+    cancel_button.pack(side=tk.RIGHT, padx=5, pady=2)
+
+    # Cached listings, one cache per host, port and client ID
+    entity_caches = {}
+
+    # Last-known listings persisted across restarts
+    snapshot_store = None
+    if SNAPSHOT_PATH:
+        try:
+            snapshot_store = snapshots.SnapshotStore(SNAPSHOT_PATH)
+        except Exception as e:
+            logging.error(f"Snapshots disabled, failed to open {SNAPSHOT_PATH}: {e}")
+
+    # Backend operations run on a worker pool; results are delivered on the Tk thread
+    task_runner = TaskRunner(root.after, on_status_change=update_status)
+    task_runner.start()
+    assigned_roles_prefetcher = Prefetcher(task_runner)
+    # Catalog explorer; children are fetched on the task runner when nodes are expanded
+    catalog_explorer = CatalogExplorer(explorer_tree, task_runner, get_backend, on_error=show_backend_error)
+    # Page-by-page loading of the catalog and principal tables
+    catalog_pages = PagedLoader(task_runner, catalog_renderer)
+    principal_pages = PagedLoader(task_runner, principal_renderer)
+
+    # Start the Tkinter loop
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    restore_snapshot()
+    update_health_indicator()
+    if METRICS_FILE:
+        export_metrics_periodically()
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
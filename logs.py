@@ -0,0 +1,136 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import re
+
+DEFAULT_LOG_FILE = "app.log"
+DEFAULT_LEVEL = "INFO"
+DEFAULT_CONSOLE_LEVEL = "WARNING"
+# The log file is rotated at this size, keeping this many old files
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+# Longer messages (e.g. whole CLI listings) are cut to this many characters
+DEFAULT_MAX_MESSAGE_LENGTH = 2000
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+REDACTED = "***"
+
+# Patterns whose first group is kept and whose second group is replaced by REDACTED
+SECRET_PATTERNS = [
+    # CLI flags: --client-secret value, --client-secret=value
+    re.compile(r"(--client[-_]secret[=\s]+)(\S+)", re.IGNORECASE),
+    # Form and query parameters: client_secret=value
+    re.compile(r"((?:client_secret|access_token|refresh_token|password)=)([^&\s]+)", re.IGNORECASE),
+    # JSON fields: "clientSecret": "value"; the closing quote may have been truncated
+    re.compile(r"(\"(?:client_?secret|access_token|refresh_token|password|token)\"\s*:\s*\")([^\"]*)",
+               re.IGNORECASE),
+    # Authorization headers
+    re.compile(r"(Bearer\s+)([A-Za-z0-9\-._~+/]+=*)"),
+]
+
+
+# Function to replace secrets in a log message
+def redact(message):
+    for pattern in SECRET_PATTERNS:
+        message = pattern.sub(lambda match: match.group(1) + REDACTED, message)
+    return message
+
+
+class RedactingFilter(logging.Filter):
+    """Truncates long log messages and redacts secrets from them."""
+
+    def __init__(self, max_length=DEFAULT_MAX_MESSAGE_LENGTH):
+        super().__init__()
+        self.max_length = max_length
+
+    def filter(self, record):
+        # The filter is shared by several handlers; each record is only processed once
+        if getattr(record, "redacted", False):
+            return True
+        record.redacted = True
+        if self.max_length and isinstance(record.args, tuple):
+            # Cut long arguments (e.g. a listing logged with %s) before the message is built from them
+            record.args = tuple(_shorten(arg, self.max_length) for arg in record.args)
+        message = redact(record.getMessage())
+        if self.max_length and len(message) > self.max_length:
+            message = f"{message[:self.max_length]}... [{len(message) - self.max_length} more characters]"
+        record.msg = message
+        record.args = None
+        return True
+
+
+def _shorten(value, max_length):
+    if isinstance(value, str) and len(value) > max_length:
+        return f"{value[:max_length]}... [{len(value) - max_length} more characters]"
+    return value
+
+
+class RedactingQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for a QueueListener after redacting and truncating them.
+
+    QueueHandler.prepare formats the message on the logging thread, so the
+    cut happens here, before a large message is built and queued.
+    """
+
+    def __init__(self, records, max_length=DEFAULT_MAX_MESSAGE_LENGTH):
+        super().__init__(records)
+        self.redacting_filter = RedactingFilter(max_length)
+
+    def prepare(self, record):
+        self.redacting_filter.filter(record)
+        return super().prepare(record)
+
+
+# Function to route all logging through a queue to a rotating file and the console.
+# Callers redact, truncate and queue records; a listener thread formats and writes them.
+# Returns the QueueListener, which is stopped (flushing the queue) at exit.
+def setup_logging(level=DEFAULT_LEVEL, console_level=DEFAULT_CONSOLE_LEVEL, path=DEFAULT_LOG_FILE,
+                  max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                  max_message_length=DEFAULT_MAX_MESSAGE_LENGTH):
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if path:
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                            encoding="utf-8")
+        file_handler.setLevel(_level(level))
+        handlers.append(file_handler)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(_level(console_level))
+    handlers.append(console_handler)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(RedactingQueueHandler(records, max_message_length))
+    # Records below every handler's level are dropped before they are formatted or queued
+    root.setLevel(min(handler.level for handler in handlers))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def _level(value):
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {value}")
+    return level
+
+
+# Function to set up logging from the POLARIS_LOG_* environment variables
+def setup_logging_from_env(console_level=DEFAULT_CONSOLE_LEVEL, path=DEFAULT_LOG_FILE):
+    return setup_logging(
+        level=os.getenv("POLARIS_LOG_LEVEL", DEFAULT_LEVEL),
+        console_level=os.getenv("POLARIS_CONSOLE_LOG_LEVEL", console_level),
+        path=os.getenv("POLARIS_LOG_FILE", path),
+        max_bytes=int(os.getenv("POLARIS_LOG_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        backup_count=int(os.getenv("POLARIS_LOG_BACKUPS", DEFAULT_BACKUP_COUNT)),
+        max_message_length=int(os.getenv("POLARIS_LOG_MAX_MESSAGE_LENGTH", DEFAULT_MAX_MESSAGE_LENGTH))
+    )
@@ -0,0 +1,309 @@
+import csv
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from backends import CATALOG_OPTIONS
+
+DEFAULT_PARALLELISM = 4
+
+# Entities that are never pruned, even when they are missing from a manifest
+PROTECTED_PRINCIPALS = {"root"}
+PROTECTED_PRINCIPAL_ROLES = {"service_admin"}
+
+CATALOG_FIELDS = {"name", "type", "storage_type", "default_base_location", "properties"} | set(CATALOG_OPTIONS)
+
+
+class ManifestError(Exception):
+    """Raised when a manifest cannot be read or is invalid."""
+
+
+class SkippedError(Exception):
+    """Reported for plan steps that did not run because a step they depend on failed."""
+
+
+class Step:
+    """One change in a plan, run as backend.<operation>(*args)."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, action, kind, name, operation, args, details="", depends_on=()):
+        self.id = next(self._ids)
+        self.action = action
+        self.kind = kind
+        self.name = name
+        self.operation = operation
+        self.args = args
+        self.details = details
+        self.depends_on = list(depends_on)
+
+    def __str__(self):
+        return f"{self.action} {self.kind} {self.name}"
+
+
+# Function to load a manifest from a YAML, JSON or CSV file
+def load_manifest(path):
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, newline="") as f:
+            if extension == ".json":
+                data = json.load(f)
+            elif extension in (".yaml", ".yml"):
+                try:
+                    import yaml
+                except ImportError as e:
+                    raise ManifestError("YAML manifests require PyYAML (pip install pyyaml).") from e
+                try:
+                    data = yaml.safe_load(f) or {}
+                except yaml.YAMLError as e:
+                    raise ManifestError(f"Failed to parse manifest {path}: {e}") from e
+            elif extension == ".csv":
+                data = _read_csv(f)
+            else:
+                raise ManifestError(f"Unsupported manifest format: {extension or path}")
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"Failed to read manifest {path}: {e}") from e
+    return normalize_manifest(data)
+
+
+# Function to read a CSV manifest; each row has a "kind" column (catalog, principal, principal_role
+# or grant), and properties are written as key=value pairs separated by semicolons
+def _read_csv(f):
+    data = {"catalogs": [], "principals": [], "principal_roles": [], "grants": []}
+    sections = {"catalog": "catalogs", "principal": "principals", "principal_role": "principal_roles",
+                "grant": "grants"}
+    for line_number, row in enumerate(csv.DictReader(f), 2):
+        kind = (row.pop("kind", "") or "").strip()
+        if kind not in sections:
+            raise ManifestError(f"Line {line_number}: unknown kind '{kind}'")
+        entry = {key: value.strip() for key, value in row.items() if key and value and value.strip()}
+        if "properties" in entry:
+            entry["properties"] = dict(
+                pair.split("=", 1) for pair in entry["properties"].split(";") if "=" in pair
+            )
+        data[sections[kind]].append(entry)
+    return data
+
+
+# Function to validate a manifest and fill in defaults
+def normalize_manifest(data):
+    if not isinstance(data, dict):
+        raise ManifestError("A manifest must be a mapping of catalogs, principals, principal_roles and grants.")
+    manifest = {
+        "catalogs": [],
+        "principals": [],
+        "principal_roles": [],
+        "grants": [],
+        "prune": bool(data.get("prune", False)),
+    }
+    for catalog in data.get("catalogs") or []:
+        _require(catalog, "catalog", "name", "default_base_location")
+        unknown = set(catalog) - CATALOG_FIELDS
+        if unknown:
+            raise ManifestError(f"Catalog '{catalog['name']}' has unknown fields: {', '.join(sorted(unknown))}")
+        manifest["catalogs"].append(dict(
+            catalog,
+            type=catalog.get("type", "INTERNAL"),
+            storage_type=catalog.get("storage_type", "FILE"),
+            properties={str(k): str(v) for k, v in (catalog.get("properties") or {}).items()},
+        ))
+    for principal in data.get("principals") or []:
+        if isinstance(principal, str):
+            principal = {"name": principal}
+        _require(principal, "principal", "name")
+        manifest["principals"].append({"name": principal["name"]})
+    for principal_role in data.get("principal_roles") or []:
+        if isinstance(principal_role, str):
+            principal_role = {"name": principal_role}
+        _require(principal_role, "principal role", "name")
+        manifest["principal_roles"].append({
+            "name": principal_role["name"],
+            "properties": {str(k): str(v) for k, v in (principal_role.get("properties") or {}).items()},
+        })
+    for grant in data.get("grants") or []:
+        _require(grant, "grant", "principal", "principal_role")
+        manifest["grants"].append({"principal": grant["principal"], "principal_role": grant["principal_role"]})
+    return manifest
+
+
+def _require(entry, kind, *fields):
+    if not isinstance(entry, dict):
+        raise ManifestError(f"Invalid {kind} entry: {entry!r}")
+    missing = [field for field in fields if not entry.get(field)]
+    if missing:
+        raise ManifestError(f"A {kind} entry is missing {', '.join(missing)}: {entry!r}")
+
+
+# Function to fetch the live state a manifest is compared against, querying Polaris concurrently
+def fetch_live_state(backend, manifest, parallelism=DEFAULT_PARALLELISM):
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="polaris-plan") as executor:
+        catalogs = executor.submit(backend.list_catalogs)
+        principals = executor.submit(backend.list_principals)
+        principal_roles = executor.submit(backend.list_principal_roles)
+        state = {
+            "catalogs": {catalog["name"]: catalog for catalog in catalogs.result()},
+            "principals": {principal["name"]: principal for principal in principals.result()},
+            "principal_roles": {role["name"]: role for role in principal_roles.result()},
+        }
+        # Assignments are only needed for principals the manifest manages
+        managed = _managed_principals(manifest)
+        assigned = {
+            name: executor.submit(backend.list_principal_roles, name)
+            for name in managed if name in state["principals"]
+        }
+        state["assigned_roles"] = {
+            name: {role["name"] for role in future.result()} for name, future in assigned.items()
+        }
+    return state
+
+
+def _managed_principals(manifest):
+    names = [principal["name"] for principal in manifest["principals"]]
+    names.extend(grant["principal"] for grant in manifest["grants"])
+    return list(dict.fromkeys(names))
+
+
+# Function to compute the steps that bring the live state in line with the manifest
+def build_plan(manifest, state):
+    steps = []
+    created = {}
+
+    for catalog in manifest["catalogs"]:
+        live = state["catalogs"].get(catalog["name"])
+        properties = dict(catalog["properties"], **{"default-base-location": catalog["default_base_location"]})
+        if live is None:
+            options = {option: catalog[option] for option in CATALOG_OPTIONS if catalog.get(option)}
+            step = Step("create", "catalog", catalog["name"], "create_catalog",
+                        (catalog["name"], catalog["type"], catalog["storage_type"],
+                         catalog["default_base_location"], options),
+                        details=f"{catalog['type']} {catalog['storage_type']} {catalog['default_base_location']}")
+            steps.append(step)
+            # Extra properties are set once the catalog exists
+            if catalog["properties"]:
+                steps.append(Step("update", "catalog", catalog["name"], "update_catalog",
+                                  (catalog["name"], catalog["properties"]),
+                                  details=_describe_properties(catalog["properties"]), depends_on=[step.id]))
+        else:
+            changed = _changed_properties(live.get("properties", {}), properties)
+            if changed:
+                steps.append(Step("update", "catalog", catalog["name"], "update_catalog",
+                                  (catalog["name"], changed), details=_describe_properties(changed)))
+
+    for principal in manifest["principals"]:
+        if principal["name"] not in state["principals"]:
+            step = Step("create", "principal", principal["name"], "create_principal", (principal["name"],))
+            steps.append(step)
+            created[("principal", principal["name"])] = step.id
+
+    for principal_role in manifest["principal_roles"]:
+        live = state["principal_roles"].get(principal_role["name"])
+        if live is None:
+            step = Step("create", "principal role", principal_role["name"], "create_principal_role",
+                        (principal_role["name"], principal_role["properties"]),
+                        details=_describe_properties(principal_role["properties"]))
+            steps.append(step)
+            created[("principal role", principal_role["name"])] = step.id
+        else:
+            changed = _changed_properties(live.get("properties", {}), principal_role["properties"])
+            if changed:
+                steps.append(Step("update", "principal role", principal_role["name"], "update_principal_role",
+                                  (principal_role["name"], changed), details=_describe_properties(changed)))
+
+    desired_grants = {(grant["principal"], grant["principal_role"]) for grant in manifest["grants"]}
+    for principal_name, principal_role_name in sorted(desired_grants):
+        if principal_role_name in state["assigned_roles"].get(principal_name, ()):
+            continue
+        depends_on = [created[key] for key in (("principal", principal_name), ("principal role", principal_role_name))
+                      if key in created]
+        steps.append(Step("grant", "principal role", principal_role_name, "grant_principal_role",
+                          (principal_role_name, principal_name), details=f"to {principal_name}",
+                          depends_on=depends_on))
+
+    if manifest["prune"]:
+        steps.extend(_prune_steps(manifest, state, desired_grants))
+    return steps
+
+
+def _prune_steps(manifest, state, desired_grants):
+    steps = []
+    # Principals and roles named only in grants are wanted too, or the plan would grant and delete them at once
+    wanted_principals = {principal["name"] for principal in manifest["principals"]}
+    wanted_principals.update(principal_name for principal_name, _ in desired_grants)
+    wanted_roles = {principal_role["name"] for principal_role in manifest["principal_roles"]}
+    wanted_roles.update(principal_role_name for _, principal_role_name in desired_grants)
+
+    revokes = []
+    for principal_name, role_names in state["assigned_roles"].items():
+        if principal_name in PROTECTED_PRINCIPALS or principal_name not in wanted_principals:
+            continue
+        for principal_role_name in sorted(role_names):
+            if (principal_name, principal_role_name) not in desired_grants:
+                step = Step("revoke", "principal role", principal_role_name, "revoke_principal_role",
+                            (principal_role_name, principal_name), details=f"from {principal_name}")
+                revokes.append(step)
+    steps.extend(revokes)
+
+    # Roles are deleted after revokes so no assignment refers to them mid-apply
+    revoke_ids = [step.id for step in revokes]
+    for name in sorted(set(state["catalogs"]) - {catalog["name"] for catalog in manifest["catalogs"]}):
+        steps.append(Step("delete", "catalog", name, "delete_catalog", (name,)))
+    for name in sorted(set(state["principals"]) - wanted_principals - PROTECTED_PRINCIPALS):
+        steps.append(Step("delete", "principal", name, "delete_principal", (name,)))
+    for name in sorted(set(state["principal_roles"]) - wanted_roles - PROTECTED_PRINCIPAL_ROLES):
+        steps.append(Step("delete", "principal role", name, "delete_principal_role", (name,), depends_on=revoke_ids))
+    return steps
+
+
+def _changed_properties(live, desired):
+    return {key: value for key, value in desired.items() if live.get(key) != value}
+
+
+def _describe_properties(properties):
+    return ", ".join(f"{key}={value}" for key, value in properties.items())
+
+
+# Function to run plan steps concurrently, each as soon as the steps it depends on succeeded.
+# Yields (step, error) as steps finish; error is None on success and a SkippedError when a
+# dependency failed. Closing the generator early cancels the steps that have not started.
+def execute_plan(backend, steps, parallelism=DEFAULT_PARALLELISM):
+    waiting = list(steps)
+    succeeded = set()
+    failed = set()
+    executor = ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="polaris-apply")
+    running = {}
+    try:
+        while waiting or running:
+            for step in list(waiting):
+                if any(dependency in failed for dependency in step.depends_on):
+                    waiting.remove(step)
+                    failed.add(step.id)
+                    yield step, SkippedError("skipped because a step it depends on failed")
+                elif all(dependency in succeeded for dependency in step.depends_on):
+                    waiting.remove(step)
+                    logging.info(f"Applying {step}")
+                    running[executor.submit(getattr(backend, step.operation), *step.args)] = step
+            if not running:
+                # Only steps depending on unknown steps are left
+                for step in waiting:
+                    yield step, SkippedError("depends on a step that is not part of the plan")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    succeeded.add(step.id)
+                else:
+                    logging.error(f"{step} failed: {error}")
+                    failed.add(step.id)
+                yield step, error
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Function to load a manifest file and plan it against the live state of Polaris
+def plan_manifest(backend, path, parallelism=DEFAULT_PARALLELISM):
+    manifest = load_manifest(path)
+    return build_plan(manifest, fetch_live_state(backend, manifest, parallelism))
@@ -0,0 +1,163 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (in seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+PROMETHEUS_PREFIX = "polaris_gui_operation"
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, plus error and row counters."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # The last count is for observations above the largest bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.rows = 0
+
+    def observe(self, seconds, error=False, rows=0):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.errors += bool(error)
+        self.rows += rows
+
+    # Estimate a quantile as the upper bound of the bucket holding it
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": dict(zip((str(bound) for bound in self.buckets), self.counts)),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of per-operation latency histograms."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, clock=time.perf_counter):
+        self.buckets = buckets
+        self.clock = clock
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, operation, seconds, error=False, rows=0):
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = Histogram(self.buckets)
+            histogram.observe(seconds, error, rows)
+
+    # Time the enclosed block; exceptions are counted as errors and re-raised.
+    # The yielded dict may be given a "rows" count to record.
+    @contextmanager
+    def span(self, operation):
+        record = {"rows": 0}
+        start = self.clock()
+        error = False
+        try:
+            yield record
+        except GeneratorExit:
+            # A consumer that stops iterating early is not an error
+            raise
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(operation, self.clock() - start, error, record["rows"])
+
+    # Wrap fn so each call is recorded under operation
+    def timed(self, operation, fn):
+        def wrapper(*args, **kwargs):
+            with self.span(operation):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    # Wrap a generator function so each run is recorded, with the number of items it yielded as rows
+    def timed_iter(self, operation, fn):
+        def wrapper(*args, **kwargs):
+            with self.span(operation) as record:
+                for item in fn(*args, **kwargs):
+                    record["rows"] += 1
+                    yield item
+        return wrapper
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    # Return {operation: histogram dict}, sorted by operation
+    def snapshot(self):
+        with self._lock:
+            return {operation: self._histograms[operation].to_dict() for operation in sorted(self._histograms)}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    # Render the metrics in the Prometheus text exposition format
+    def to_prometheus(self):
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}_duration_seconds Latency of GUI operations.",
+            f"# TYPE {PROMETHEUS_PREFIX}_duration_seconds histogram",
+        ]
+        snapshot = self.snapshot()
+        for operation, histogram in snapshot.items():
+            label = f'operation="{_escape(operation)}"'
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                lines.append(f'{PROMETHEUS_PREFIX}_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{PROMETHEUS_PREFIX}_duration_seconds_bucket{{{label},le="+Inf"}} {histogram["count"]}')
+            lines.append(f"{PROMETHEUS_PREFIX}_duration_seconds_sum{{{label}}} {histogram['sum']}")
+            lines.append(f"{PROMETHEUS_PREFIX}_duration_seconds_count{{{label}}} {histogram['count']}")
+        for name, field, help_text in (("errors_total", "errors", "Failed GUI operations."),
+                                       ("rows_total", "rows", "Rows handled by GUI operations.")):
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} counter")
+            for operation, histogram in snapshot.items():
+                lines.append(f'{PROMETHEUS_PREFIX}_{name}{{operation="{_escape(operation)}"}} {histogram[field]}')
+        return "\n".join(lines) + "\n"
+
+    # Write the metrics to a file, as Prometheus text for .prom files and JSON otherwise.
+    # The file is replaced atomically so a textfile collector never reads a partial file.
+    def export(self, path):
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as f:
+            f.write(content)
+        os.replace(f.name, path)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Metrics recorded by the backends, the task runner and the tables
+registry = Metrics()
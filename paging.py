@@ -0,0 +1,95 @@
+import logging
+
+# Scroll position (fraction of the loaded rows) past which the next page is fetched
+DEFAULT_PREFETCH_FRACTION = 0.8
+
+
+class PagedLoader:
+    """Loads a listing into a TableRenderer one page at a time.
+
+    The first page is fetched right away; later pages are fetched when the
+    table is scrolled near the bottom of the rows loaded so far, or while
+    the loaded rows do not fill the table yet. At most one page request is
+    in flight, so memory and requests follow what the user actually views.
+    An eager load fetches every page right away instead, e.g. to revalidate
+    a cached listing that is already shown in full.
+    """
+
+    def __init__(self, runner, renderer, prefetch_fraction=DEFAULT_PREFETCH_FRACTION):
+        self.runner = runner
+        self.renderer = renderer
+        self.prefetch_fraction = prefetch_fraction
+        self._fetch_page = None
+        self._next_token = None
+        self._task = None
+        self._records = []
+        self._on_page = None
+        self._on_done = None
+        self._on_error = None
+        self._description = None
+        self._eager = False
+        renderer.table.configure(yscrollcommand=self._on_scroll)
+
+    # Start loading a listing; fetch_page(page_token) runs on a worker thread and returns
+    # (records, next page token). on_page is called with each page, on_done with all records.
+    def load(self, fetch_page, on_page=None, on_done=None, on_error=None, description="list page", eager=False):
+        self.cancel()
+        self._fetch_page = fetch_page
+        self._records = []
+        self._on_page = on_page
+        self._on_done = on_done
+        self._on_error = on_error
+        self._description = description
+        self._eager = eager
+        self.renderer.begin()
+        self._fetch(None)
+
+    # Stop loading; rows already shown stay
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._fetch_page = None
+        self._next_token = None
+
+    def _fetch(self, page_token):
+        self._task = self.runner.submit(
+            self._fetch_page, page_token,
+            on_success=self._on_success,
+            on_error=self._on_failure,
+            description=self._description
+        )
+
+    def _on_success(self, result):
+        self._task = None
+        records, next_token = result
+        self._records.extend(records)
+        self.renderer.append(records)
+        if self._on_page:
+            self._on_page(records)
+        if next_token:
+            self._next_token = next_token
+            logging.debug(f"Loaded {len(self._records)} rows, more pages available")
+            if self._eager:
+                self._next_token = None
+                self._fetch(next_token)
+            else:
+                # Keep going while the loaded rows do not fill the table
+                self._on_scroll(*self.renderer.table.yview())
+            return
+        self._fetch_page = None
+        self.renderer.finish()
+        if self._on_done:
+            self._on_done(self._records)
+
+    def _on_failure(self, error):
+        self._task = None
+        self._fetch_page = None
+        self._next_token = None
+        if self._on_error:
+            self._on_error(error)
+
+    def _on_scroll(self, first, last):
+        if self._task is None and self._next_token and float(last) >= self.prefetch_fraction:
+            page_token, self._next_token = self._next_token, None
+            self._fetch(page_token)
@@ -0,0 +1,131 @@
+import json
+import os
+import re
+
+import bulk
+from core import Connection
+
+DEFAULT_PROFILES_PATH = os.path.join(os.path.expanduser("~"), ".polaris-gui", "profiles.json")
+# Environments queried at the same time by fan_out
+DEFAULT_PARALLELISM = 16
+# Fields that legitimately differ between environments and are ignored when comparing records
+VOLATILE_FIELDS = {"createTimestamp", "lastUpdateTimestamp", "entityVersion", "clientId"}
+
+# Settings stored per profile; secrets are never written by save_profile
+PROFILE_FIELDS = ("backend", "cli_path", "host", "port", "client_id")
+
+
+class ProfileError(Exception):
+    """Raised when the profiles file cannot be read or a profile is unknown."""
+
+
+# Function to read the profiles file, returning {} when it does not exist yet
+def _read(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        raise ProfileError(f"Failed to read profiles from {path}: {e}") from e
+    profiles = data.get("profiles") if isinstance(data, dict) else None
+    if not isinstance(profiles, dict):
+        raise ProfileError(f"{path} must contain a \"profiles\" object.")
+    return profiles
+
+
+# Function to return the environment variable holding a profile's client secret
+def secret_variable(name):
+    return "POLARIS_CLIENT_SECRET_" + re.sub(r"[^A-Za-z0-9]", "_", name).upper()
+
+
+# Function to build the Connection of a profile. The client secret comes from the variable named by
+# "client_secret_env", POLARIS_CLIENT_SECRET_<NAME>, or a "client_secret" written into the file by hand.
+def _connection(name, settings):
+    secret = settings.get("client_secret")
+    variable = settings.get("client_secret_env") or secret_variable(name)
+    secret = os.getenv(variable, secret)
+    kwargs = {field: settings[field] for field in PROFILE_FIELDS if settings.get(field) is not None}
+    return Connection(client_secret=secret, **kwargs)
+
+
+# Function to load the saved profiles as {name: Connection}, sorted by name
+def load_profiles(path=DEFAULT_PROFILES_PATH):
+    return {name: _connection(name, settings) for name, settings in sorted(_read(path).items())}
+
+
+# Function to load the profiles with the given names, in that order
+def select_profiles(names, path=DEFAULT_PROFILES_PATH):
+    profiles = load_profiles(path)
+    unknown = [name for name in names if name not in profiles]
+    if unknown:
+        raise ProfileError(f"Unknown profile(s): {', '.join(unknown)}. Saved profiles: {', '.join(profiles) or 'none'}")
+    return {name: profiles[name] for name in names}
+
+
+# Function to save a connection as a named profile, replacing a profile of the same name
+def save_profile(name, connection, path=DEFAULT_PROFILES_PATH):
+    profiles = _read(path)
+    settings = {field: getattr(connection, field) for field in PROFILE_FIELDS}
+    # Keep a hand-written secret reference of an existing profile
+    for field in ("client_secret_env", "client_secret"):
+        if field in profiles.get(name, {}):
+            settings[field] = profiles[name][field]
+    profiles[name] = settings
+    _write(path, profiles)
+
+
+def _write(path, profiles):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as f:
+        json.dump({"profiles": profiles}, f, indent=2, sort_keys=True)
+    os.replace(temporary_path, path)
+
+
+# Function to run backend.<operation>(*args) against every connection at the same time. Each
+# environment has its own backend and pooled session. Yields (name, result, error) as environments
+# answer; closing the generator early abandons the environments that have not started yet.
+def fan_out(connections, operation, *args, parallelism=DEFAULT_PARALLELISM):
+    results = {}
+
+    def run_operation(name):
+        results[name] = getattr(connections[name].get_backend(), operation)(*args)
+
+    outcomes = bulk.run_bulk(run_operation, [(name,) for name in connections], parallelism,
+                             thread_name_prefix="polaris-fan-out")
+    try:
+        for (name,), error in outcomes:
+            yield name, results.pop(name, None), error
+    finally:
+        outcomes.close()
+
+
+# Function to merge listings of several environments into (environment, record) pairs,
+# sorted by record name and then environment
+def merge_results(results, key="name"):
+    merged = [(name, record) for name, records in results.items() for record in records]
+    return sorted(merged, key=lambda pair: (str(pair[1].get(key, "")), pair[0]))
+
+
+# Function to line up listings of several environments by record name. Returns rows of
+# (record name, {environment: record or None}, drifted); drifted is True when the record is
+# missing from some environments or differs apart from VOLATILE_FIELDS.
+def side_by_side(results, key="name"):
+    environments = list(results)
+    by_name = {}
+    for environment, records in results.items():
+        for record in records:
+            by_name.setdefault(record.get(key, ""), {})[environment] = record
+    rows = []
+    for name in sorted(by_name, key=str):
+        records = {environment: by_name[name].get(environment) for environment in environments}
+        comparable = {
+            json.dumps({field: value for field, value in record.items() if field not in VOLATILE_FIELDS},
+                       sort_keys=True, default=str) if record is not None else None
+            for record in records.values()
+        }
+        rows.append((name, records, len(comparable) > 1))
+    return rows
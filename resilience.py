@@ -0,0 +1,147 @@
+import logging
+import os
+import random
+import threading
+import time
+
+import tasks
+
+# Attempts for idempotent reads, and the exponential backoff between them (seconds)
+DEFAULT_ATTEMPTS = int(os.getenv("POLARIS_RETRY_ATTEMPTS", "3"))
+DEFAULT_BASE_DELAY = 0.25
+DEFAULT_MAX_DELAY = 4.0
+# Consecutive failures that open an endpoint's circuit, and seconds before a trial call is let through
+DEFAULT_FAILURE_THRESHOLD = int(os.getenv("POLARIS_CIRCUIT_FAILURES", "5"))
+DEFAULT_RESET_TIMEOUT = float(os.getenv("POLARIS_CIRCUIT_RESET", "30"))
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Fails calls to an unhealthy endpoint fast instead of letting each one time out.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    ``allow`` refuses calls. Once ``reset_timeout`` has passed one trial
+    call is let through (half-open): its success closes the circuit, its
+    failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT,
+                 clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._trial_at = None
+        self._lock = threading.Lock()
+
+    # Return whether a call may go ahead now
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = self.clock()
+            if self.state == OPEN and now - self._opened_at < self.reset_timeout:
+                return False
+            # One trial at a time; a trial that never reported back is replaced after reset_timeout
+            if self.state == HALF_OPEN and now - self._trial_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self._trial_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logging.info(f"{self.name} recovered, closing its circuit")
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logging.warning(f"{self.name} failed {self.failures} times, opening its circuit "
+                                    f"for {self.reset_timeout:.0f}s")
+                self.state = OPEN
+                self._opened_at = self.clock()
+
+    # Seconds until the next trial call is allowed
+    @property
+    def retry_in(self):
+        with self._lock:
+            if self.state != OPEN:
+                return 0
+            return max(0, self.reset_timeout - (self.clock() - self._opened_at))
+
+    @property
+    def healthy(self):
+        return self.state == CLOSED
+
+    def __repr__(self):
+        return f"<CircuitBreaker {self.name} {self.state}>"
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+# Function to get the shared circuit breaker of an endpoint, e.g. "host:port"
+def get_breaker(endpoint):
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+# Function to return the breakers of endpoints that are currently failing
+def unhealthy_breakers():
+    with _breakers_lock:
+        return [breaker for breaker in _breakers.values() if not breaker.healthy]
+
+
+def _backoff(attempt, base_delay, max_delay):
+    # Full jitter keeps clients that failed together from retrying together
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+# Function to call fn(), retrying with exponential backoff while is_retryable(error) holds.
+# Only use it for idempotent operations.
+def call_with_retry(fn, is_retryable, attempts=DEFAULT_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                    max_delay=DEFAULT_MAX_DELAY, description="call"):
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= attempts or not is_retryable(e) or tasks.cancelled():
+                raise
+            delay = _backoff(attempt, base_delay, max_delay)
+            logging.warning(f"{description} failed ({e}), retry {attempt} of {attempts - 1} in {delay:.2f}s")
+            tasks.sleep(delay)
+
+
+# Function to iterate make_iterator(), retrying like call_with_retry as long as the failure
+# happened before the first item; once items were yielded, errors are raised as they are
+def iter_with_retry(make_iterator, is_retryable, attempts=DEFAULT_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                    max_delay=DEFAULT_MAX_DELAY, description="call"):
+    for attempt in range(1, attempts + 1):
+        started = False
+        try:
+            for item in make_iterator():
+                started = True
+                yield item
+            return
+        except Exception as e:
+            if started or attempt >= attempts or not is_retryable(e) or tasks.cancelled():
+                raise
+            delay = _backoff(attempt, base_delay, max_delay)
+            logging.warning(f"{description} failed ({e}), retry {attempt} of {attempts - 1} in {delay:.2f}s")
+            tasks.sleep(delay)
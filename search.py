@@ -0,0 +1,80 @@
+from collections import defaultdict
+
+NGRAM = 3
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class SearchIndex:
+    """Case-insensitive substring index over the searchable text of table rows.
+
+    Queries of three or more characters are answered from a trigram index;
+    shorter ones scan the indexed texts. When a query extends the previous
+    one (the user typed another character), only the previous matches are
+    re-checked, so filtering stays incremental per keystroke.
+    """
+
+    def __init__(self):
+        self._texts = {}
+        self._index = defaultdict(set)
+        self._last_query = None
+        self._last_matches = None
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, key, text):
+        text = text.lower()
+        previous = self._texts.get(key)
+        if previous == text:
+            return
+        if previous is not None:
+            self._unindex(key, previous)
+        self._texts[key] = text
+        for ngram in _ngrams(text):
+            self._index[ngram].add(key)
+        self._forget_last()
+
+    def remove(self, key):
+        text = self._texts.pop(key, None)
+        if text is not None:
+            self._unindex(key, text)
+            self._forget_last()
+
+    def clear(self):
+        self._texts = {}
+        self._index = defaultdict(set)
+        self._forget_last()
+
+    # Return True if the key's text contains the query
+    def matches(self, key, query):
+        return query.lower() in self._texts.get(key, "")
+
+    # Return the set of keys whose text contains the query
+    def search(self, query):
+        query = query.lower()
+        if self._last_query is not None and self._last_query in query:
+            candidates = self._last_matches
+        elif len(query) >= NGRAM:
+            postings = sorted((self._index.get(ngram, set()) for ngram in _ngrams(query)), key=len)
+            candidates = set.intersection(*postings) if postings else set()
+        else:
+            candidates = self._texts.keys()
+        matches = {key for key in candidates if query in self._texts[key]}
+        self._last_query = query
+        self._last_matches = matches
+        return matches
+
+    def _unindex(self, key, text):
+        for ngram in _ngrams(text):
+            postings = self._index.get(ngram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._index[ngram]
+
+    def _forget_last(self):
+        self._last_query = None
+        self._last_matches = None
@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".polaris-gui", "snapshots.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    host TEXT NOT NULL,
+    port TEXT NOT NULL,
+    cache_key TEXT NOT NULL,
+    records TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (host, port, cache_key)
+)
+"""
+
+# Sentinel asking the writer thread to stop
+_STOP = object()
+
+
+class SnapshotStore:
+    """Persists the last-known entity listings per host and port in SQLite.
+
+    Writes are queued and applied by a single background thread, so saving
+    a large listing never blocks the UI and SQLite only sees one writer.
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(_SCHEMA)
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="polaris-snapshots", daemon=True)
+        self._writer.start()
+
+    # Return {cache key: (records, saved_at)} for a host and port
+    def load(self, host, port):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT cache_key, records, saved_at FROM snapshots WHERE host = ? AND port = ?",
+                (host, str(port)),
+            ).fetchall()
+        snapshot = {}
+        for cache_key, records, saved_at in rows:
+            try:
+                snapshot[tuple(json.loads(cache_key))] = (json.loads(records), saved_at)
+            except ValueError:
+                logging.warning(f"Ignoring corrupt snapshot entry {cache_key}")
+        logging.info(f"Loaded {len(snapshot)} snapshot entries for {host}:{port}")
+        return snapshot
+
+    # Queue a listing to be saved in the background
+    def save_async(self, host, port, cache_key, records):
+        self._writes.put((host, str(port), cache_key, records, time.time()))
+
+    # Flush queued writes and close the database
+    def close(self):
+        self._writes.put(_STOP)
+        self._writer.join()
+        with self._lock:
+            self._connection.close()
+
+    def _write_loop(self):
+        while True:
+            item = self._writes.get()
+            if item is _STOP:
+                return
+            host, port, cache_key, records, saved_at = item
+            try:
+                with self._lock, self._connection:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                        (host, port, json.dumps(list(cache_key)), json.dumps(records), saved_at),
+                    )
+            except sqlite3.Error as e:
+                logging.error(f"Failed to save snapshot {cache_key}: {e}")
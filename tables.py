@@ -0,0 +1,227 @@
+import logging
+import time
+
+from metrics import registry as metrics
+from search import SearchIndex
+
+# Rows processed before the first paint, so the first screenful shows up at once
+FIRST_BATCH_SIZE = 100
+# Time budget (in seconds) for each batch of row updates
+DEFAULT_TIME_SLICE = 0.02
+
+
+# Function to key a record by its entity name
+def record_name(record):
+    return record.get("name", "")
+
+
+class TableRenderer:
+    """Keeps a Treeview in sync with records using keyed, time-sliced updates.
+
+    Rows are keyed by entity name (used as the Treeview item ID) and remember
+    the ``entityVersion`` or row values they were drawn from. A refresh only
+    touches rows that were added, changed or removed, so the selection and
+    scroll position survive and an unchanged listing costs no widget work.
+    Work is split into batches run via ``after_idle`` so large listings do
+    not block the Tk event loop.
+
+    When ``search_text`` is given, rows are indexed by the text it returns
+    and ``set_filter`` hides non-matching rows by detaching them, so
+    filtering never rebuilds the table.
+    """
+
+    def __init__(self, table, row_values, key=record_name, search_text=None, time_slice=DEFAULT_TIME_SLICE,
+                 first_batch_size=FIRST_BATCH_SIZE, name="table"):
+        self.table = table
+        # Used to name the render metrics
+        self.name = name
+        self.row_values = row_values
+        self.key = key
+        self.search_text = search_text
+        self.index = SearchIndex() if search_text else None
+        self._query = ""
+        # Keys of rows detached from the table because they do not match the filter
+        self._hidden = set()
+        self.time_slice = time_slice
+        self.first_batch_size = first_batch_size
+        # Key -> entityVersion or row values currently shown
+        self._rows = {}
+        self._pending = []
+        self._position = 0
+        self._job = None
+        # Keys seen during the current refresh, None when no refresh is running, and their order
+        self._seen = None
+        self._order = []
+        self._finishing = False
+        self._refresh = 0
+        self._started = None
+
+    # Reconcile the table with a complete set of records
+    def render(self, records):
+        self.begin()
+        self.append(records)
+        self.finish()
+
+    # Start a refresh; rows not seen before finish() is called are removed.
+    # Records still pending from an earlier refresh are applied first but do not count as seen.
+    def begin(self):
+        self._refresh += 1
+        self._started = time.perf_counter()
+        self._seen = set()
+        self._order = []
+        self._finishing = False
+
+    # Add or update rows for the given records
+    def append(self, records):
+        self._pending.extend((record, self._refresh) for record in records)
+        if self._job is None:
+            self._process_batch(limit=self.first_batch_size)
+
+    # Finish a refresh once all pending records have been applied
+    def finish(self):
+        self._finishing = True
+        if self._job is None:
+            self._complete()
+
+    # Remove all rows and stop any update in progress
+    def clear(self):
+        self.cancel()
+        self.table.delete(*self.table.get_children())
+        if self._hidden:
+            self.table.delete(*self._hidden)
+        self._hidden = set()
+        self._rows = {}
+        if self.index is not None:
+            self.index.clear()
+
+    # Show only the rows whose search text contains the query; an empty query shows all rows
+    def set_filter(self, query):
+        if self.index is None:
+            return
+        self._query = query.strip()
+        if self._query:
+            matches = self.index.search(self._query)
+            hide = set(self._rows).difference(self._hidden, matches)
+            show = self._hidden & matches
+        else:
+            hide = set()
+            show = self._hidden
+        if hide:
+            self.table.detach(*hide)
+            self._hidden |= hide
+        if show:
+            self._reattach(show)
+
+    def cancel(self):
+        if self._job is not None:
+            self.table.after_cancel(self._job)
+            self._job = None
+        self._pending = []
+        self._position = 0
+        self._seen = None
+        self._order = []
+        self._finishing = False
+
+    @property
+    def busy(self):
+        return self._job is not None
+
+    def _process_batch(self, limit=None):
+        self._job = None
+        start = time.perf_counter()
+        deadline = start + self.time_slice
+        processed = 0
+        while self._position < len(self._pending):
+            record, refresh = self._pending[self._position]
+            self._position += 1
+            self._upsert(record, refresh == self._refresh)
+            processed += 1
+            if limit is not None and processed >= limit:
+                break
+            if limit is None and time.perf_counter() >= deadline:
+                break
+        metrics.observe(f"render.{self.name}.batch", time.perf_counter() - start, rows=processed)
+        if self._position < len(self._pending):
+            self._job = self.table.after_idle(self._process_batch)
+            return
+        self._pending = []
+        self._position = 0
+        if self._finishing:
+            self._complete()
+
+    # Insert or update the row for one record, skipping it when nothing changed
+    def _upsert(self, record, current=True):
+        key = self.key(record)
+        if self._seen is not None and current and key not in self._seen:
+            self._seen.add(key)
+            self._order.append(key)
+        version = record.get("entityVersion")
+        shown = self._rows.get(key)
+        if shown is not None and version is not None and shown == version:
+            return
+        values = self.row_values(record)
+        signature = version if version is not None else values
+        if key not in self._rows:
+            self.table.insert('', 'end', iid=key, values=values)
+        elif shown != signature:
+            self.table.item(key, values=values)
+        else:
+            return
+        self._rows[key] = signature
+        if self.index is not None:
+            self.index.add(key, self.search_text(record))
+            self._apply_filter(key)
+
+    # Detach or reattach one row according to the current filter
+    def _apply_filter(self, key):
+        visible = not self._query or self.index.matches(key, self._query)
+        if not visible and key not in self._hidden:
+            self.table.detach(key)
+            self._hidden.add(key)
+        elif visible and key in self._hidden:
+            self._reattach({key})
+
+    # Put detached rows back at their original position
+    def _reattach(self, keys):
+        position = 0
+        for key in self._rows:
+            if key in keys:
+                self.table.move(key, '', position)
+                self._hidden.discard(key)
+            if key not in self._hidden:
+                position += 1
+
+    def _complete(self):
+        self._finishing = False
+        if self._seen is None:
+            return
+        removed = [key for key in self._rows if key not in self._seen]
+        if removed:
+            self.table.delete(*removed)
+            for key in removed:
+                del self._rows[key]
+                self._hidden.discard(key)
+                if self.index is not None:
+                    self.index.remove(key)
+        if list(self._rows) != self._order:
+            self._reorder()
+        logging.debug(f"Reconciled {len(self._rows)} rows, removed {len(removed)}")
+        # Time from begin() until the table matched the records, including time spent waiting for them
+        metrics.observe(f"render.{self.name}", time.perf_counter() - self._started, rows=len(self._rows))
+        self._seen = None
+        self._order = []
+
+    # Move rows into the order of the records of the last refresh; new rows were added at the end.
+    # Only rows out of place are moved, so one new row in the middle costs a single move.
+    def _reorder(self):
+        self._rows = {key: self._rows[key] for key in self._order}
+        children = list(self.table.get_children())
+        position = 0
+        for key in self._order:
+            if key in self._hidden:
+                continue
+            if children[position] != key:
+                self.table.move(key, '', position)
+                children.remove(key)
+                children.insert(position, key)
+            position += 1
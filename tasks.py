@@ -0,0 +1,423 @@
+import collections
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = 4
+# How often (in milliseconds) the UI thread drains the result queue
+DEFAULT_POLL_INTERVAL = 50
+# Streamed records are handed to the UI in batches of this size, or after this many seconds
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_BATCH_INTERVAL = 0.1
+
+# Kinds of messages workers put on the result queue
+RESULT = "result"
+ERROR = "error"
+BATCH = "batch"
+
+# Task priorities; queued tasks with a lower number start first
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 1
+
+# The Task running on each worker thread
+_current = threading.local()
+
+
+# Function to return the Task running on the calling worker thread, or None
+def current_task():
+    return getattr(_current, "task", None)
+
+
+# Function to have abort() called if the task running on this thread is cancelled, e.g. to kill a
+# subprocess or close an HTTP response it is blocked on. Returns a function removing the hook.
+def on_cancel(abort):
+    task = current_task()
+    if task is None:
+        return lambda: None
+    return task.add_cancel_hook(abort)
+
+
+# Function to tell whether the task running on this thread was cancelled
+def cancelled():
+    task = current_task()
+    return task is not None and task.cancelled
+
+
+# Function to sleep on a worker thread, waking up early if its task is cancelled
+def sleep(seconds):
+    task = current_task()
+    if task is None:
+        time.sleep(seconds)
+    else:
+        task.wait_cancelled(seconds)
+
+
+# Function to wrap fn so that, run on another thread (e.g. a bulk pool), it counts as part of the
+# calling thread's task: its cancel hooks fire and cancelled() holds once that task is cancelled,
+# and calls not started by then are skipped
+def inherit_task(fn):
+    task = current_task()
+    if task is None:
+        return fn
+
+    def run(*args, **kwargs):
+        if task.cancelled:
+            raise CancelledError(f"{task} was cancelled")
+        previous = current_task()
+        _current.task = task
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.task = previous
+    return run
+
+
+class Task:
+    """A unit of background work submitted to a TaskRunner."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, fn, args, kwargs, on_success=None, on_error=None, description=None, on_batch=None,
+                 key=None, view=None, priority=PRIORITY_USER):
+        self.id = next(self._ids)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_batch = on_batch
+        self.description = description or getattr(fn, "__name__", "task")
+        self.key = key
+        self.view = view
+        self.priority = priority
+        self.future = None
+        self._cancelled = threading.Event()
+        self._cancel_hooks = []
+        self._hooks_lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    # Wait until the task is cancelled or timeout seconds passed; returns whether it was cancelled
+    def wait_cancelled(self, timeout):
+        return self._cancelled.wait(timeout)
+
+    @property
+    def done(self):
+        return self.cancelled or (self.future is not None and self.future.done())
+
+    # Cancel the task; its callbacks will not run, it is skipped if not started yet,
+    # and work it is blocked on is aborted through its cancel hooks
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+        with self._hooks_lock:
+            hooks, self._cancel_hooks = self._cancel_hooks, []
+        for abort in hooks:
+            try:
+                abort()
+            except Exception:
+                logging.exception(f"Aborting {self} failed")
+
+    def add_cancel_hook(self, abort):
+        with self._hooks_lock:
+            if not self.cancelled:
+                self._cancel_hooks.append(abort)
+                return lambda: self._remove_cancel_hook(abort)
+        abort()
+        return lambda: None
+
+    def _remove_cancel_hook(self, abort):
+        with self._hooks_lock:
+            if abort in self._cancel_hooks:
+                self._cancel_hooks.remove(abort)
+
+    def __repr__(self):
+        return f"<Task {self.id} {self.description}>"
+
+
+class TaskRunner:
+    """Runs callables on a bounded thread pool and delivers results on the UI thread.
+
+    Workers never touch widgets: they put their outcome on a queue, and
+    ``poll`` (scheduled with ``schedule``, i.e. ``root.after``) drains it and
+    calls the task's callbacks from the thread that owns the UI.
+
+    Tasks wait in a priority queue, so user-initiated work starts before
+    queued background work. A stream with the ``key`` of an in-flight stream
+    shares that stream instead of running again; plain submissions are never
+    shared. A task for a ``view`` cancels the previous task for the same view
+    (unless the new one is background work and the old one is not).
+    """
+
+    def __init__(self, schedule, max_workers=DEFAULT_MAX_WORKERS, poll_interval=DEFAULT_POLL_INTERVAL,
+                 on_status_change=None):
+        self.schedule = schedule
+        self.poll_interval = poll_interval
+        self.on_status_change = on_status_change
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="polaris-worker")
+        self.results = queue.Queue()
+        self.in_flight = {}
+        # Heap of (priority, task id, task, run) not yet handed to the pool
+        self._pending = []
+        self._running = 0
+        self._by_key = {}
+        self._by_view = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.schedule(self.poll_interval, self.poll)
+
+    # Submit fn(*args, **kwargs) to the pool and return its Task
+    def submit(self, fn, *args, on_success=None, on_error=None, description=None, view=None,
+               priority=PRIORITY_USER, **kwargs):
+        task = Task(fn, args, kwargs, on_success, on_error, description, view=view, priority=priority)
+        return self._start(task, self._run)
+
+    # Submit a generator function; its items reach on_batch in lists as they are produced,
+    # and on_success is called with the total item count once it is exhausted. An in-flight
+    # stream with the same key is returned as is: its batches and outcome keep going to its own
+    # callbacks, and the callbacks passed here are dropped, so only use a key when both calls
+    # would do the same with the result (e.g. render it into the same table).
+    def stream(self, fn, *args, on_batch=None, on_success=None, on_error=None, description=None, key=None,
+               view=None, priority=PRIORITY_USER, **kwargs):
+        shared = self.find(key)
+        if shared is not None:
+            logging.debug(f"Sharing in-flight {shared}; the new request's callbacks are dropped")
+            return shared
+        task = Task(fn, args, kwargs, on_success, on_error, description, on_batch, key=key, view=view,
+                    priority=priority)
+        return self._start(task, self._run_stream)
+
+    # Return the in-flight task with this key, or None
+    def find(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            task = self._by_key.get(key)
+        return task if task is not None and not task.cancelled else None
+
+    # Return the in-flight task for this view, or None
+    def find_view(self, view):
+        if view is None:
+            return None
+        with self._lock:
+            task = self._by_view.get(view)
+        return task if task is not None and not task.cancelled else None
+
+    def _start(self, task, run):
+        superseded = self.find_view(task.view)
+        if superseded is not None and superseded.priority >= task.priority:
+            logging.debug(f"{task} supersedes {superseded}")
+            superseded.cancel()
+        with self._lock:
+            self.in_flight[task.id] = task
+            if task.key is not None:
+                self._by_key[task.key] = task
+            if task.view is not None:
+                self._by_view[task.view] = task
+            heapq.heappush(self._pending, (task.priority, task.id, task, run))
+        logging.debug(f"Submitted {task}")
+        self._dispatch()
+        self._status_changed()
+        return task
+
+    # Hand queued tasks to the pool, highest priority first, while workers are free
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            while self._pending and self._running < self.max_workers:
+                priority, task_id, task, run = heapq.heappop(self._pending)
+                if task.cancelled:
+                    continue
+                self._running += 1
+                task.future = self.executor.submit(self._work, task, run)
+                started.append(task.future)
+        # Outside the lock: the callback runs right away if the future was already cancelled
+        for future in started:
+            future.add_done_callback(self._release_cancelled)
+
+    # A future cancelled before it started never runs _work, so its worker slot is released here
+    def _release_cancelled(self, future):
+        if future.cancelled():
+            with self._lock:
+                self._running -= 1
+            self._dispatch()
+
+    def _work(self, task, run):
+        _current.task = task
+        try:
+            run(task)
+        finally:
+            _current.task = None
+            with self._lock:
+                self._running -= 1
+            self._dispatch()
+
+    def cancel_all(self):
+        with self._lock:
+            tasks = list(self.in_flight.values())
+        for task in tasks:
+            task.cancel()
+        self._status_changed()
+
+    def running_tasks(self):
+        with self._lock:
+            return [task for task in self.in_flight.values() if not task.cancelled]
+
+    def shutdown(self):
+        self.cancel_all()
+        with self._lock:
+            self._pending = []
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task):
+        if task.cancelled:
+            self.results.put((task, RESULT, None))
+            return
+        try:
+            result = task.fn(*task.args, **task.kwargs)
+        except Exception as e:
+            self.results.put((task, ERROR, e))
+        else:
+            self.results.put((task, RESULT, result))
+
+    def _run_stream(self, task):
+        if task.cancelled:
+            self.results.put((task, RESULT, None))
+            return
+        count = 0
+        batch = []
+        flushed_at = time.monotonic()
+        try:
+            iterator = task.fn(*task.args, **task.kwargs)
+            try:
+                for item in iterator:
+                    if task.cancelled:
+                        break
+                    batch.append(item)
+                    count += 1
+                    if len(batch) >= DEFAULT_BATCH_SIZE or time.monotonic() - flushed_at >= DEFAULT_BATCH_INTERVAL:
+                        self.results.put((task, BATCH, batch))
+                        batch = []
+                        flushed_at = time.monotonic()
+            finally:
+                # Lets the producer clean up (e.g. stop a CLI process) when stopped early
+                close = getattr(iterator, "close", None)
+                if close:
+                    close()
+        except Exception as e:
+            if batch:
+                self.results.put((task, BATCH, batch))
+            self.results.put((task, ERROR, e))
+        else:
+            if batch:
+                self.results.put((task, BATCH, batch))
+            self.results.put((task, RESULT, count))
+
+    # Drain finished tasks and run their callbacks; must be called on the UI thread
+    def poll(self):
+        changed = False
+        # A task cancelled before it started never reaches _run, so reap it here
+        with self._lock:
+            for task_id, task in list(self.in_flight.items()):
+                if task.future is None and task.cancelled or task.future is not None and task.future.cancelled():
+                    self._forget(task)
+                    changed = True
+        while True:
+            try:
+                task, kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind != BATCH:
+                with self._lock:
+                    self._forget(task)
+                changed = True
+            if task.cancelled:
+                logging.debug(f"Discarding {kind} of cancelled {task}")
+                continue
+            try:
+                if kind == BATCH:
+                    if task.on_batch:
+                        task.on_batch(payload)
+                elif kind == ERROR:
+                    logging.error(f"{task} failed: {payload}")
+                    if task.on_error:
+                        task.on_error(payload)
+                else:
+                    if task.on_success:
+                        task.on_success(payload)
+            except Exception:
+                logging.exception(f"Callback for {task} failed")
+        if changed:
+            self._status_changed()
+        self.schedule(self.poll_interval, self.poll)
+
+    # Drop a finished or cancelled task from the in-flight indexes; called with the lock held
+    def _forget(self, task):
+        self.in_flight.pop(task.id, None)
+        if self._by_key.get(task.key) is task:
+            del self._by_key[task.key]
+        if self._by_view.get(task.view) is task:
+            del self._by_view[task.view]
+
+    def _status_changed(self):
+        if self.on_status_change:
+            self.on_status_change(self.running_tasks())
+
+
+class Prefetcher:
+    """Runs low-priority background fetches a few at a time.
+
+    Only ``max_in_flight`` prefetches occupy the worker pool at once, so
+    user-initiated work is never queued behind a long prefetch backlog.
+    A new request replaces whatever is still queued.
+    """
+
+    def __init__(self, runner, max_in_flight=2):
+        self.runner = runner
+        self.max_in_flight = max_in_flight
+        self._queue = collections.deque()
+        self._fetch = None
+        self._description = None
+        # Item -> Task for prefetches currently on the pool
+        self._tasks = {}
+
+    # Queue fetch(item) for each item; must be called on the UI thread
+    def request(self, items, fetch, description="prefetch"):
+        self._queue = collections.deque(item for item in items if item not in self._tasks)
+        self._fetch = fetch
+        self._description = description
+        self._pump()
+
+    def cancel(self):
+        self._queue.clear()
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks = {}
+
+    def _pump(self):
+        # Tasks cancelled elsewhere (e.g. by TaskRunner.cancel_all) never call back, so prune them
+        for item, task in list(self._tasks.items()):
+            if task.done:
+                del self._tasks[item]
+        while self._queue and len(self._tasks) < self.max_in_flight:
+            item = self._queue.popleft()
+            self._tasks[item] = self.runner.submit(
+                self._fetch, item,
+                on_success=lambda result, item=item: self._finished(item),
+                on_error=lambda error, item=item: self._finished(item),
+                description=f"{self._description} {item}",
+                priority=PRIORITY_BACKGROUND
+            )
+
+    def _finished(self, item):
+        self._tasks.pop(item, None)
+        self._pump()
@@ -0,0 +1,23 @@
+import assignments
+
+
+class FakeBackend:
+    def __init__(self, principals, fail=()):
+        self.principals = principals
+        self.fail = fail
+
+    def list_principals(self):
+        return [{"name": name} for name in self.principals]
+
+    def list_principal_roles(self, principal=None):
+        if principal in self.fail:
+            raise RuntimeError(f"no roles for {principal}")
+        return [{"name": role} for role in self.principals.get(principal, ())]
+
+
+def test_iter_assignments_yields_role_names_per_principal():
+    backend = FakeBackend({"alice": ["readers", "writers"], "bob": []}, fail=("bob",))
+    outcomes = {name: (roles, error) for name, roles, error in assignments.iter_assignments(backend)}
+    assert outcomes["alice"] == (["readers", "writers"], None)
+    assert outcomes["bob"][0] == []
+    assert isinstance(outcomes["bob"][1], RuntimeError)
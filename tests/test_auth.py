@@ -0,0 +1,69 @@
+import pytest
+import requests
+
+import auth
+
+
+class FakeResponse:
+    def __init__(self, body, ok=True):
+        self.body = body
+        self.ok = ok
+        self.status_code = 200 if ok else 500
+        self.text = str(body)
+
+    def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+def make_manager(monkeypatch, *responses):
+    manager = auth.TokenManager("http://polaris", "client", "secret")
+    replies = list(responses)
+
+    def post(*args, **kwargs):
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(manager.session, "post", post)
+    return manager
+
+
+@pytest.mark.parametrize("body", [ValueError("not JSON"), {"token_type": "bearer"}, ["unexpected"]])
+def test_malformed_token_response_raises_token_error(monkeypatch, body):
+    manager = make_manager(monkeypatch, FakeResponse(body))
+    with pytest.raises(auth.TokenError):
+        manager.token()
+
+
+def test_background_refresh_replaces_token(monkeypatch):
+    manager = make_manager(monkeypatch, FakeResponse({"access_token": "first", "expires_in": 3600}),
+                           FakeResponse({"access_token": "second", "expires_in": 3600}))
+    try:
+        assert manager.token() == "first"
+        manager._background_refresh()
+        assert manager.token() == "second"
+    finally:
+        manager.close()
+
+
+def test_failed_background_refresh_keeps_valid_token(monkeypatch):
+    manager = make_manager(monkeypatch, FakeResponse({"access_token": "first", "expires_in": 3600}),
+                           requests.ConnectionError("unreachable"))
+    try:
+        assert manager.token() == "first"
+        manager._background_refresh()
+        assert manager.token() == "first"
+    finally:
+        manager.close()
+
+
+def test_background_refresh_runs_before_foreground_threshold(monkeypatch):
+    manager = make_manager(monkeypatch, FakeResponse({"access_token": "first", "expires_in": 3600}))
+    try:
+        manager.token()
+        assert manager._refresh_timer.interval < 3600 - manager.refresh_margin
+    finally:
+        manager.close()
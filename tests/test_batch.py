@@ -0,0 +1,28 @@
+import logging
+import os
+
+import pytest
+
+import batch
+
+FAKE_CLI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks",
+                             "fake_polaris_cli.py")
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_cli_backend_without_credentials_reports_an_error(monkeypatch, capsys):
+    monkeypatch.setenv("POLARIS_LOG_FILE", "")
+    exit_code = batch.main(["--backend", "CLI", "--cli-path", FAKE_CLI_PATH, "--port", "1", "list", "catalogs"])
+    assert exit_code == 1
+    assert capsys.readouterr().err.startswith("Error:")
@@ -0,0 +1,41 @@
+import threading
+import time
+
+import bulk
+import tasks
+
+
+def test_cancelling_the_task_aborts_bulk_calls_in_progress():
+    runner = tasks.TaskRunner(lambda delay, callback: None)
+    started = threading.Semaphore(0)
+    aborted = []
+    calls = []
+
+    def blocked(item):
+        calls.append(item)
+        finished = threading.Event()
+        tasks.on_cancel(lambda: (aborted.append(item), finished.set()))
+        started.release()
+        finished.wait(5)
+        if tasks.cancelled():
+            raise RuntimeError("aborted")
+
+    try:
+        task = runner.stream(bulk.run_bulk, blocked, [(i,) for i in range(10)], 2)
+        assert started.acquire(timeout=1) and started.acquire(timeout=1)
+        task.cancel()
+        assert sorted(aborted) == [0, 1]
+        deadline = time.monotonic() + 5
+        while not task.future.done():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        # Items queued behind the aborted ones never ran
+        assert len(calls) < 10
+    finally:
+        runner.shutdown()
+
+
+def test_run_bulk_outside_a_task_runs_every_item():
+    outcomes = list(bulk.run_bulk(lambda i: None, [(i,) for i in range(5)]))
+    assert sorted(args for args, error in outcomes) == [(i,) for i in range(5)]
+    assert all(error is None for args, error in outcomes)
@@ -0,0 +1,59 @@
+import cache
+from cache import EntityCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_go_stale_after_their_kind_ttl():
+    clock = FakeClock()
+    entity_cache = EntityCache(ttls={cache.PRINCIPALS: 10}, clock=clock)
+    entity_cache.put((cache.PRINCIPALS,), ["alice"])
+    assert entity_cache.get((cache.PRINCIPALS,)) == (["alice"], True)
+    clock.now = 10
+    # Stale entries are still returned so they can be shown while revalidating
+    assert entity_cache.get((cache.PRINCIPALS,)) == (["alice"], False)
+    assert entity_cache.get((cache.CATALOGS,)) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    entity_cache = EntityCache(max_entries=2)
+    entity_cache.put((cache.ASSIGNED_ROLES, "alice"), [])
+    entity_cache.put((cache.ASSIGNED_ROLES, "bob"), [])
+    entity_cache.get((cache.ASSIGNED_ROLES, "alice"))
+    entity_cache.put((cache.ASSIGNED_ROLES, "carol"), [])
+    assert entity_cache.get((cache.ASSIGNED_ROLES, "bob")) is None
+    assert entity_cache.get((cache.ASSIGNED_ROLES, "alice")) is not None
+    assert entity_cache.get((cache.ASSIGNED_ROLES, "carol")) is not None
+
+
+def test_put_started_before_invalidation_is_dropped():
+    entity_cache = EntityCache()
+    key = (cache.ASSIGNED_ROLES, "alice")
+    generation = entity_cache.generation(key)
+    entity_cache.invalidate_kind(cache.ASSIGNED_ROLES)
+    assert not entity_cache.put(key, ["readers"], generation)
+    assert entity_cache.get(key) is None
+    assert entity_cache.put(key, ["writers"], entity_cache.generation(key))
+
+    generation = entity_cache.generation(key)
+    entity_cache.invalidate(key)
+    assert not entity_cache.put(key, ["readers"], generation)
+    assert not entity_cache.touch(key, generation)
+
+
+def test_seeded_entries_are_stale_and_do_not_replace_cached_ones():
+    stored = []
+    entity_cache = EntityCache(on_put=lambda key, value: stored.append(key))
+    entity_cache.seed((cache.CATALOGS,), ["from disk"])
+    assert entity_cache.get((cache.CATALOGS,)) == (["from disk"], False)
+    entity_cache.put((cache.PRINCIPALS,), ["alice"])
+    entity_cache.seed((cache.PRINCIPALS,), ["from disk"])
+    assert entity_cache.get((cache.PRINCIPALS,)) == (["alice"], True)
+    # Seeding does not persist the value again
+    assert stored == [(cache.PRINCIPALS,)]
@@ -0,0 +1,45 @@
+import pytest
+
+import backends
+
+
+def write_cli(tmp_path, source):
+    path = tmp_path / "polaris_cli.py"
+    path.write_text(source)
+    return str(path)
+
+
+def test_worker_runs_commands_like_the_cli(tmp_path):
+    cli_path = write_cli(tmp_path, "import json, sys\n"
+                                   "if '--fail' in sys.argv:\n"
+                                   "    sys.exit('404 NotFoundException')\n"
+                                   "print(json.dumps({'args': sys.argv[1:]}))\n")
+    backend = backends.PersistentCliBackend(cli_path, "127.0.0.1", "1", "client", "secret", workers=1)
+    try:
+        records = list(backend.stream("principals", "list"))
+        assert records[0]["args"][-2:] == ["principals", "list"]
+        with pytest.raises(backends.BackendError, match="404"):
+            backend.run("principals", "delete", "--fail")
+    finally:
+        backend.close()
+
+
+def test_malformed_worker_reply_raises_backend_error(tmp_path):
+    cli_path = write_cli(tmp_path, "import os\nos.write(1, b'garbage\\n')\n")
+    backend = backends.PersistentCliBackend(cli_path, "127.0.0.1", "1", "client", "secret", workers=1)
+    try:
+        with pytest.raises(backends.BackendError, match="malformed reply"):
+            backend.run("principals", "create", "alice")
+        assert not backend._workers
+    finally:
+        backend.close()
+
+
+def test_worker_script_can_import_its_sibling_modules(tmp_path):
+    (tmp_path / "helper_mod.py").write_text("GREETING = 'hello'\n")
+    cli_path = write_cli(tmp_path, "import json, helper_mod\nprint(json.dumps({'greeting': helper_mod.GREETING}))\n")
+    backend = backends.PersistentCliBackend(cli_path, "127.0.0.1", "1", "client", "secret", workers=1)
+    try:
+        assert list(backend.stream("principals", "list")) == [{"greeting": "hello"}]
+    finally:
+        backend.close()
@@ -0,0 +1,11 @@
+import explorer
+
+
+class FakeBackend:
+    def list_namespaces(self, catalog, parent=None):
+        return [["sales"], [], ["finance"]]
+
+
+def test_empty_namespaces_are_skipped():
+    children = explorer._fetch_namespaces(FakeBackend(), "catalog", ())
+    assert [label for _, label, _, _ in children] == ["finance", "sales"]
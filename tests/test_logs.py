@@ -0,0 +1,21 @@
+import logging
+import queue
+
+import logs
+
+
+def test_queue_handler_truncates_and_redacts_before_queueing():
+    records = queue.SimpleQueue()
+    handler = logs.RedactingQueueHandler(records, max_length=50)
+    logger = logging.getLogger("test_logs")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    try:
+        logger.warning("CLI output: %s", "x" * 100000)
+        logger.warning("polaris --client-secret s3cr3t principals list")
+    finally:
+        logger.removeHandler(handler)
+    listing = records.get_nowait()
+    assert len(listing.getMessage()) < 200
+    assert "s3cr3t" not in records.get_nowait().getMessage()
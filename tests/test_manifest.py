@@ -0,0 +1,25 @@
+import manifest
+
+
+def test_prune_keeps_principals_and_roles_named_in_grants():
+    desired = manifest.normalize_manifest({
+        "prune": True,
+        "principals": ["alice"],
+        "principal_roles": ["readers"],
+        "grants": [
+            {"principal": "bob", "principal_role": "readers"},
+            {"principal": "alice", "principal_role": "writers"},
+        ],
+    })
+    state = {
+        "catalogs": {},
+        "principals": {"alice": {"name": "alice"}, "bob": {"name": "bob"}, "carol": {"name": "carol"}},
+        "principal_roles": {"readers": {"name": "readers"}, "writers": {"name": "writers"},
+                            "unused": {"name": "unused"}},
+        "assigned_roles": {"alice": set(), "bob": set()},
+    }
+    steps = manifest.build_plan(desired, state)
+    deletes = {(step.kind, step.name) for step in steps if step.action == "delete"}
+    assert deletes == {("principal", "carol"), ("principal role", "unused")}
+    grants = {step.args for step in steps if step.action == "grant"}
+    assert grants == {("readers", "bob"), ("writers", "alice")}
@@ -0,0 +1,71 @@
+from paging import PagedLoader
+
+
+class ImmediateRunner:
+    """Runs submitted work at once on the calling thread."""
+
+    def submit(self, fn, *args, on_success=None, on_error=None, description=None):
+        on_success(fn(*args))
+        return None
+
+
+class FakeTable:
+    def __init__(self):
+        self.yview_range = (0.0, 0.1)
+
+    def configure(self, yscrollcommand):
+        self.yscrollcommand = yscrollcommand
+
+    def yview(self):
+        return self.yview_range
+
+
+class FakeRenderer:
+    def __init__(self):
+        self.table = FakeTable()
+        self.records = []
+        self.finished = False
+
+    def begin(self):
+        self.finished = False
+
+    def append(self, records):
+        self.records.extend(records)
+
+    def finish(self):
+        self.finished = True
+
+
+def fetch_pages(pages):
+    requested = []
+
+    def fetch_page(page_token):
+        index = int(page_token or 0)
+        requested.append(index)
+        return pages[index], str(index + 1) if index + 1 < len(pages) else None
+
+    return fetch_page, requested
+
+
+def test_later_pages_wait_for_scrolling():
+    renderer = FakeRenderer()
+    loader = PagedLoader(ImmediateRunner(), renderer)
+    fetch_page, requested = fetch_pages([["a"], ["b"], ["c"]])
+    loader.load(fetch_page)
+    assert requested == [0]
+    renderer.table.yscrollcommand(0.5, 0.9)
+    assert requested == [0, 1]
+    renderer.table.yscrollcommand(0.6, 1.0)
+    assert requested == [0, 1, 2]
+    assert renderer.finished
+
+
+def test_eager_load_fetches_every_page_at_once():
+    renderer = FakeRenderer()
+    loader = PagedLoader(ImmediateRunner(), renderer)
+    fetch_page, requested = fetch_pages([["a"], ["b"], ["c"]])
+    done = []
+    loader.load(fetch_page, on_done=done.append, eager=True)
+    assert requested == [0, 1, 2]
+    assert done == [["a", "b", "c"]]
+    assert renderer.finished
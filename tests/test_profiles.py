@@ -0,0 +1,31 @@
+import profiles
+
+
+class FakeBackend:
+    def __init__(self, principals, fail=False):
+        self.principals = principals
+        self.fail = fail
+
+    def list_principals(self):
+        if self.fail:
+            raise RuntimeError("unavailable")
+        return [{"name": name} for name in self.principals]
+
+
+class FakeConnection:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get_backend(self):
+        return self.backend
+
+
+def test_fan_out_yields_results_and_errors_per_environment():
+    connections = {
+        "dev": FakeConnection(FakeBackend(["alice"])),
+        "prod": FakeConnection(FakeBackend([], fail=True)),
+    }
+    outcomes = {name: (result, error) for name, result, error in profiles.fan_out(connections, "list_principals")}
+    assert outcomes["dev"] == ([{"name": "alice"}], None)
+    assert outcomes["prod"][0] is None
+    assert isinstance(outcomes["prod"][1], RuntimeError)
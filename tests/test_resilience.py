@@ -0,0 +1,104 @@
+import pytest
+
+import backends
+import resilience
+from fake_polaris import FakePolarisServer, FakePolarisState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def server():
+    server = FakePolarisServer(FakePolarisState(catalogs=2, principals=3, principal_roles=2)).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_breaker(clock):
+    return resilience.CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=clock)
+
+
+def test_breaker_opens_after_threshold_and_closes_after_successful_trial(clock):
+    breaker = make_breaker(clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state == resilience.HALF_OPEN
+    # Only one trial at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens_the_circuit(clock):
+    breaker = make_breaker(clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    assert not breaker.allow()
+
+
+def test_call_with_retry_retries_transient_errors_only():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise backends.BackendError("503", transient=True)
+        return "ok"
+
+    assert resilience.call_with_retry(flaky, backends.is_transient, attempts=3, base_delay=0) == "ok"
+    assert len(calls) == 3
+
+    def broken():
+        calls.append(1)
+        raise backends.BackendError("404")
+
+    calls.clear()
+    with pytest.raises(backends.BackendError):
+        resilience.call_with_retry(broken, backends.is_transient, attempts=3, base_delay=0)
+    assert len(calls) == 1
+
+
+def test_rest_backend_closes_half_open_circuit_on_success(server, clock):
+    backend = backends.RestBackend("127.0.0.1", str(server.port), "client", "secret")
+    backend.breaker = make_breaker(clock)
+    try:
+        backend.breaker.record_failure()
+        backend.breaker.record_failure()
+        with pytest.raises(backends.CircuitOpenError):
+            backend.list_principals()
+
+        clock.now = 10
+        assert len(backend.list_principals()) == 3
+        assert backend.breaker.state == resilience.CLOSED
+        assert len(backend.list_principals()) == 3
+    finally:
+        backend.close()
+        backend.token_manager.close()
+
+
+def test_backoff_uses_full_jitter():
+    delays = [resilience._backoff(3, 0.25, 4.0) for _ in range(200)]
+    assert all(0 <= delay <= 1.0 for delay in delays)
+    assert min(delays) < 0.5
@@ -0,0 +1,38 @@
+from search import SearchIndex
+
+
+def make_index():
+    index = SearchIndex()
+    for name in ("alice", "alicia", "bob", "Malice", "carol"):
+        index.add(name, name)
+    return index
+
+
+def test_trigram_search_matches_substrings_case_insensitively():
+    index = make_index()
+    assert index.search("LIC") == {"alice", "alicia", "Malice"}
+    assert index.search("rol") == {"carol"}
+    assert index.search("xyz") == set()
+    # Queries shorter than a trigram scan the texts
+    assert index.search("b") == {"bob"}
+
+
+def test_extended_query_narrows_previous_matches():
+    index = make_index()
+    assert index.search("ali") == {"alice", "alicia", "Malice"}
+    assert index.search("alic") == {"alice", "alicia", "Malice"}
+    assert index.search("alice") == {"alice", "Malice"}
+    # A shorter query after a longer one is not limited to the longer query's matches
+    assert index.search("ali") == {"alice", "alicia", "Malice"}
+    assert index.search("a") == {"alice", "alicia", "Malice", "carol"}
+
+
+def test_changes_to_the_index_reset_incremental_search():
+    index = make_index()
+    assert index.search("ali") == {"alice", "alicia", "Malice"}
+    index.add("alina", "alina")
+    assert index.search("alin") == {"alina"}
+    index.remove("alina")
+    index.add("bob", "bobby")
+    assert index.search("bobb") == {"bob"}
+    assert not index.matches("alina", "ali")
@@ -0,0 +1,136 @@
+import itertools
+
+from tables import TableRenderer
+
+
+class FakeTreeview:
+    """The part of ttk.Treeview that TableRenderer uses; after_idle jobs run when run_idle() is called."""
+
+    def __init__(self):
+        self.children = []
+        self.values = {}
+        self.detached = set()
+        self.jobs = {}
+        self.moves = 0
+        self._job_ids = itertools.count(1)
+
+    def get_children(self, item=""):
+        return tuple(self.children)
+
+    def insert(self, parent, index, iid, values):
+        assert iid not in self.values
+        self.values[iid] = values
+        self.children.append(iid)
+
+    def item(self, iid, values):
+        self.values[iid] = values
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.values[iid]
+            if iid in self.children:
+                self.children.remove(iid)
+            self.detached.discard(iid)
+
+    def detach(self, *iids):
+        for iid in iids:
+            self.children.remove(iid)
+            self.detached.add(iid)
+
+    def move(self, iid, parent, index):
+        self.moves += 1
+        if iid in self.children:
+            self.children.remove(iid)
+        self.detached.discard(iid)
+        self.children.insert(index, iid)
+
+    def after_idle(self, callback):
+        job = next(self._job_ids)
+        self.jobs[job] = callback
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_idle(self):
+        while self.jobs:
+            job = min(self.jobs)
+            self.jobs.pop(job)()
+
+
+def principal(name, version=1):
+    return {"name": name, "entityVersion": version}
+
+
+def make_renderer(table, **kwargs):
+    return TableRenderer(table, lambda record: (record["name"], record["entityVersion"]),
+                         search_text=lambda record: record["name"], **kwargs)
+
+
+def test_render_inserts_updates_reorders_and_removes_rows_by_key():
+    table = FakeTreeview()
+    renderer = make_renderer(table)
+    renderer.render([principal("alice"), principal("bob"), principal("carol")])
+    assert table.children == ["alice", "bob", "carol"]
+
+    renderer.render([principal("alice"), principal("bob", 2), principal("carol")])
+    assert table.values["bob"] == ("bob", 2)
+    assert table.moves == 0
+
+    renderer.render([principal("alice"), principal("aaron"), principal("bob", 2), principal("carol")])
+    assert table.children == ["alice", "aaron", "bob", "carol"]
+    assert table.moves == 1
+
+    renderer.render([principal("carol"), principal("alice"), principal("bob", 2)])
+    assert table.children == ["carol", "alice", "bob"]
+    assert set(table.values) == {"alice", "bob", "carol"}
+
+
+def test_large_render_is_time_sliced():
+    table = FakeTreeview()
+    renderer = make_renderer(table, first_batch_size=10, time_slice=0)
+    renderer.render([principal(f"principal_{i:04d}") for i in range(100)])
+    assert len(table.children) == 10
+    assert renderer.busy
+    table.run_idle()
+    assert len(table.children) == 100
+    assert not renderer.busy
+
+
+def test_replacement_render_cancels_in_flight_render():
+    table = FakeTreeview()
+    renderer = make_renderer(table, first_batch_size=10, time_slice=0)
+    renderer.render([principal(f"old_{i:04d}") for i in range(100)])
+    assert renderer.busy
+    renderer.render([principal("alice"), principal("bob")])
+    table.run_idle()
+    assert not renderer.busy
+    # Rows of the replaced render are not kept, whether they were drawn already or still pending
+    assert table.children == ["alice", "bob"]
+
+    renderer.render([principal(f"old_{i:04d}") for i in range(100)])
+    renderer.cancel()
+    assert not table.jobs
+    renderer.render([principal("carol")])
+    assert table.children[-1] == "carol"
+    table.run_idle()
+    assert table.children == ["carol"]
+
+
+def test_filter_hides_rows_and_reattaches_them_in_place():
+    table = FakeTreeview()
+    renderer = make_renderer(table)
+    renderer.render([principal("alice"), principal("bob"), principal("alicia"), principal("carol")])
+    renderer.set_filter("ali")
+    assert table.children == ["alice", "alicia"]
+    renderer.set_filter("alic")
+    assert table.children == ["alice", "alicia"]
+    renderer.set_filter("")
+    assert table.children == ["alice", "bob", "alicia", "carol"]
+
+    # A row changed while hidden is reattached at its position once it matches
+    renderer.set_filter("carol")
+    renderer.render([principal("alice"), principal("bob"), principal("alicia"), principal("carol")])
+    assert table.children == ["carol"]
+    renderer.set_filter("")
+    assert table.children == ["alice", "bob", "alicia", "carol"]
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import tasks
+
+
+def make_runner(max_workers=2):
+    return tasks.TaskRunner(lambda delay, callback: None, max_workers=max_workers)
+
+
+# Poll the runner (as the UI thread would) until condition() holds
+def poll_until(runner, condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the task runner"
+        runner.poll()
+        time.sleep(0.01)
+    runner.poll()
+
+
+def test_cancelling_queued_tasks_releases_their_worker_slots():
+    runner = make_runner(max_workers=2)
+    release = threading.Event()
+    try:
+        blockers = [runner.submit(release.wait) for _ in range(2)]
+        cancelled = [runner.submit(time.sleep, 0) for _ in range(200)]
+        for task in cancelled:
+            task.cancel()
+        release.set()
+        poll_until(runner, lambda: all(task.done for task in blockers))
+
+        results = []
+        task = runner.submit(lambda: "done", on_success=results.append)
+        task.cancel()
+        task = runner.submit(lambda: "done", on_success=results.append)
+        poll_until(runner, lambda: results)
+        assert results == ["done"]
+        assert runner._running == 0
+    finally:
+        release.set()
+        runner.shutdown()
+
+
+def test_streams_with_the_same_key_are_shared():
+    runner = make_runner()
+    release = threading.Event()
+    calls = []
+    batches = []
+
+    def listing():
+        calls.append(1)
+        release.wait()
+        yield from ["alice", "bob"]
+
+    try:
+        first = runner.stream(listing, on_batch=batches.append, key="principals")
+        second = runner.stream(listing, on_batch=batches.append, key="principals")
+        assert second is first
+        release.set()
+        poll_until(runner, lambda: first.done)
+        assert len(calls) == 1
+        assert batches == [["alice", "bob"]]
+        # Once finished, the key starts a new stream
+        assert runner.stream(listing, key="principals") is not first
+    finally:
+        release.set()
+        runner.shutdown()
+
+
+def test_newer_task_for_a_view_supersedes_the_previous_one():
+    runner = make_runner()
+    started = threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        tasks.sleep(5)
+        return "slow"
+
+    try:
+        old = runner.submit(slow, on_success=results.append, view="principals")
+        started.wait(1)
+        new = runner.submit(lambda: "new", on_success=results.append, view="principals")
+        assert old.cancelled
+        poll_until(runner, lambda: new.done and old.future.done())
+        assert results == ["new"]
+        # Background work does not supersede user work for the same view
+        user = runner.submit(slow, view="catalogs")
+        runner.submit(lambda: None, view="catalogs", priority=tasks.PRIORITY_BACKGROUND)
+        assert not user.cancelled
+    finally:
+        runner.shutdown()
+
+
+def test_queued_user_work_starts_before_background_work():
+    runner = make_runner(max_workers=1)
+    release = threading.Event()
+    order = []
+    try:
+        runner.submit(release.wait)
+        runner.submit(order.append, "background", priority=tasks.PRIORITY_BACKGROUND)
+        runner.submit(order.append, "user 1")
+        runner.submit(order.append, "user 2")
+        release.set()
+        poll_until(runner, lambda: len(order) == 3)
+        assert order == ["user 1", "user 2", "background"]
+    finally:
+        release.set()
+        runner.shutdown()
+
+
+def test_cancel_before_start_skips_the_task():
+    runner = make_runner(max_workers=1)
+    release = threading.Event()
+    ran = []
+    try:
+        runner.submit(release.wait)
+        task = runner.submit(ran.append, "queued", on_success=ran.append)
+        task.cancel()
+        release.set()
+        poll_until(runner, lambda: not runner.running_tasks())
+        assert ran == []
+        assert runner._running == 0
+    finally:
+        release.set()
+        runner.shutdown()
+
+
+def test_cancel_after_start_runs_cancel_hooks_and_drops_callbacks():
+    runner = make_runner()
+    started = threading.Event()
+    aborted = threading.Event()
+    results = []
+
+    def blocked():
+        tasks.on_cancel(aborted.set)
+        started.set()
+        aborted.wait(5)
+        return tasks.cancelled()
+
+    try:
+        task = runner.submit(blocked, on_success=results.append, on_error=results.append)
+        assert started.wait(1)
+        task.cancel()
+        assert aborted.is_set()
+        poll_until(runner, lambda: task.future.done() and not runner.running_tasks())
+        assert results == []
+        assert runner._running == 0
+    finally:
+        runner.shutdown()
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import time
+
+# Seconds between refreshes of a watched table
+DEFAULT_INTERVAL = 30
+# The delay grows up to this multiple of the interval while the server is slow or failing
+DEFAULT_MAX_BACKOFF = 8
+# A refresh taking longer than this fraction of the interval counts as slow
+DEFAULT_SLOW_FRACTION = 0.25
+# The delay is multiplied by this while the table is not visible (window minimized, other tab)
+DEFAULT_IDLE_FACTOR = 4
+
+
+# Function to hash each record of a listing and combine the hashes, so two listings can be compared
+# without keeping a copy of the old one
+def listing_digest(records):
+    digest = hashlib.sha1()
+    for record in records:
+        digest.update(hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode()).digest())
+    return digest.hexdigest()
+
+
+class Watcher:
+    """Re-runs a refresh on an adaptive interval while enabled.
+
+    ``refresh(on_done, on_error)`` starts a background fetch and returns its
+    Task; ``on_done(changed)`` reports whether anything was re-rendered. A
+    refresh still running at the next tick is not started twice. Slow or
+    failing refreshes double the delay (up to ``max_backoff`` times the
+    interval), fast ones halve it back, and ``is_idle()`` stretches it while
+    nobody is looking.
+    """
+
+    def __init__(self, schedule, cancel_scheduled, refresh, interval=DEFAULT_INTERVAL, max_backoff=DEFAULT_MAX_BACKOFF,
+                 slow_fraction=DEFAULT_SLOW_FRACTION, is_idle=None, idle_factor=DEFAULT_IDLE_FACTOR,
+                 clock=time.monotonic, name="watch"):
+        self.schedule = schedule
+        self.cancel_scheduled = cancel_scheduled
+        self.refresh = refresh
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.slow_fraction = slow_fraction
+        self.is_idle = is_idle
+        self.idle_factor = idle_factor
+        self.clock = clock
+        self.name = name
+        self.delay = interval
+        self.enabled = False
+        self.refreshes = 0
+        self.changes = 0
+        self._job = None
+        self._task = None
+        self._started_at = None
+
+    def start(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.delay = self.interval
+        self._schedule_next()
+
+    def stop(self):
+        self.enabled = False
+        if self._job is not None:
+            self.cancel_scheduled(self._job)
+            self._job = None
+
+    def set_interval(self, seconds):
+        self.interval = max(1, seconds)
+        self.delay = self.interval
+        if self.enabled:
+            self.stop()
+            self.start()
+
+    # Count the delay from the end of the refresh that just finished
+    def _reschedule(self):
+        if not self.enabled:
+            return
+        if self._job is not None:
+            self.cancel_scheduled(self._job)
+        self._schedule_next()
+
+    @property
+    def running(self):
+        # A cancelled task never reports back
+        return self._task is not None and not getattr(self._task, "cancelled", False)
+
+    def _schedule_next(self):
+        delay = self.delay
+        if self.is_idle is not None and self.is_idle():
+            delay *= self.idle_factor
+        self._job = self.schedule(int(delay * 1000), self._tick)
+
+    def _tick(self):
+        self._job = None
+        if not self.enabled:
+            return
+        if self.running:
+            # Still waiting for the previous refresh: the server is slow
+            logging.info(f"Auto-refresh of {self.name} still running, backing off")
+            self._back_off()
+        else:
+            self._started_at = self.clock()
+            self._task = self.refresh(self._on_done, self._on_error)
+        # Rescheduled when the refresh finishes; this tick only fires if it never does (e.g. cancelled)
+        self._schedule_next()
+
+    def _on_done(self, changed):
+        self._task = None
+        self.refreshes += 1
+        if changed:
+            self.changes += 1
+        if self.clock() - self._started_at > self.interval * self.slow_fraction:
+            self._back_off()
+        else:
+            self.delay = max(self.interval, self.delay / 2)
+        self._reschedule()
+
+    def _on_error(self, error):
+        self._task = None
+        logging.warning(f"Auto-refresh of {self.name} failed: {error}")
+        self._back_off()
+        self._reschedule()
+
+    def _back_off(self):
+        self.delay = min(self.interval * self.max_backoff, self.delay * 2)